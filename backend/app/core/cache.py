@@ -0,0 +1,95 @@
+"""
+Cache em memória com TTL e limite LRU.
+
+Usado pelos caches de leitura da aplicação (slots públicos, etc.).
+Cada instância mantém seus próprios contadores de hit/miss/eviction,
+expostos em GET /metrics/cache.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Cache LRU limitado por número de entradas, com expiração por TTL.
+
+    - get() move a chave para o fim (mais recente)
+    - set() remove a entrada menos recente quando o limite é atingido
+    - entradas expiradas são descartadas na leitura
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Retorna o valor em cache ou None (miss / expirado)."""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Grava o valor, despejando a entrada menos recente se necessário."""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> bool:
+        """Remove uma chave. Retorna True se ela existia."""
+        if self._data.pop(key, None) is None:
+            return False
+        self.invalidations += 1
+        return True
+
+    def delete_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Remove todas as chaves que satisfazem o predicado."""
+        keys = [k for k in self._data if predicate(k)]
+        for k in keys:
+            del self._data[k]
+        self.invalidations += len(keys)
+        return len(keys)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """Contadores para observabilidade."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
@@ -17,6 +17,20 @@ class Settings(BaseSettings):
     # Google Calendar Configuration
     google_client_id: Optional[str] = None
     google_client_secret: Optional[str] = None
+    # Cache de credenciais + service do Calendar por profissional
+    google_client_cache_enabled: bool = True
+    google_client_cache_ttl_seconds: int = 3600
+    google_client_cache_max_entries: int = 1000
+    # Renova o access token quando faltar menos que isso para expirar
+    google_token_refresh_margin_seconds: int = 300
+    # Janelas ocupadas do Google (FreeBusy) subtraídas dos slots públicos
+    busy_windows_enabled: bool = True
+    busy_windows_ttl_seconds: int = 300
+    busy_windows_horizon_days: int = 62
+    busy_windows_fetch_timeout_seconds: float = 2.0
+    busy_windows_max_entries: int = 10000
+    # Endpoint FreeBusy alternativo (servidor falso em testes); vazio = Google
+    google_freebusy_url: Optional[str] = None
     
     # Frontend URL
     frontend_url: str = "http://localhost:5174"
@@ -28,6 +42,70 @@ class Settings(BaseSettings):
     # Environment
     environment: str = "development"
     
+    # Pool de conexões HTTP com o PostgREST do Supabase
+    supabase_http_max_connections: int = 100
+    supabase_http_max_keepalive: int = 20
+    supabase_http_keepalive_expiry_seconds: float = 30.0
+    
+    # Redis (opcional — provisionado pelo docker-compose)
+    redis_url: Optional[str] = None
+    
+    # Token interno exigido por /metrics (header X-Metrics-Token);
+    # vazio = rotas de métricas desativadas (404)
+    metrics_token: str = ""
+    
+    # Cache de slots públicos
+    slot_cache_enabled: bool = True
+    slot_cache_ttl_seconds: int = 60
+    slot_cache_max_entries: int = 10000
+    
+    # Cache de perfis públicos (slug → perfil) e de slugs inexistentes
+    profile_cache_enabled: bool = True
+    profile_cache_ttl_seconds: int = 300
+    profile_cache_negative_ttl_seconds: int = 60
+    profile_cache_max_entries: int = 10000
+    
+    # Cache HTTP das rotas públicas (ETag / Cache-Control para navegador e CDN)
+    http_cache_enabled: bool = True
+    http_cache_profile_max_age_seconds: int = 60
+    http_cache_slots_max_age_seconds: int = 15
+    http_cache_stale_while_revalidate_seconds: int = 300
+    
+    # Cache de tokens JWT já validados (hash do token → usuário, até o exp)
+    token_cache_enabled: bool = True
+    token_cache_max_entries: int = 5000
+    token_cache_max_ttl_seconds: int = 3600
+    
+    # Chaves públicas (JWKS) do Supabase Auth
+    jwks_ttl_seconds: int = 600
+    jwks_min_refresh_interval_seconds: int = 30
+    
+    # Delta sync do dashboard (GET /appointments/changes): mudanças mais
+    # recentes que isso ainda podem estar em transações não confirmadas
+    changes_settle_seconds: float = 5.0
+    # Retenção dos tombstones (LIMPEZA da migração 08): cursores mais
+    # antigos que isso recebem resync_required
+    changes_retention_days: int = 30
+    
+    # Exportação em streaming (GET /appointments/export, /students/export):
+    # linhas por página keyset buscada no PostgREST
+    export_page_size: int = 500
+    
+    # Eventos em tempo real do dashboard (SSE em GET /appointments/events)
+    events_queue_size: int = 100
+    events_heartbeat_seconds: float = 15.0
+    events_max_stream_seconds: int = 900
+    # Tickets de uso único para abrir o stream (?ticket=, no lugar do JWT)
+    events_ticket_ttl_seconds: int = 30
+    events_ticket_max_entries: int = 10000
+    
+    # Relay do outbox (efeitos colaterais dos agendamentos)
+    outbox_batch_size: int = 100
+    outbox_poll_interval_seconds: float = 1.0
+    outbox_max_attempts: int = 8
+    outbox_backoff_base_seconds: float = 2.0
+    outbox_backoff_max_seconds: float = 300.0
+    
     class Config:
         env_file = ".env"
 
@@ -4,25 +4,31 @@ Dependências de autenticação para injeção via FastAPI Depends().
 Uso nos routers:
     from app.core.dependencies import get_current_user, get_supabase_client
     from app.schemas.user import UserPayload
-    from supabase import Client
+    from postgrest import AsyncPostgrestClient
 
     @router.get("/")
     async def list_items(
         user: UserPayload = Depends(get_current_user),
-        db: Client = Depends(get_supabase_client),
+        db: AsyncPostgrestClient = Depends(get_supabase_client),
     ):
-        response = db.table("items").select("*").execute()
+        response = await db.table("items").select("*").execute()
         ...
 """
-from fastapi import Depends, HTTPException, status
+import secrets
+from typing import Optional
+
+from fastapi import Depends, Header, HTTPException, Query, status
 from fastapi.security import HTTPAuthorizationCredentials
-from supabase import Client
+from postgrest import AsyncPostgrestClient
 
+from app.core.config import settings
 from app.core.security import (
+    optional_security_scheme,
     security_scheme,
     validate_supabase_token,
     create_supabase_client_with_token,
 )
+from app.core.stream_tickets import stream_ticket_store
 from app.schemas.user import UserPayload
 
 
@@ -44,25 +50,80 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    return validate_supabase_token(credentials.credentials)
+    return await validate_supabase_token(credentials.credentials)
 
 
-async def get_supabase_client(
-    credentials: HTTPAuthorizationCredentials = Depends(security_scheme),
-) -> Client:
+async def get_stream_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security_scheme),
+    ticket: Optional[str] = Query(
+        None,
+        description="Ticket de POST /appointments/events/ticket (para EventSource, que não envia headers)",
+    ),
+) -> UserPayload:
     """
-    Dependency que retorna um cliente Supabase autenticado com o token
-    do usuário, garantindo que todas as queries respeitem o RLS.
+    Como get_current_user, mas também aceita um ticket de uso único em
+    ?ticket= — usado pelos streams SSE. O JWT nunca vai na query string
+    (acabaria em logs e no histórico). O header Authorization tem precedência.
 
-    Uso: injete como segundo parâmetro nos endpoints protegidos.
+    Raises:
+        HTTPException 401: credencial ausente, inválida, expirada ou ticket já usado.
     """
-    if not credentials or not credentials.credentials:
+    if credentials and credentials.credentials:
+        return await validate_supabase_token(credentials.credentials)
+
+    if not ticket:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token de autenticação ausente.",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Valida primeiro — falha rápido se token inválido
-    validate_supabase_token(credentials.credentials)
+    user = await stream_ticket_store.redeem(ticket)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Ticket de stream inválido, expirado ou já utilizado.",
+        )
+    return user
+
+
+async def require_metrics_token(
+    x_metrics_token: Optional[str] = Header(None),
+) -> None:
+    """
+    Protege as rotas de métricas internas (contadores de toda a aplicação,
+    não de um profissional): exige o header X-Metrics-Token igual a
+    settings.metrics_token. Sem token configurado, as rotas não existem.
+
+    Raises:
+        HTTPException 404: métricas desativadas (METRICS_TOKEN vazio).
+        HTTPException 401: token ausente ou incorreto.
+    """
+    if not settings.metrics_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+    if not x_metrics_token or not secrets.compare_digest(
+        x_metrics_token.encode(), settings.metrics_token.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token de métricas ausente ou inválido.",
+        )
+
+
+async def get_supabase_client(
+    credentials: HTTPAuthorizationCredentials = Depends(security_scheme),
+    _user: UserPayload = Depends(get_current_user),
+) -> AsyncPostgrestClient:
+    """
+    Dependency que retorna um cliente PostgREST assíncrono autenticado com
+    o token do usuário, garantindo que todas as queries respeitem o RLS.
+    O cliente reaproveita o pool de conexões compartilhado (keep-alive).
+
+    Uso: injete como segundo parâmetro nos endpoints protegidos.
+
+    A validação do token vem de get_current_user: o FastAPI resolve cada
+    dependency uma vez por requisição, então endpoints que usam as duas
+    validam o token uma única vez.
+    """
     return create_supabase_client_with_token(credentials.credentials)
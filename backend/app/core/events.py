@@ -0,0 +1,250 @@
+"""
+Hub de eventos em tempo real para o dashboard (Server-Sent Events).
+
+Substitui o polling de GET /appointments por push: as escritas
+(create_public_appointment, update_appointment_status) publicam um evento
+e cada aba aberta do profissional recebe-o pelo stream
+GET /appointments/events.
+
+Backends:
+  - Em processo (padrão): fan-out direto para as assinaturas locais.
+  - Redis pub/sub (se REDIS_URL estiver configurado e o pacote `redis`
+    instalado): o evento é publicado no canal `events:<professional_id>`
+    e cada worker repassa às suas assinaturas locais — uma reserva feita
+    no worker A chega à aba conectada ao worker B.
+
+Backpressure: cada assinatura tem uma fila limitada
+(events_queue_size). Um consumidor lento que deixa a fila encher é
+desconectado em vez de acumular memória ou atrasar os demais; o
+EventSource do navegador reconecta sozinho e o dashboard recupera o que
+perdeu pelo delta sync (GET /appointments/changes).
+
+Uso:
+    from app.core.events import event_hub
+
+    await event_hub.publish(professional_id, "appointment.created", {...})
+
+    # Rota SSE
+    return StreamingResponse(sse_stream(request, user.id), media_type="text/event-stream")
+"""
+import asyncio
+import json
+import logging
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Set
+
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+_CHANNEL_PREFIX = "events"
+
+
+class Subscription:
+    """Assinatura de uma conexão (aba) aos eventos de um profissional."""
+
+    def __init__(self, professional_id: str, queue_size: int):
+        self.professional_id = professional_id
+        self.closed = False
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    def offer(self, event: dict) -> bool:
+        """Entrega sem bloquear. False se a fila está cheia (consumidor lento)."""
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def close(self) -> None:
+        """Encerra a assinatura; get() passa a retornar None."""
+        if self.closed:
+            return
+        self.closed = True
+        # Acorda o consumidor mesmo com a fila cheia
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(None)
+
+    async def get(self, timeout: float) -> Optional[dict]:
+        """
+        Próximo evento. Levanta asyncio.TimeoutError se nada chegar em
+        `timeout` segundos (hora do heartbeat); None se a assinatura foi
+        encerrada.
+        """
+        return await asyncio.wait_for(self._queue.get(), timeout=timeout)
+
+
+class EventHub:
+    """Fan-out de eventos por profissional, local ou via Redis pub/sub."""
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscriptions: Dict[str, Set[Subscription]] = {}
+        self._listener: Optional[asyncio.Task] = None
+
+        self.published = 0
+        self.delivered = 0
+        self.dropped_consumers = 0
+        self.publish_errors = 0
+
+    @staticmethod
+    def _channel(professional_id: str) -> str:
+        return f"{_CHANNEL_PREFIX}:{professional_id}"
+
+    # ── Assinaturas ─────────────────────────────────────────
+
+    @asynccontextmanager
+    async def subscribe(self, professional_id: str) -> AsyncIterator[Subscription]:
+        """Registra uma assinatura enquanto o bloco `async with` durar."""
+        subscription = Subscription(professional_id, self.queue_size)
+        self._subscriptions.setdefault(professional_id, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            subscription.close()
+            subscribers = self._subscriptions.get(professional_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscriptions[professional_id]
+
+    # ── Publicação ──────────────────────────────────────────
+
+    async def publish(self, professional_id: str, event_type: str, data: dict) -> None:
+        """
+        Publica um evento para as conexões do profissional.
+
+        Nunca levanta: a escrita que originou o evento já foi confirmada,
+        e quem perder o evento recupera pelo delta sync.
+        """
+        event = {"id": uuid.uuid4().hex, "type": event_type, "data": data}
+        self.published += 1
+
+        redis = get_redis()
+        if redis is not None:
+            try:
+                await redis.publish(self._channel(professional_id), json.dumps(event))
+                return
+            except Exception as e:
+                self.publish_errors += 1
+                logger.warning(f"Falha ao publicar evento no Redis, entregando localmente: {e}")
+        self._dispatch(professional_id, event)
+
+    def _dispatch(self, professional_id: str, event: dict) -> None:
+        """Entrega às assinaturas locais; desconecta as que não acompanham."""
+        for subscription in list(self._subscriptions.get(professional_id, ())):
+            if subscription.closed:
+                continue
+            if subscription.offer(event):
+                self.delivered += 1
+                continue
+            self.dropped_consumers += 1
+            logger.warning(
+                f"Consumidor de eventos lento desconectado (profissional {professional_id})"
+            )
+            subscription.close()
+
+    async def _listen(self) -> None:
+        """Repassa às assinaturas locais os eventos do Redis (todos os workers)."""
+        while True:
+            redis = get_redis()
+            if redis is None:
+                return
+            pubsub = redis.pubsub()
+            try:
+                await pubsub.psubscribe(f"{_CHANNEL_PREFIX}:*")
+                async for message in pubsub.listen():
+                    if message.get("type") != "pmessage":
+                        continue
+                    professional_id = message["channel"].split(":", 1)[1]
+                    if professional_id in self._subscriptions:
+                        self._dispatch(professional_id, json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Conexão pub/sub de eventos perdida, reconectando: {e}")
+                await asyncio.sleep(1)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    # ── Ciclo de vida ───────────────────────────────────────
+
+    async def start(self) -> None:
+        """Inicia o listener do Redis, se houver (chamado no startup)."""
+        if self._listener is None and get_redis() is not None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        """Para o listener e encerra os streams abertos (chamado no shutdown)."""
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        for subscribers in list(self._subscriptions.values()):
+            for subscription in list(subscribers):
+                subscription.close()
+
+    # ── Métricas ────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        return {
+            "backend": "redis" if get_redis() is not None else "memory",
+            "professionals": len(self._subscriptions),
+            "connections": sum(len(s) for s in self._subscriptions.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped_consumers": self.dropped_consumers,
+            "publish_errors": self.publish_errors,
+        }
+
+
+# Instância singleton para uso em toda a aplicação
+event_hub = EventHub(queue_size=settings.events_queue_size)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# FORMATO SSE
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+
+def format_sse(event: dict) -> str:
+    """Serializa um evento no formato text/event-stream."""
+    data = json.dumps(event["data"], separators=(",", ":"))
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {data}\n\n"
+
+
+async def sse_stream(request: Request, professional_id: str) -> AsyncIterator[str]:
+    """
+    Corpo do stream SSE de um profissional.
+
+    - Comentário `: ping` a cada events_heartbeat_seconds sem eventos,
+      para proxies não derrubarem a conexão ociosa
+    - Encerra quando o cliente desconecta, quando o hub descarta a
+      assinatura (consumidor lento / shutdown) ou após
+      events_max_stream_seconds — a reconexão do EventSource revalida
+      o token
+    """
+    deadline = time.monotonic() + settings.events_max_stream_seconds
+    async with event_hub.subscribe(professional_id) as subscription:
+        # Intervalo de reconexão sugerido ao EventSource (ms)
+        yield "retry: 3000\n\n"
+        while time.monotonic() < deadline:
+            try:
+                event = await subscription.get(timeout=settings.events_heartbeat_seconds)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+                yield ": ping\n\n"
+                continue
+            if event is None:
+                return
+            yield format_sse(event)
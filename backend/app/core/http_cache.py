@@ -0,0 +1,92 @@
+"""
+Cache HTTP das rotas públicas de leitura (ETag, 304 e Cache-Control).
+
+As rotas públicas (perfil, serviços, slots, booking page) respondiam sem
+nenhum cabeçalho de cache: cada reload chegava ao FastAPI e ao Supabase.
+Com cached_response():
+
+  - ETag forte = hash do corpo serializado: a versão do conteúdo. Igual
+    entre workers e entre reinícios, sem estado no servidor
+  - If-None-Match com uma ETag atual → 304 sem corpo (economiza a banda
+    e a serialização no cliente; as queries continuam vindo dos caches
+    de aplicação)
+  - Cache-Control com max-age curto para o navegador, s-maxage para
+    proxy/CDN e stale-while-revalidate: o proxy responde com a cópia
+    velha enquanto revalida em background
+
+Uso:
+    @router.get("/public/...", response_model=X)
+    async def rota(request: Request, ...):
+        result = await ...
+        return cached_response(request, result, PUBLIC_SERVICES_POLICY)
+"""
+import hashlib
+from typing import Any, NamedTuple
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+from app.core.serialization import dump_json
+
+
+class CachePolicy(NamedTuple):
+    """Tempos (segundos) do Cache-Control de uma rota."""
+    max_age: int                  # navegador
+    s_maxage: int                 # proxies / CDN
+    stale_while_revalidate: int   # cópia velha servida durante a revalidação
+
+    def header(self) -> str:
+        return (
+            f"public, max-age={self.max_age}, s-maxage={self.s_maxage}, "
+            f"stale-while-revalidate={self.stale_while_revalidate}"
+        )
+
+
+# Perfil e serviços quase nunca mudam; slots mudam a cada reserva
+PUBLIC_PROFILE_POLICY = CachePolicy(
+    max_age=settings.http_cache_profile_max_age_seconds,
+    s_maxage=settings.http_cache_profile_max_age_seconds * 5,
+    stale_while_revalidate=settings.http_cache_stale_while_revalidate_seconds,
+)
+PUBLIC_SERVICES_POLICY = PUBLIC_PROFILE_POLICY
+PUBLIC_SLOTS_POLICY = CachePolicy(
+    max_age=settings.http_cache_slots_max_age_seconds,
+    s_maxage=settings.http_cache_slots_max_age_seconds,
+    stale_while_revalidate=settings.http_cache_slots_max_age_seconds * 2,
+)
+
+
+def compute_etag(body: bytes) -> str:
+    """ETag forte a partir do corpo da resposta."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match (lista separada por vírgulas, `*` ou tags fracas W/)."""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def cached_response(
+    request: Request,
+    content: Any,
+    policy: CachePolicy,
+) -> Response:
+    """
+    Serializa `content` (modelos Pydantic, listas, dicts) como JSON com
+    ETag e Cache-Control; responde 304 se o cliente já tem essa versão.
+    """
+    body = dump_json(content)
+
+    if not settings.http_cache_enabled:
+        return Response(content=body, media_type="application/json")
+
+    etag = compute_etag(body)
+    headers = {"ETag": etag, "Cache-Control": policy.header()}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
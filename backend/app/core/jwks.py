@@ -0,0 +1,202 @@
+"""
+Armazenamento das chaves públicas (JWKS) do Supabase Auth.
+
+Substitui o antigo cache global do JWKS (buscado com urlopen no caminho
+da requisição e nunca expirado):
+
+  - Chaves indexadas por kid, já construídas (jwk.construct) — a
+    validação de um token não reconstrói a chave pública
+  - TTL: após jwks_ttl_seconds o JWKS é buscado de novo; uma task em
+    background renova antes de expirar
+  - Refresh single-flight (asyncio.Lock): várias requisições com o cache
+    vencido disparam um único fetch
+  - kid desconhecido (rotação de chaves) força um refresh, no máximo uma
+    vez a cada jwks_min_refresh_interval_seconds — tokens forjados com
+    kids aleatórios não provocam uma enxurrada de fetches
+  - Falha no fetch mantém as chaves anteriores (se houver)
+  - Warm-up no startup da aplicação (lifespan em app/main.py)
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+
+import httpx
+from jose import jwk
+from jose.backends.base import Key
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Algoritmo padrão por tipo de chave, quando o JWK não traz "alg"
+_DEFAULT_ALG = {"EC": "ES256", "RSA": "RS256"}
+
+
+class JWKSStore:
+    """Chaves públicas do JWKS, por kid, com TTL e refresh em background."""
+
+    def __init__(self, url: str, ttl_seconds: float, min_refresh_interval: float):
+        self.url = url
+        self.ttl_seconds = ttl_seconds
+        self.min_refresh_interval = min_refresh_interval
+
+        self._keys: Dict[str, Key] = {}
+        self._unnamed: List[Key] = []  # chaves sem kid
+        self._fetched_at: Optional[float] = None
+        self._attempted_at: Optional[float] = None
+        self._last_forced_refresh = 0.0
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+        self.fetches = 0
+        self.fetch_errors = 0
+        self.unknown_kid_refreshes = 0
+        self.unknown_kid_throttled = 0
+
+    # ── Consulta ────────────────────────────────────────────
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._fetched_at is not None
+            and time.monotonic() - self._fetched_at < self.ttl_seconds
+        )
+
+    def _lookup(self, kid: Optional[str]) -> Optional[Key]:
+        if kid:
+            return self._keys.get(kid)
+        # Token sem kid: primeira chave disponível (compatibilidade)
+        if self._unnamed:
+            return self._unnamed[0]
+        return next(iter(self._keys.values()), None)
+
+    async def get_key(self, kid: Optional[str]) -> Optional[Key]:
+        """
+        Retorna a chave pública para o kid (None se não existir).
+
+        Raises:
+            RuntimeError: se o JWKS nunca pôde ser carregado.
+        """
+        if not self._is_fresh():
+            await self.refresh()
+            if self._fetched_at is None:
+                raise RuntimeError("JWKS indisponível")
+
+        key = self._lookup(kid)
+        if key is not None or not kid:
+            return key
+
+        # kid desconhecido: possível rotação de chaves → refresh limitado
+        now = time.monotonic()
+        if now - self._last_forced_refresh < self.min_refresh_interval:
+            self.unknown_kid_throttled += 1
+            return None
+        self._last_forced_refresh = now
+        self.unknown_kid_refreshes += 1
+        await self.refresh(force=True)
+        return self._lookup(kid)
+
+    # ── Refresh ─────────────────────────────────────────────
+
+    async def refresh(self, force: bool = False) -> None:
+        """
+        Busca o JWKS (single-flight). Não faz nada se outra corrotina já
+        tentou enquanto esta esperava o lock; sem force, também não faz
+        nada se o cache está válido ou se a última tentativa (falha) foi
+        há menos de min_refresh_interval.
+        """
+        requested_at = time.monotonic()
+        async with self._lock:
+            attempted_at = self._attempted_at
+            if attempted_at is not None:
+                if attempted_at >= requested_at:
+                    return
+                if not force and (
+                    self._is_fresh()
+                    or requested_at - attempted_at < self.min_refresh_interval
+                ):
+                    return
+            await self._fetch()
+
+    async def _fetch(self) -> None:
+        self._attempted_at = time.monotonic()
+        self.fetches += 1
+        try:
+            async with httpx.AsyncClient(timeout=5.0) as client:
+                response = await client.get(self.url)
+                response.raise_for_status()
+                key_list = response.json()["keys"]
+        except Exception as e:
+            # Mantém as chaves anteriores (se houver)
+            self.fetch_errors += 1
+            logger.error(f"Erro ao buscar JWKS: {e}")
+            return
+
+        keys: Dict[str, Key] = {}
+        unnamed: List[Key] = []
+        for key_data in key_list:
+            kty = key_data.get("kty")
+            if kty not in _DEFAULT_ALG:
+                continue
+            try:
+                key = jwk.construct(key_data, algorithm=key_data.get("alg") or _DEFAULT_ALG[kty])
+            except Exception as e:
+                logger.warning(f"Chave JWKS ignorada (kid={key_data.get('kid')}): {e}")
+                continue
+            if key_data.get("kid"):
+                keys[key_data["kid"]] = key
+            else:
+                unnamed.append(key)
+
+        self._keys = keys
+        self._unnamed = unnamed
+        self._fetched_at = time.monotonic()
+        logger.info(f"JWKS carregado: {len(keys) + len(unnamed)} chave(s)")
+
+    async def _refresh_loop(self) -> None:
+        # Renova na metade do TTL para que o caminho da requisição
+        # raramente encontre o cache vencido
+        while True:
+            await asyncio.sleep(self.ttl_seconds / 2)
+            await self.refresh(force=True)
+
+    # ── Ciclo de vida ───────────────────────────────────────
+
+    async def start(self) -> None:
+        """Warm-up e refresh em background (chamado no startup da aplicação)."""
+        # Se o warm-up falhar, tokens HS256 continuam funcionando e o
+        # JWKS é buscado de novo sob demanda
+        await self.refresh()
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        """Para o refresh em background (chamado no shutdown da aplicação)."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    # ── Métricas ────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        age = None
+        if self._fetched_at is not None:
+            age = round(time.monotonic() - self._fetched_at, 1)
+        return {
+            "keys": len(self._keys) + len(self._unnamed),
+            "age_seconds": age,
+            "ttl_seconds": self.ttl_seconds,
+            "fetches": self.fetches,
+            "fetch_errors": self.fetch_errors,
+            "unknown_kid_refreshes": self.unknown_kid_refreshes,
+            "unknown_kid_throttled": self.unknown_kid_throttled,
+        }
+
+
+# Instância singleton para uso em toda a aplicação
+jwks_store = JWKSStore(
+    url=f"{settings.supabase_url}/auth/v1/.well-known/jwks.json",
+    ttl_seconds=settings.jwks_ttl_seconds,
+    min_refresh_interval=settings.jwks_min_refresh_interval_seconds,
+)
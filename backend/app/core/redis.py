@@ -0,0 +1,34 @@
+"""
+Cliente Redis compartilhado (opcional).
+
+O Redis é provisionado pelo docker-compose (REDIS_URL). Se a variável
+não estiver definida ou o pacote `redis` não estiver instalado, get_redis()
+retorna None e os módulos que dependem dele caem no fallback em processo.
+"""
+import logging
+from typing import Optional
+
+from app.core.config import settings
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - dependência opcional
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+_redis_client = None
+
+
+def get_redis() -> Optional["aioredis.Redis"]:
+    """Retorna o cliente Redis assíncrono (lazy) ou None se indisponível."""
+    global _redis_client
+    if _redis_client is not None:
+        return _redis_client
+
+    if not settings.redis_url or aioredis is None:
+        return None
+
+    _redis_client = aioredis.from_url(settings.redis_url, decode_responses=True)
+    logger.info("Cliente Redis inicializado")
+    return _redis_client
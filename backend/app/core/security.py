@@ -8,18 +8,26 @@ Fluxo:
   2. Frontend envia esse token no header Authorization: Bearer <token>
   3. Este módulo valida o JWT:
      a) Tenta HS256 com o JWT Secret (legacy)
-     b) Se falhar, busca JWKS e tenta ES256 (novo padrão ECC)
-  4. Cria um cliente Supabase autenticado com o token do usuário
+     b) Se ES256/RS256, valida com a chave pública do JWKS
+        (app.core.jwks: chaves por kid, pré-construídas, com TTL)
+     Tokens já validados ficam em cache (hash do token → usuário) até o
+     exp, então requisições seguintes da mesma sessão não refazem a
+     verificação criptográfica.
+  4. Cria um cliente PostgREST (assíncrono) autenticado com o token do usuário
 """
-import json
+import hashlib
 import logging
-from urllib.request import urlopen
-from jose import JWTError, jwt, jwk
+import time
+from typing import Optional, Tuple
+from jose import JWTError, jwt
 from fastapi import HTTPException, status
 from fastapi.security import HTTPBearer
-from supabase import create_client, Client
+from postgrest import AsyncPostgrestClient
 
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.jwks import jwks_store
+from app.core.supabase import create_async_client
 from app.schemas.user import UserPayload
 
 logger = logging.getLogger(__name__)
@@ -29,29 +37,19 @@ security_scheme = HTTPBearer(
     description="Token JWT emitido pelo Supabase Auth"
 )
 
-# Cache do JWKS para evitar requests a cada validação
-_jwks_cache: dict | None = None
-
-
-def _get_jwks() -> dict:
-    """Busca as chaves públicas do JWKS endpoint do Supabase (com cache)."""
-    global _jwks_cache
-    if _jwks_cache is not None:
-        return _jwks_cache
+# Mesmo esquema sem erro automático: rotas que também aceitam o token
+# por query string (EventSource não envia headers)
+optional_security_scheme = HTTPBearer(
+    description="Token JWT emitido pelo Supabase Auth",
+    auto_error=False,
+)
 
-    jwks_url = f"{settings.supabase_url}/auth/v1/.well-known/jwks.json"
-    logger.info(f"Buscando JWKS de: {jwks_url}")
-    try:
-        with urlopen(jwks_url) as response:
-            _jwks_cache = json.loads(response.read())
-            logger.info(f"JWKS carregado: {len(_jwks_cache.get('keys', []))} chave(s)")
-            return _jwks_cache
-    except Exception as e:
-        logger.error(f"Erro ao buscar JWKS: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Erro ao buscar chaves de validação do Supabase.",
-        )
+# Tokens já validados: sha256(token) → UserPayload, com TTL até o exp.
+# O próprio token nunca é guardado.
+verified_token_cache = TTLCache(
+    max_entries=settings.token_cache_max_entries,
+    ttl_seconds=settings.token_cache_max_ttl_seconds,
+)
 
 
 def _get_unverified_header(token: str) -> dict:
@@ -62,14 +60,17 @@ def _get_unverified_header(token: str) -> dict:
         return {}
 
 
-def validate_supabase_token(token: str) -> UserPayload:
+async def _verify_token(token: str) -> Tuple[UserPayload, Optional[int]]:
     """
     Decodifica e valida o JWT emitido pelo Supabase.
 
     Estratégia:
       1. Lê o header do JWT para descobrir o algoritmo (alg)
       2. Se HS256: valida com o JWT Secret (compatibilidade legacy)
-      3. Se ES256/RS256: busca JWKS e valida com a chave pública
+      3. Se ES256/RS256: valida com a chave pública do kid (jwks_store)
+
+    Returns:
+        (usuário, exp do token em epoch seconds, se presente)
 
     Raises:
         HTTPException 401: se o token for inválido, expirado ou malformado.
@@ -88,36 +89,22 @@ def validate_supabase_token(token: str) -> UserPayload:
                 audience="authenticated",
             )
         else:
-            # ECC / RSA: validar com JWKS (chave pública)
-            jwks_data = _get_jwks()
-            keys = jwks_data.get("keys", [])
-
-            # Encontrar a chave correta pelo kid
-            signing_key = None
-            for key_data in keys:
-                if kid and key_data.get("kid") == kid:
-                    signing_key = key_data
-                    break
-
-            # Se não encontrou pelo kid, usar a primeira chave compatível
-            if signing_key is None:
-                for key_data in keys:
-                    if key_data.get("kty") in ("EC", "RSA"):
-                        signing_key = key_data
-                        break
-
-            if signing_key is None:
-                # Invalidar cache e tentar novamente
-                global _jwks_cache
-                _jwks_cache = None
+            # ECC / RSA: validar com a chave pública (já construída) do kid
+            try:
+                public_key = await jwks_store.get_key(kid)
+            except RuntimeError:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Erro ao buscar chaves de validação do Supabase.",
+                )
+
+            if public_key is None:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Chave de validação não encontrada no JWKS.",
                     headers={"WWW-Authenticate": "Bearer"},
                 )
 
-            # Construir a chave pública e decodificar
-            public_key = jwk.construct(signing_key)
             payload = jwt.decode(
                 token,
                 public_key,
@@ -136,14 +123,12 @@ def validate_supabase_token(token: str) -> UserPayload:
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        return UserPayload(id=user_id, email=email, role=role)
+        return UserPayload(id=user_id, email=email, role=role), payload.get("exp")
 
     except HTTPException:
         raise
     except JWTError as e:
         logger.warning(f"JWT inválido ({alg}): {e}")
-        # Invalidar cache para forçar atualização das chaves
-        _jwks_cache = None
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Token inválido ou expirado: {str(e)}",
@@ -151,17 +136,41 @@ def validate_supabase_token(token: str) -> UserPayload:
         )
 
 
-def create_supabase_client_with_token(token: str) -> Client:
+async def validate_supabase_token(token: str) -> UserPayload:
+    """
+    Valida o JWT do Supabase, consultando antes o cache de tokens verificados.
+
+    Só tokens válidos entram no cache, com TTL até o exp (limitado a
+    token_cache_max_ttl_seconds); tokens rejeitados são reverificados
+    a cada requisição.
+
+    Raises:
+        HTTPException 401: se o token for inválido, expirado ou malformado.
+    """
+    if not settings.token_cache_enabled:
+        return (await _verify_token(token))[0]
+
+    key = hashlib.sha256(token.encode()).hexdigest()
+    cached = verified_token_cache.get(key)
+    if cached is not None:
+        return cached
+
+    user, exp = await _verify_token(token)
+    if exp is not None:
+        ttl = min(float(exp) - time.time(), settings.token_cache_max_ttl_seconds)
+        if ttl > 0:
+            verified_token_cache.set(key, user, ttl_seconds=ttl)
+    return user
+
+
+def create_supabase_client_with_token(token: str) -> AsyncPostgrestClient:
     """
-    Cria um cliente Supabase autenticado com o token do usuário.
+    Cria um cliente PostgREST assíncrono autenticado com o token do usuário.
 
     Isso garante que todas as queries feitas por esse cliente
     respeitem o Row Level Security (RLS) do Supabase.
+    Usa o pool de conexões compartilhado (app.core.supabase): por
+    requisição só muda o header Authorization.
     """
-    client: Client = create_client(
-        settings.supabase_url,
-        settings.supabase_anon_key,
-    )
-    # Injeta o token do usuário para que o PostgREST respeite o RLS
-    client.postgrest.auth(token)
-    return client
\ No newline at end of file
+    # O token do usuário vai como Bearer para que o PostgREST respeite o RLS
+    return create_async_client(settings.supabase_anon_key, token)
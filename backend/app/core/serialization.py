@@ -0,0 +1,77 @@
+"""
+Serialização rápida para linhas confiáveis do banco.
+
+Nas listagens, cada linha lida do Supabase passava por:
+  1. `Model(**row)` — uma validação por linha, chamada a chamada em Python
+  2. FastAPI com response_model — model_dump() de cada modelo, nova
+     validação da lista inteira contra o response_model, conversão para
+     tipos JSON e, por fim, json.dumps da stdlib
+
+Ou seja: validação dupla sobre dados que acabamos de ler do nosso banco.
+
+Caminho rápido:
+  - validate_rows(): valida a lista inteira numa única chamada ao
+    pydantic-core (TypeAdapter), em vez de um __init__ por linha
+  - ModelResponse: serializa os modelos direto para bytes com o
+    serializer do pydantic-core. Uma Response retornada pela rota não
+    passa pela validação do response_model — que continua declarado na
+    rota para documentar o OpenAPI
+
+A validação única é mantida de propósito: os modelos fazem coerções
+(timestamps → datetime, numeric → Decimal) que definem o formato do
+JSON de saída. model_construct() sem validação manteria os valores
+crus do PostgREST e mudaria o contrato (ex.: price como número em vez
+da string decimal).
+
+Benchmark: scripts/bench_serialization.py
+
+Uso:
+    return validate_rows(ServiceResponse, response.data)   # no service
+
+    return ModelResponse(await list_services(db))          # na rota
+"""
+import json
+from functools import lru_cache
+from typing import Any, List, Type, TypeVar
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, TypeAdapter
+
+M = TypeVar("M", bound=BaseModel)
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    """TypeAdapter de List[model] (montar o schema é caro; um por modelo)."""
+    return TypeAdapter(List[model])
+
+
+def validate_rows(model: Type[M], rows: List[dict]) -> List[M]:
+    """Valida as linhas do banco numa única chamada (colunas extras são ignoradas)."""
+    return _list_adapter(model).validate_python(rows)
+
+
+def dump_json(content: Any) -> bytes:
+    """
+    JSON compacto (UTF-8) de um modelo, de uma lista homogênea de modelos
+    ou, no caso geral, de qualquer valor aceito pelo jsonable_encoder.
+    """
+    if isinstance(content, BaseModel):
+        return content.__pydantic_serializer__.to_json(content)
+    if isinstance(content, list) and content and isinstance(content[0], BaseModel):
+        model = type(content[0])
+        if all(type(item) is model for item in content):
+            return _list_adapter(model).dump_json(content)
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class ModelResponse(Response):
+    """Resposta JSON de modelos já validados, sem a revalidação do FastAPI."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
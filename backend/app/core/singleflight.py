@@ -0,0 +1,77 @@
+"""
+Coalescência de requisições idênticas (single-flight), em processo.
+
+Quando um profissional divulga o link de agendamento, centenas de
+visitantes pedem os mesmos slots (profissional, dia, serviço) em poucos
+segundos. Sem coalescência, cada requisição faz a sua própria rodada de
+queries antes que a primeira preencha o cache. Com SingleFlight, as
+chamadas concorrentes com a mesma chave aguardam uma única execução e
+recebem o mesmo resultado (ou a mesma exceção).
+
+A execução roda numa task própria: se o cliente que a iniciou
+desconectar, as demais chamadas continuam esperando normalmente.
+
+O resultado é compartilhado entre os chamadores — não o modifique.
+
+Uso:
+    _flight = SingleFlight("slots")
+
+    async def get_slots(professional_id, day):
+        return await _flight.do((professional_id, day), lambda: _compute(professional_id, day))
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, List, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Uma execução em andamento por chave; chamadas concorrentes a compartilham."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+
+        _registry.append(self)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Executa fn() — ou aguarda a execução em andamento para a mesma chave."""
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            self.coalesced += 1
+        # shield: o cancelamento de um chamador não cancela a execução compartilhada
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Marca a exceção como consumida mesmo se todos os chamadores saíram
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._inflight),
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "coalesced_rate": round(self.coalesced / self.calls, 4) if self.calls else 0.0,
+        }
+
+
+_registry: List[SingleFlight] = []
+
+
+def singleflight_stats() -> dict:
+    """Métricas de todas as instâncias (GET /metrics/cache)."""
+    return {flight.name: flight.stats() for flight in _registry}
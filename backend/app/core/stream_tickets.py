@@ -0,0 +1,95 @@
+"""
+Tickets de curta duração para os streams SSE.
+
+O EventSource do navegador não envia headers, e o JWT do Supabase na
+query string acabaria em logs de acesso, de proxy e no histórico do
+navegador. Em vez dele, o cliente autenticado pede um ticket
+(POST /appointments/events/ticket) e abre o stream com ?ticket=:
+
+  - opaco (secrets.token_urlsafe), sem relação com o JWT
+  - expira em events_ticket_ttl_seconds
+  - uso único: resgatar remove o ticket
+
+Backends:
+  - Em processo (padrão): TTLCache.
+  - Redis (se REDIS_URL estiver configurado e o pacote `redis` instalado):
+    o ticket emitido no worker A é resgatado no worker B. GET + DEL numa
+    transação MULTI garantem o uso único.
+"""
+import json
+import logging
+import secrets
+from typing import Optional
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.schemas.user import UserPayload
+
+logger = logging.getLogger(__name__)
+
+_REDIS_PREFIX = "stream_ticket"
+
+
+class StreamTicketStore:
+    """Emissão e resgate de tickets de uso único."""
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self._local = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+        self.issued = 0
+        self.redeemed = 0
+        self.rejected = 0
+
+    async def issue(self, user: UserPayload) -> str:
+        """Emite um ticket para o usuário autenticado."""
+        ticket = secrets.token_urlsafe(32)
+        redis = get_redis()
+        if redis is None:
+            self._local.set(ticket, user)
+        else:
+            await redis.set(
+                f"{_REDIS_PREFIX}:{ticket}", user.model_dump_json(), ex=self.ttl_seconds
+            )
+        self.issued += 1
+        return ticket
+
+    async def redeem(self, ticket: str) -> Optional[UserPayload]:
+        """Resgata (e invalida) o ticket. None se inexistente, expirado ou já usado."""
+        redis = get_redis()
+        if redis is None:
+            user = self._local.get(ticket)
+            if user is not None:
+                self._local.delete(ticket)
+        else:
+            try:
+                async with redis.pipeline(transaction=True) as pipe:
+                    pipe.get(f"{_REDIS_PREFIX}:{ticket}")
+                    pipe.delete(f"{_REDIS_PREFIX}:{ticket}")
+                    raw, deleted = await pipe.execute()
+            except Exception as e:
+                logger.warning(f"Falha ao resgatar ticket de stream no Redis: {e}")
+                raw, deleted = None, 0
+            user = UserPayload(**json.loads(raw)) if raw and deleted else None
+
+        if user is None:
+            self.rejected += 1
+        else:
+            self.redeemed += 1
+        return user
+
+    def stats(self) -> dict:
+        return {
+            "ttl_seconds": self.ttl_seconds,
+            "issued": self.issued,
+            "redeemed": self.redeemed,
+            "rejected": self.rejected,
+        }
+
+
+# Instância singleton para uso em toda a aplicação
+stream_ticket_store = StreamTicketStore(
+    ttl_seconds=settings.events_ticket_ttl_seconds,
+    max_entries=settings.events_ticket_max_entries,
+)
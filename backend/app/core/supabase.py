@@ -1,8 +1,97 @@
+"""
+Clientes de acesso ao Supabase.
+
+Assíncronos (PostgREST sobre httpx.AsyncClient) — usados por todos os
+services e rotas. O .execute() do supabase-py é síncrono e congela o
+event loop do worker durante cada round trip ao banco; com estes
+clientes a query é aguardada:
+
+    response = await db_admin.table("services").select("*").execute()
+
+Todos os clientes assíncronos — inclusive o cliente RLS criado a cada
+requisição autenticada — compartilham um único pool de conexões HTTP
+com keep-alive (_transport). Por requisição só muda o header
+Authorization; não há handshake TLS nem sub-clientes novos.
+
+Síncronos (supabase-py) — mantidos apenas para os módulos legados que
+não estão montados na API (auth_service, services_service...).
+"""
+from typing import Dict, Optional, Union
+
+import httpx
+from postgrest import AsyncPostgrestClient
+from postgrest.constants import DEFAULT_POSTGREST_CLIENT_HEADERS
 from supabase import create_client, Client
+
 from app.core.config import settings
 
 # Criar cliente do Supabase com chave anônima (para operações públicas)
 supabase: Client = create_client(settings.supabase_url, settings.supabase_anon_key)
 
 # Criar cliente do Supabase com service role (para operações administrativas)
-supabase_admin: Client = create_client(settings.supabase_url, settings.supabase_service_role_key)
\ No newline at end of file
+supabase_admin: Client = create_client(settings.supabase_url, settings.supabase_service_role_key)
+
+
+# Pool de conexões compartilhado por todos os clientes PostgREST assíncronos
+_transport = httpx.AsyncHTTPTransport(
+    limits=httpx.Limits(
+        max_connections=settings.supabase_http_max_connections,
+        max_keepalive_connections=settings.supabase_http_max_keepalive,
+        keepalive_expiry=settings.supabase_http_keepalive_expiry_seconds,
+    ),
+)
+
+
+class PooledPostgrestClient(AsyncPostgrestClient):
+    """
+    Cliente PostgREST que usa o pool de conexões compartilhado.
+
+    Criá-lo é barato (só monta os headers) e aclose() não fecha nada:
+    o pool vive até o shutdown da aplicação (close_async_clients).
+    """
+
+    def create_session(
+        self,
+        base_url: str,
+        headers: Dict[str, str],
+        timeout: Union[int, float, httpx.Timeout],
+    ) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            transport=_transport,
+        )
+
+    async def aclose(self) -> None:
+        return None
+
+
+def create_async_client(api_key: str, token: Optional[str] = None) -> AsyncPostgrestClient:
+    """
+    Cria um cliente PostgREST assíncrono sobre o pool compartilhado.
+
+    Args:
+        api_key: chave do projeto (anon ou service role), enviada no header apikey.
+        token: JWT do usuário — quando informado, as queries respeitam o RLS.
+            Sem token, a própria chave é usada como Bearer (mesmo comportamento
+            do supabase-py).
+    """
+    client = PooledPostgrestClient(
+        f"{settings.supabase_url}/rest/v1",
+        headers={**DEFAULT_POSTGREST_CLIENT_HEADERS, "apikey": api_key},
+    )
+    client.auth(token or api_key)
+    return client
+
+
+# Cliente assíncrono com chave anônima (rotas públicas sem RLS de usuário)
+db_anon: AsyncPostgrestClient = create_async_client(settings.supabase_anon_key)
+
+# Cliente assíncrono com service role (rotas públicas, workers de background)
+db_admin: AsyncPostgrestClient = create_async_client(settings.supabase_service_role_key)
+
+
+async def close_async_clients() -> None:
+    """Fecha o pool de conexões HTTP dos clientes assíncronos (shutdown)."""
+    await _transport.aclose()
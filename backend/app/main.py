@@ -1,14 +1,37 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.routers import test, services, public, appointments, setup, google_calendar, students, availabilities
+from app.core.events import event_hub
+from app.core.jwks import jwks_store
+from app.core.supabase import close_async_clients
+from app.services.busy_windows import busy_window_store
+from app.services.outbox import outbox_relay
+from app.services import calendar_sync, profile_cache  # noqa: F401 — registram os handlers do outbox
+from app.routers import test, services, public, appointments, setup, google_calendar, students, availabilities, metrics
 # NOTA: auth router removido — login/signup agora é feito via Supabase Auth no frontend
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup/shutdown: chaves JWKS, workers de background e conexões com o banco."""
+    await jwks_store.start()
+    await outbox_relay.start()
+    await event_hub.start()
+    yield
+    await busy_window_store.stop()
+    await event_hub.stop()
+    await outbox_relay.stop()
+    await jwks_store.stop()
+    await close_async_clients()
+
+
 # Criar instância do FastAPI
 app = FastAPI(
     title=settings.project_name,
     version="1.0.0",
-    description="API para o AgendaPro - Sistema de Agendamento para Profissionais Liberais"
+    description="API para o AgendaPro - Sistema de Agendamento para Profissionais Liberais",
+    lifespan=lifespan,
 )
 
 # Configurar CORS
@@ -24,6 +47,8 @@ app.add_middleware(
     ],
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "HEAD"],
+    # ETag legível pelo frontend (cache HTTP das rotas públicas)
+    expose_headers=["ETag"],
     allow_headers=[
         "Authorization",
         "Content-Type",
@@ -36,6 +61,7 @@ app.add_middleware(
         "Keep-Alive",
         "X-Requested-With",
         "If-Modified-Since",
+        "If-None-Match",
         "X-CSRF-Token"
     ]
 )
@@ -51,6 +77,7 @@ app.include_router(setup.router, prefix=settings.api_v1_str)
 app.include_router(google_calendar.router, prefix=settings.api_v1_str)
 app.include_router(students.router, prefix=settings.api_v1_str)
 app.include_router(availabilities.router, prefix=settings.api_v1_str)
+app.include_router(metrics.router, prefix=settings.api_v1_str)
 
 
 @app.get("/")
@@ -3,20 +3,35 @@ Router de Agendamentos (Appointments).
 
 Contém rotas públicas (aluno agendando) e privadas (professor gerenciando).
 """
-from typing import List, Optional
-from fastapi import APIRouter, Depends, Query
-from supabase import Client
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from postgrest import AsyncPostgrestClient
 
-from app.core.dependencies import get_current_user, get_supabase_client
+from app.core.dependencies import get_current_user, get_stream_user, get_supabase_client
+from app.core.events import sse_stream
+from app.core.serialization import ModelResponse
+from app.core.stream_tickets import stream_ticket_store
 from app.schemas.user import UserPayload
 from app.schemas.appointment import (
+    AppointmentChanges,
     AppointmentCreate,
+    AppointmentPage,
     AppointmentResponse,
+    AppointmentStats,
     AppointmentStatusUpdate,
+    StreamTicket,
 )
+from app.services.export_logic import ExportFormat, export_response
 from app.services.appointment_logic import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
     create_public_appointment,
+    export_appointments,
+    get_appointment_stats,
     list_appointments,
+    list_appointment_changes,
     get_appointment,
     update_appointment_status,
 )
@@ -43,7 +58,7 @@ async def create_public(data: AppointmentCreate):
     1. Valida horário (start < end)
     2. Verifica disponibilidade (anti double-booking)
     3. Cria agendamento com status 'pending'
-    4. Dispara evento no Google Calendar (mock)
+    4. Grava o evento do Google Calendar no outbox (processado em background)
     """
     return await create_public_appointment(data)
 
@@ -54,7 +69,7 @@ async def create_public(data: AppointmentCreate):
 
 @router.get(
     "/",
-    response_model=List[AppointmentResponse],
+    response_model=AppointmentPage,
     summary="Listar meus agendamentos",
 )
 async def list_all(
@@ -62,11 +77,155 @@ async def list_all(
         None,
         description="Filtrar por status: pending, confirmed, canceled",
     ),
-    db: Client = Depends(get_supabase_client),
-    _user: UserPayload = Depends(get_current_user),
+    date_from: Optional[date] = Query(
+        None, description="Início do período (YYYY-MM-DD, UTC, inclusivo)"
+    ),
+    date_to: Optional[date] = Query(
+        None, description="Fim do período (YYYY-MM-DD, UTC, inclusivo)"
+    ),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor da página anterior"
+    ),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncPostgrestClient = Depends(get_supabase_client),
+    user: UserPayload = Depends(get_current_user),
+):
+    """
+    Lista os agendamentos do profissional autenticado, ordenados por
+    início, em páginas de até `limit` itens. Para a próxima página,
+    repita a chamada com `cursor=next_cursor`.
+    """
+    page = await list_appointments(
+        db,
+        professional_id=user.id,
+        status_filter=status,
+        date_from=date_from,
+        date_to=date_to,
+        cursor=cursor,
+        limit=limit,
+    )
+    return ModelResponse(page)
+
+
+@router.get(
+    "/stats",
+    response_model=AppointmentStats,
+    summary="Totais dos meus agendamentos",
+)
+async def stats(
+    db: AsyncPostgrestClient = Depends(get_supabase_client),
+    user: UserPayload = Depends(get_current_user),
+):
+    """
+    Total, pendentes e confirmados do profissional autenticado, contados
+    no banco — independentes das páginas já carregadas da listagem.
+    """
+    return await get_appointment_stats(db, professional_id=user.id)
+
+
+@router.get(
+    "/changes",
+    response_model=AppointmentChanges,
+    summary="Alterações desde um cursor (delta sync)",
+)
+async def list_changes(
+    since: Optional[str] = Query(
+        None, description="next_cursor da chamada anterior (omita na primeira)"
+    ),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncPostgrestClient = Depends(get_supabase_client),
+    user: UserPayload = Depends(get_current_user),
+):
+    """
+    Agendamentos criados, atualizados ou cancelados, e IDs removidos,
+    desde o cursor. Para polling do dashboard: a primeira chamada (sem
+    `since`) só devolve o cursor; as seguintes trazem apenas o delta.
+    """
+    changes = await list_appointment_changes(
+        db, professional_id=user.id, since=since, limit=limit
+    )
+    return ModelResponse(changes)
+
+
+@router.post(
+    "/events/ticket",
+    response_model=StreamTicket,
+    summary="Ticket para abrir o stream de eventos",
+)
+async def create_events_ticket(user: UserPayload = Depends(get_current_user)):
+    """
+    Emite um ticket opaco, de uso único e curta duração, para abrir
+    GET /appointments/events?ticket= pelo EventSource — o JWT não vai
+    na query string.
+    """
+    ticket = await stream_ticket_store.issue(user)
+    return StreamTicket(ticket=ticket, expires_in=stream_ticket_store.ttl_seconds)
+
+
+@router.get(
+    "/events",
+    summary="Stream de eventos em tempo real (SSE)",
+    response_class=StreamingResponse,
+)
+async def stream_events(
+    request: Request,
+    user: UserPayload = Depends(get_stream_user),
+):
+    """
+    Server-Sent Events com os agendamentos do profissional:
+    `appointment.created` e `appointment.status_changed`, com o
+    agendamento no campo data.
+
+    Autenticação pelo header Authorization ou, para o EventSource do
+    navegador, por `?ticket=` (POST /appointments/events/ticket). O
+    ticket vale uma conexão: ao reconectar, peça outro e sincronize pelo
+    GET /appointments/changes o que pode ter se perdido.
+    """
+    return StreamingResponse(
+        sse_stream(request, user.id),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # nginx: não bufferizar o stream
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+@router.get(
+    "/export",
+    summary="Exportar agendamentos (NDJSON ou CSV)",
+    response_class=StreamingResponse,
+)
+async def export(
+    format: ExportFormat = Query("ndjson", description="ndjson (um objeto por linha) ou csv"),
+    status: Optional[str] = Query(
+        None,
+        description="Filtrar por status: pending, confirmed, canceled",
+    ),
+    date_from: Optional[date] = Query(
+        None, description="Início do período (YYYY-MM-DD, UTC, inclusivo)"
+    ),
+    date_to: Optional[date] = Query(
+        None, description="Fim do período (YYYY-MM-DD, UTC, inclusivo)"
+    ),
+    db: AsyncPostgrestClient = Depends(get_supabase_client),
+    user: UserPayload = Depends(get_current_user),
 ):
-    """Lista todos os agendamentos do profissional autenticado."""
-    return await list_appointments(db, status_filter=status)
+    """
+    Baixa todo o histórico de agendamentos (com os filtros da listagem)
+    em streaming: o arquivo é gerado página a página, sem montar a lista
+    inteira em memória.
+    """
+    chunks = export_appointments(
+        db,
+        professional_id=user.id,
+        fmt=format,
+        status_filter=status,
+        date_from=date_from,
+        date_to=date_to,
+    )
+    return export_response(chunks, format, "agendamentos")
 
 
 @router.get(
@@ -76,7 +235,7 @@ async def list_all(
 )
 async def get_one(
     appointment_id: str,
-    db: Client = Depends(get_supabase_client),
+    db: AsyncPostgrestClient = Depends(get_supabase_client),
     _user: UserPayload = Depends(get_current_user),
 ):
     """Busca um agendamento específico."""
@@ -91,7 +250,7 @@ async def get_one(
 async def patch_status(
     appointment_id: str,
     data: AppointmentStatusUpdate,
-    db: Client = Depends(get_supabase_client),
+    db: AsyncPostgrestClient = Depends(get_supabase_client),
     _user: UserPayload = Depends(get_current_user),
 ):
     """
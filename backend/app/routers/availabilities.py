@@ -4,18 +4,23 @@ Router de Disponibilidade (Availabilities).
 Rotas protegidas: Professor configura seu expediente.
 Rota pública: Aluno busca slots livres para agendar.
 """
-from typing import List
+from typing import List, Literal, Optional, Union
 from datetime import date
-from fastapi import APIRouter, Depends, Query
-from supabase import Client
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from postgrest import AsyncPostgrestClient
 
 from app.core.dependencies import get_current_user, get_supabase_client
+from app.core.http_cache import PUBLIC_SLOTS_POLICY, cached_response
+from app.core.serialization import ModelResponse
 from app.schemas.user import UserPayload
 from app.schemas.availability import (
     AvailabilityCreate,
     AvailabilityBulkCreate,
     AvailabilityResponse,
+    SlotsCompactResponse,
+    SlotsRangeCompactResponse,
     SlotsResponse,
+    SlotsRangeResponse,
 )
 from app.services.availability_logic import (
     list_availabilities,
@@ -23,6 +28,7 @@ from app.services.availability_logic import (
     bulk_replace_availabilities,
     delete_availability,
     get_available_slots,
+    get_available_slots_range,
 )
 
 router = APIRouter(prefix="/availabilities", tags=["availabilities"])
@@ -38,11 +44,11 @@ router = APIRouter(prefix="/availabilities", tags=["availabilities"])
     summary="Listar minha disponibilidade",
 )
 async def list_all(
-    db: Client = Depends(get_supabase_client),
+    db: AsyncPostgrestClient = Depends(get_supabase_client),
     _user: UserPayload = Depends(get_current_user),
 ):
     """Lista todos os blocos de disponibilidade do professor logado."""
-    return await list_availabilities(db)
+    return ModelResponse(await list_availabilities(db))
 
 
 @router.post(
@@ -54,7 +60,7 @@ async def list_all(
 async def create(
     data: AvailabilityCreate,
     user: UserPayload = Depends(get_current_user),
-    db: Client = Depends(get_supabase_client),
+    db: AsyncPostgrestClient = Depends(get_supabase_client),
 ):
     """Cria um bloco de expediente (ex: Segunda, 08:00-12:00)."""
     return await create_availability(db, data, user.id)
@@ -68,7 +74,7 @@ async def create(
 async def bulk_replace(
     data: AvailabilityBulkCreate,
     user: UserPayload = Depends(get_current_user),
-    db: Client = Depends(get_supabase_client),
+    db: AsyncPostgrestClient = Depends(get_supabase_client),
 ):
     """
     Substitui TODOS os blocos de disponibilidade de uma vez.
@@ -83,7 +89,7 @@ async def bulk_replace(
 )
 async def delete(
     availability_id: str,
-    db: Client = Depends(get_supabase_client),
+    db: AsyncPostgrestClient = Depends(get_supabase_client),
     _user: UserPayload = Depends(get_current_user),
 ):
     """Remove um bloco de disponibilidade específico."""
@@ -96,23 +102,61 @@ async def delete(
 
 @router.get(
     "/public/slots",
-    response_model=SlotsResponse,
+    response_model=Union[
+        SlotsResponse, SlotsRangeResponse, SlotsCompactResponse, SlotsRangeCompactResponse
+    ],
     summary="Buscar horários disponíveis (público)",
 )
 async def get_public_slots(
+    request: Request,
     professional_id: str = Query(..., description="UUID do profissional"),
-    date: date = Query(..., description="Data desejada (YYYY-MM-DD)"),
     service_id: str = Query(..., description="UUID do serviço"),
+    date: Optional[date] = Query(None, description="Data desejada (YYYY-MM-DD)"),
+    start_date: Optional[date] = Query(
+        None, description="Início do intervalo (YYYY-MM-DD) — modo intervalo"
+    ),
+    end_date: Optional[date] = Query(
+        None, description="Fim do intervalo (YYYY-MM-DD, inclusivo) — modo intervalo"
+    ),
+    engine: Literal["loop", "bitmap"] = Query(
+        "loop", description="Motor de geração de slots (A/B): loop ou bitmap (NumPy)"
+    ),
+    format: Literal["full", "compact"] = Query(
+        "full", description="full: um objeto por slot; compact: grade + bitmaps por dia"
+    ),
 ):
     """
-    Retorna os slots de horário disponíveis para um dia específico.
+    Retorna os slots de horário disponíveis para um dia específico
+    (`date`) ou para um intervalo de dias (`start_date` + `end_date`).
 
     Usado pela Public Booking Page para o aluno escolher o horário.
+    O modo intervalo alimenta as grades semanais/mensais com 3 queries
+    no total, em vez de 3 queries por dia.
 
     Algoritmo:
       1. Busca a duração do serviço
-      2. Busca os blocos de disponibilidade do professor para o dia da semana
+      2. Busca os blocos de disponibilidade do professor para o(s) dia(s) da semana
       3. Gera slots de N minutos dentro de cada bloco
       4. Cruza com agendamentos existentes (marca ocupados)
+
+    `format=compact` troca a lista de slots de cada dia por uma grade
+    (base, step_minutes, count) com bitmaps base64 dos slots oferecidos
+    e livres — ver app/services/slot_compact.py.
     """
-    return await get_available_slots(professional_id, date, service_id)
+    compact = format == "compact"
+    if date is not None:
+        slots = await get_available_slots(
+            professional_id, date, service_id, engine, compact=compact
+        )
+        return cached_response(request, slots, PUBLIC_SLOTS_POLICY)
+
+    if start_date is None or end_date is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Informe `date` ou o par `start_date` e `end_date`.",
+        )
+
+    slots = await get_available_slots_range(
+        professional_id, start_date, end_date, service_id, engine, compact=compact
+    )
+    return cached_response(request, slots, PUBLIC_SLOTS_POLICY)
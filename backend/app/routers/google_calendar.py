@@ -5,6 +5,7 @@ from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.responses import HTMLResponse
 from pydantic import BaseModel
 from app.core.dependencies import get_current_user
+from app.services.busy_windows import busy_window_store
 from app.services.google_calendar_service import google_calendar_service
 import logging
 
@@ -38,6 +39,8 @@ async def google_oauth_callback_get(code: str, state: str):
     """Processar callback do OAuth2 do Google (GET)."""
     try:
         result = await google_calendar_service.handle_oauth_callback(code, state)
+        # Agenda recém-conectada: os slots passam a descontar o Google
+        await busy_window_store.invalidate(state)
         # Retornar uma página HTML simples indicando sucesso
         html_content = f"""
         <html>
@@ -83,6 +86,7 @@ async def google_oauth_callback(code: str, state: str):
     """Processar callback do OAuth2 do Google."""
     try:
         result = await google_calendar_service.handle_oauth_callback(code, state)
+        await busy_window_store.invalidate(state)
         return result
     except HTTPException:
         raise
@@ -98,9 +102,9 @@ async def google_oauth_callback(code: str, state: str):
 async def get_connection_status(current_user: dict = Depends(get_current_user)):
     """Verificar status da conexão com Google Calendar."""
     try:
-        from app.core.supabase import supabase_admin
+        from app.core.supabase import db_admin
         
-        response = supabase_admin.table("user_google_tokens").select("*").eq("user_id", current_user["id"]).execute()
+        response = await db_admin.table("user_google_tokens").select("*").eq("user_id", current_user["id"]).execute()
         
         if response.data:
             token_data = response.data[0]
@@ -124,6 +128,7 @@ async def disconnect_google_calendar(current_user: dict = Depends(get_current_us
         success = await google_calendar_service.disconnect_google_calendar(current_user["id"])
         
         if success:
+            await busy_window_store.invalidate(current_user["id"])
             return {"message": "Google Calendar desconectado com sucesso"}
         else:
             raise HTTPException(
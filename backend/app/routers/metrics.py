@@ -0,0 +1,52 @@
+"""
+Router de Métricas (observabilidade).
+
+Expõe os contadores internos (caches, outbox, eventos) para monitoramento.
+Rotas internas: exigem o header X-Metrics-Token (METRICS_TOKEN) e ficam
+desativadas sem ele — ver require_metrics_token.
+"""
+from fastapi import APIRouter, Depends
+
+from app.core.dependencies import require_metrics_token
+from app.core.events import event_hub
+from app.core.jwks import jwks_store
+from app.core.singleflight import singleflight_stats
+from app.core.stream_tickets import stream_ticket_store
+from app.core.security import verified_token_cache
+from app.services.busy_windows import busy_window_store
+from app.services.google_client_cache import google_client_cache
+from app.services.outbox import outbox_relay
+from app.services.profile_cache import profile_cache
+from app.services.slot_cache import slot_cache
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["metrics"],
+    dependencies=[Depends(require_metrics_token)],
+)
+
+
+@router.get("/cache", summary="Métricas dos caches")
+async def cache_metrics():
+    """Hit rate, evictions e tamanho de cada cache da aplicação."""
+    return {
+        "slots": slot_cache.stats(),
+        "profiles": profile_cache.stats(),
+        "verified_tokens": verified_token_cache.stats(),
+        "jwks": jwks_store.stats(),
+        "google_clients": google_client_cache.stats(),
+        "busy_windows": busy_window_store.stats(),
+        "singleflight": singleflight_stats(),
+    }
+
+
+@router.get("/events", summary="Métricas dos eventos em tempo real")
+async def events_metrics():
+    """Conexões SSE abertas, eventos publicados/entregues e consumidores descartados."""
+    return {**event_hub.stats(), "tickets": stream_ticket_store.stats()}
+
+
+@router.get("/outbox", summary="Métricas do outbox")
+async def outbox_metrics():
+    """Vazão, lag e falhas do relay do outbox."""
+    return outbox_relay.stats()
@@ -1,7 +1,11 @@
-from typing import List
-from fastapi import APIRouter, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query, Request
+from app.core.http_cache import PUBLIC_PROFILE_POLICY, PUBLIC_SLOTS_POLICY, cached_response
 from app.schemas.appointments import PublicProfile
+from app.schemas.public import BookingPageResponse
 from app.services.appointments_service import get_public_profile
+from app.services.availability_logic import MAX_RANGE_DAYS
+from app.services.public_logic import DEFAULT_BOOKING_PAGE_DAYS, get_booking_page
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,7 +14,29 @@ router = APIRouter(prefix="/public", tags=["public"])
 
 
 @router.get("/profile/{slug}", response_model=PublicProfile)
-async def get_professional_profile(slug: str):
+async def get_professional_profile(slug: str, request: Request):
     """Buscar perfil público do profissional."""
-    logger.info(f"Buscando perfil público para slug: {slug}")
-    return await get_public_profile(slug)
\ No newline at end of file
+    profile = await get_public_profile(slug)
+    return cached_response(request, profile, PUBLIC_PROFILE_POLICY)
+
+@router.get("/booking-page/{slug}", response_model=BookingPageResponse)
+async def get_booking_page_bootstrap(
+    slug: str,
+    request: Request,
+    days: int = Query(
+        DEFAULT_BOOKING_PAGE_DAYS, ge=1, le=MAX_RANGE_DAYS,
+        description="Quantos dias de slots, a partir de hoje",
+    ),
+    service_id: Optional[str] = Query(
+        None, description="Serviço dos slots (padrão: o primeiro da lista)"
+    ),
+):
+    """
+    Perfil, serviços ativos e slots dos próximos dias numa única
+    resposta — a Public Booking Page renderiza com uma requisição.
+    Aceita o slug ou o UUID do profissional.
+
+    Inclui slots, então segue a política de cache HTTP dos slots.
+    """
+    page = await get_booking_page(slug, days=days, service_id=service_id)
+    return cached_response(request, page, PUBLIC_SLOTS_POLICY)
@@ -3,10 +3,12 @@ Router de Serviços (Services).
 Rotas protegidas (CRUD) + Rota pública para Public Booking Page.
 """
 from typing import List
-from fastapi import APIRouter, Depends
-from supabase import Client
+from fastapi import APIRouter, Depends, Request
+from postgrest import AsyncPostgrestClient
 
 from app.core.dependencies import get_current_user, get_supabase_client
+from app.core.http_cache import PUBLIC_SERVICES_POLICY, cached_response
+from app.core.serialization import ModelResponse
 from app.schemas.user import UserPayload
 from app.schemas.service import ServiceCreate, ServiceUpdate, ServiceResponse
 from app.services.service_logic import (
@@ -30,13 +32,15 @@ router = APIRouter(prefix="/services", tags=["services"])
     response_model=List[ServiceResponse],
     summary="Serviços públicos de um profissional",
 )
-async def get_public(professional_id: str):
+async def get_public(professional_id: str, request: Request):
     """
     Retorna os serviços ATIVOS de um profissional.
     Usa supabase_admin internamente (sem token do usuário).
     Alimenta a Public Booking Page do frontend.
+    Responde com ETag (304 se o cliente já tem a versão).
     """
-    return await list_public_services(professional_id)
+    services = await list_public_services(professional_id)
+    return cached_response(request, services, PUBLIC_SERVICES_POLICY)
 
 
 # ---------------------------------------------------------------
@@ -47,7 +51,7 @@ async def get_public(professional_id: str):
 async def create(
     data: ServiceCreate,
     user: UserPayload = Depends(get_current_user),
-    db: Client = Depends(get_supabase_client),
+    db: AsyncPostgrestClient = Depends(get_supabase_client),
 ):
     """Criar um novo serviço."""
     return await create_service(db, data, user.id)
@@ -55,17 +59,17 @@ async def create(
 
 @router.get("/", response_model=List[ServiceResponse])
 async def list_all(
-    db: Client = Depends(get_supabase_client),
+    db: AsyncPostgrestClient = Depends(get_supabase_client),
     _user: UserPayload = Depends(get_current_user),
 ):
     """Listar todos os serviços do profissional autenticado."""
-    return await list_services(db)
+    return ModelResponse(await list_services(db))
 
 
 @router.get("/{service_id}", response_model=ServiceResponse)
 async def get_one(
     service_id: str,
-    db: Client = Depends(get_supabase_client),
+    db: AsyncPostgrestClient = Depends(get_supabase_client),
     _user: UserPayload = Depends(get_current_user),
 ):
     """Buscar um serviço por ID."""
@@ -76,7 +80,7 @@ async def get_one(
 async def update(
     service_id: str,
     data: ServiceUpdate,
-    db: Client = Depends(get_supabase_client),
+    db: AsyncPostgrestClient = Depends(get_supabase_client),
     _user: UserPayload = Depends(get_current_user),
 ):
     """Atualizar um serviço."""
@@ -86,7 +90,7 @@ async def update(
 @router.delete("/{service_id}")
 async def delete(
     service_id: str,
-    db: Client = Depends(get_supabase_client),
+    db: AsyncPostgrestClient = Depends(get_supabase_client),
     _user: UserPayload = Depends(get_current_user),
 ):
     """Remover um serviço."""
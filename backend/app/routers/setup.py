@@ -1,5 +1,5 @@
 from fastapi import APIRouter, HTTPException
-from app.core.supabase import supabase_admin
+from app.core.supabase import db_admin
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,7 +13,7 @@ async def create_credentials_table():
     try:
         # Verificar se a tabela já existe
         try:
-            existing = supabase_admin.table("user_credentials").select("*").limit(1).execute()
+            existing = await db_admin.table("user_credentials").select("*").limit(1).execute()
             return {"message": "Tabela user_credentials já existe"}
         except:
             pass
@@ -38,9 +38,9 @@ async def create_credentials_table():
         }
         
         try:
-            result = supabase_admin.table("user_credentials").insert(test_data).execute()
+            result = await db_admin.table("user_credentials").insert(test_data).execute()
             # Se chegou até aqui, a tabela existe, vamos deletar o registro de teste
-            supabase_admin.table("user_credentials").delete().eq("id", "00000000-0000-0000-0000-000000000000").execute()
+            await db_admin.table("user_credentials").delete().eq("id", "00000000-0000-0000-0000-000000000000").execute()
             return {"message": "Tabela user_credentials já existe e está funcionando"}
         except Exception as e:
             if "relation \"user_credentials\" does not exist" in str(e):
@@ -3,14 +3,18 @@ Router de Alunos (Students).
 Todas as rotas são protegidas (autenticação obrigatória).
 """
 from typing import List
-from fastapi import APIRouter, Depends
-from supabase import Client
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from postgrest import AsyncPostgrestClient
 
 from app.core.dependencies import get_current_user, get_supabase_client
+from app.core.serialization import ModelResponse
 from app.schemas.user import UserPayload
 from app.schemas.student import StudentCreate, StudentUpdate, StudentResponse
+from app.services.export_logic import ExportFormat, export_response
 from app.services.student_logic import (
     create_student,
+    export_students,
     list_students,
     get_student,
     update_student,
@@ -24,7 +28,7 @@ router = APIRouter(prefix="/students", tags=["students"])
 async def create(
     data: StudentCreate,
     user: UserPayload = Depends(get_current_user),
-    db: Client = Depends(get_supabase_client),
+    db: AsyncPostgrestClient = Depends(get_supabase_client),
 ):
     """Criar um novo aluno."""
     return await create_student(db, data, user.id)
@@ -32,17 +36,27 @@ async def create(
 
 @router.get("/", response_model=List[StudentResponse])
 async def list_all(
-    db: Client = Depends(get_supabase_client),
+    db: AsyncPostgrestClient = Depends(get_supabase_client),
     _user: UserPayload = Depends(get_current_user),
 ):
     """Listar todos os alunos do profissional autenticado."""
-    return await list_students(db)
+    return ModelResponse(await list_students(db))
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export(
+    format: ExportFormat = Query("ndjson", description="ndjson (um objeto por linha) ou csv"),
+    user: UserPayload = Depends(get_current_user),
+    db: AsyncPostgrestClient = Depends(get_supabase_client),
+):
+    """Exportar todos os alunos em streaming (NDJSON ou CSV)."""
+    return export_response(export_students(db, user.id, format), format, "alunos")
 
 
 @router.get("/{student_id}", response_model=StudentResponse)
 async def get_one(
     student_id: str,
-    db: Client = Depends(get_supabase_client),
+    db: AsyncPostgrestClient = Depends(get_supabase_client),
     _user: UserPayload = Depends(get_current_user),
 ):
     """Buscar um aluno por ID."""
@@ -53,7 +67,7 @@ async def get_one(
 async def update(
     student_id: str,
     data: StudentUpdate,
-    db: Client = Depends(get_supabase_client),
+    db: AsyncPostgrestClient = Depends(get_supabase_client),
     _user: UserPayload = Depends(get_current_user),
 ):
     """Atualizar dados de um aluno."""
@@ -63,7 +77,7 @@ async def update(
 @router.delete("/{student_id}")
 async def delete(
     student_id: str,
-    db: Client = Depends(get_supabase_client),
+    db: AsyncPostgrestClient = Depends(get_supabase_client),
     _user: UserPayload = Depends(get_current_user),
 ):
     """Remover um aluno."""
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.core.supabase import supabase
+from app.core.supabase import db_anon
 
 router = APIRouter(prefix="/test", tags=["test"])
 
@@ -8,7 +8,7 @@ async def test_supabase():
     """Teste de conexão com Supabase."""
     try:
         # Tentar fazer uma query simples
-        response = supabase.table("profiles").select("*").limit(1).execute()
+        response = await db_anon.table("profiles").select("*").limit(1).execute()
         return {
             "status": "success", 
             "message": "Conexão com Supabase OK",
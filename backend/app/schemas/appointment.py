@@ -4,7 +4,7 @@ Schemas Pydantic para o domínio de Agendamentos (Appointments).
 Todas as datas/horas são timezone-aware e armazenadas em UTC.
 """
 from pydantic import BaseModel, EmailStr, field_validator
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime, timezone
 
 
@@ -89,6 +89,51 @@ class AppointmentResponse(BaseModel):
         from_attributes = True
 
 
+class AppointmentPage(BaseModel):
+    """
+    Página da listagem de agendamentos (paginação por cursor).
+
+    next_cursor é opaco: basta repassá-lo em ?cursor= para obter a
+    próxima página. None quando não há mais itens.
+    """
+    items: List[AppointmentResponse]
+    next_cursor: Optional[str] = None
+
+
+class AppointmentStats(BaseModel):
+    """
+    Contagens do profissional (GET /appointments/stats), calculadas no
+    banco — a listagem é paginada e não serve de base para totais.
+    pending inclui pending_payment.
+    """
+    total: int
+    pending: int
+    confirmed: int
+
+
+class AppointmentChanges(BaseModel):
+    """
+    Delta de agendamentos desde um cursor (GET /appointments/changes).
+
+    items traz os criados/atualizados (cancelados inclusive);
+    deleted_ids os removidos (tombstones). has_more indica que há mais
+    alterações — repita a chamada com since=next_cursor. resync_required
+    indica um cursor anterior à retenção dos tombstones: recarregue a
+    lista inteira e continue a partir de next_cursor.
+    """
+    items: List[AppointmentResponse]
+    deleted_ids: List[str]
+    next_cursor: str
+    has_more: bool = False
+    resync_required: bool = False
+
+
+class StreamTicket(BaseModel):
+    """Ticket de uso único para abrir GET /appointments/events?ticket=."""
+    ticket: str
+    expires_in: int
+
+
 # ---------------------------------------------------------------
 # Schema auxiliar — Disponibilidade
 # ---------------------------------------------------------------
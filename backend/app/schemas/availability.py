@@ -91,3 +91,41 @@ class SlotsResponse(BaseModel):
     professional_id: str
     service_duration_minutes: int
     slots: list[TimeSlot]
+
+
+class CompactDaySlots(BaseModel):
+    """
+    Slots de um dia no formato compacto (format=compact): grade a partir
+    de `base` com passo `step_minutes` e bitmaps base64 (MSB-first) das
+    posições oferecidas e livres. Ver app/services/slot_compact.py.
+    """
+    date: str
+    base: Optional[str] = None         # início do primeiro slot; None = sem slots
+    step_minutes: int
+    count: int                         # posições da grade
+    offered: str                       # bitmap base64: começa um slot
+    free: str                          # bitmap base64: slot livre
+
+
+class SlotsCompactResponse(CompactDaySlots):
+    """Resposta da rota pública de slots (um dia) no formato compacto."""
+    professional_id: str
+    service_duration_minutes: int
+
+
+class SlotsRangeResponse(BaseModel):
+    """Resposta da rota pública de slots no modo intervalo (vários dias)."""
+    start_date: str                    # "2026-02-23"
+    end_date: str                      # "2026-03-01"
+    professional_id: str
+    service_duration_minutes: int
+    days: list[SlotsResponse]
+
+
+class SlotsRangeCompactResponse(BaseModel):
+    """Resposta da rota pública de slots (intervalo) no formato compacto."""
+    start_date: str
+    end_date: str
+    professional_id: str
+    service_duration_minutes: int
+    days: list[CompactDaySlots]
@@ -0,0 +1,23 @@
+"""
+Schemas das rotas públicas agregadas (Public Booking Page).
+"""
+from pydantic import BaseModel
+from typing import List, Optional
+
+from app.schemas.appointments import PublicProfile
+from app.schemas.availability import SlotsRangeResponse
+from app.schemas.service import ServiceResponse
+
+
+class BookingPageResponse(BaseModel):
+    """
+    Tudo o que a Public Booking Page precisa para renderizar, numa
+    resposta só (GET /public/booking-page/{slug}).
+
+    slots traz os próximos dias do serviço selecionado (o informado em
+    service_id ou o primeiro da lista); None se não houver serviços.
+    """
+    profile: PublicProfile
+    services: List[ServiceResponse]
+    selected_service_id: Optional[str] = None
+    slots: Optional[SlotsRangeResponse] = None
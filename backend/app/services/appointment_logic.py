@@ -3,29 +3,50 @@ Lógica de negócio para Agendamentos (Appointments).
 
 Módulo crítico — implementa:
   - Upsert de estudante (find-or-create by email + professional_id)
-  - Prevenção de double-booking via check_availability()
-  - Criação pública de agendamento (sem JWT, usa supabase_admin)
+  - Prevenção de double-booking no banco, pela constraint EXCLUDE
+    appointments_no_overlap (database/migrations/05); check_availability()
+    segue disponível para verificações pontuais (ex.: reagendamento)
+  - Criação pública de agendamento (sem JWT, usa db_admin) via
+    RPC book_public_appointment, que faz upsert + insert numa única
+    transação (database/migrations/04 e 05)
 
 As rotas protegidas usam o cliente RLS-aware, enquanto
-a rota pública usa supabase_admin.
+a rota pública usa db_admin.
 """
-from typing import List, Optional
-from datetime import datetime, timezone
+import asyncio
+import base64
+import binascii
+import json
+import uuid
+from typing import AsyncIterator, List, Optional, Tuple
+from datetime import date, datetime, time, timedelta, timezone
 from fastapi import HTTPException, status
-from supabase import Client
+from postgrest import AsyncPostgrestClient
 
 from app.schemas.appointment import (
+    AppointmentChanges,
     AppointmentCreate,
+    AppointmentPage,
     AppointmentResponse,
+    AppointmentStats,
     AppointmentStatusUpdate,
 )
-from app.core.supabase import supabase_admin
-from app.integrations.google_calendar import google_calendar
+from app.core.config import settings
+from app.core.events import event_hub
+from app.core.serialization import validate_rows
+from app.core.supabase import db_admin
+from app.services.export_logic import ExportFormat, iter_keyset_pages, stream_export
+from app.services.keyset import after_key, order_by_key
+from app.services.slot_cache import slot_cache
 
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Eventos em tempo real para o dashboard (app.core.events)
+EVENT_APPOINTMENT_CREATED = "appointment.created"
+EVENT_APPOINTMENT_STATUS_CHANGED = "appointment.status_changed"
+
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # UPSERT DE ESTUDANTE
@@ -47,8 +68,8 @@ async def upsert_student(
     """
     try:
         # Buscar estudante existente
-        response = (
-            supabase_admin.table("students")
+        response = await (
+            db_admin.table("students")
             .select("id")
             .eq("user_id", professional_id)
             .eq("email", email)
@@ -69,8 +90,8 @@ async def upsert_student(
             "phone": phone,
         }
 
-        insert_response = (
-            supabase_admin.table("students")
+        insert_response = await (
+            db_admin.table("students")
             .insert(new_student)
             .execute()
         )
@@ -122,7 +143,7 @@ async def check_availability(
         end_iso = end_time.isoformat()
 
         query = (
-            supabase_admin.table("appointments")
+            db_admin.table("appointments")
             .select("id, start_time, end_time, status")
             .eq("professional_id", professional_id)
             .neq("status", "canceled")
@@ -133,7 +154,7 @@ async def check_availability(
         if exclude_appointment_id:
             query = query.neq("id", exclude_appointment_id)
 
-        response = query.execute()
+        response = await query.execute()
 
         if response.data:
             conflicting = response.data[0]
@@ -172,10 +193,13 @@ async def create_public_appointment(
     Fluxo:
         1. Valida que start_time < end_time
         2. Converte para UTC
-        3. Upsert do estudante (find-or-create by email)
-        4. Verifica disponibilidade (check_availability)
-        5. Insere agendamento com status 'pending'
-        6. Dispara criação no Google Calendar (mock)
+        3. RPC book_public_appointment, numa única transação:
+           upsert do estudante + insert 'pending' + linha no outbox.
+           Sobreposições são rejeitadas pela constraint de exclusão
+           (23P01 → 409), sem query de verificação prévia
+
+    O evento no Google Calendar é criado depois, pelo relay do outbox
+    (calendar_sync); a resposta sai assim que o agendamento é gravado.
     """
     # 1. Validações básicas
     if data.start_time >= data.end_time:
@@ -188,64 +212,53 @@ async def create_public_appointment(
     start_utc = data.start_time.astimezone(timezone.utc)
     end_utc = data.end_time.astimezone(timezone.utc)
 
-    # 3. Upsert do estudante
-    student_id = await upsert_student(
-        professional_id=data.professional_id,
-        name=data.student_name,
-        email=data.student_email,
-        phone=data.student_phone,
-    )
-
-    # 4. Verificar conflitos
-    await check_availability(data.professional_id, start_utc, end_utc)
-
-    # 5. Montar dados para inserção
-    appointment_dict = {
-        "professional_id": data.professional_id,
-        "service_id": data.service_id,
-        "student_id": student_id,
-        "client_name": data.student_name,
-        "client_email": data.student_email,
-        "start_time": start_utc.isoformat(),
-        "end_time": end_utc.isoformat(),
-        "status": "pending",
+    # 3. Um único round trip: aluno + agendamento (conflito garantido pelo banco)
+    params = {
+        "p_professional_id": data.professional_id,
+        "p_service_id": data.service_id,
+        "p_student_name": data.student_name,
+        "p_student_email": data.student_email,
+        "p_student_phone": data.student_phone,
+        "p_start_time": start_utc.isoformat(),
+        "p_end_time": end_utc.isoformat(),
     }
 
     try:
-        response = (
-            supabase_admin.table("appointments")
-            .insert(appointment_dict)
-            .execute()
-        )
-        if not response.data:
+        response = await db_admin.rpc("book_public_appointment", params).execute()
+        # Função que retorna uma linha: PostgREST devolve um objeto
+        appointment = response.data[0] if isinstance(response.data, list) else response.data
+        if not appointment:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Erro ao criar agendamento.",
             )
 
-        appointment = response.data[0]
+        # Slots do dia mudaram → invalidar o cache desse profissional/dia
+        await slot_cache.invalidate(data.professional_id, [start_utc.date()])
 
-        # 6. Google Calendar (mock)
-        try:
-            event_id = await google_calendar.create_event({
-                "start_time": str(start_utc),
-                "end_time": str(end_utc),
-                "service_id": data.service_id,
-                "professional_id": data.professional_id,
-            })
-            supabase_admin.table("appointments").update(
-                {"google_event_id": event_id}
-            ).eq("id", appointment["id"]).execute()
-            appointment["google_event_id"] = event_id
-        except Exception as gcal_err:
-            logger.warning(f"Falha ao criar evento no Google Calendar: {gcal_err}")
-
-        logger.info(f"Agendamento criado: {appointment['id']} | student: {student_id}")
-        return AppointmentResponse(**appointment)
+        logger.info(
+            f"Agendamento criado: {appointment['id']} | student: {appointment.get('student_id')}"
+        )
+        created = AppointmentResponse(**appointment)
+        await event_hub.publish(
+            data.professional_id, EVENT_APPOINTMENT_CREATED, created.model_dump(mode="json")
+        )
+        return created
 
     except HTTPException:
         raise
     except Exception as e:
+        # 23P01 (exclusion_violation) = appointments_no_overlap rejeitou o horário
+        if "23P01" in str(e):
+            logger.warning(
+                f"Conflito de horário detectado para profissional {data.professional_id}: "
+                f"{start_utc.isoformat()} - {end_utc.isoformat()}"
+            )
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Horário indisponível. Já existe um agendamento nesse intervalo. "
+                       "Por favor, escolha outro horário.",
+            )
         logger.error(f"Erro ao criar agendamento: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -255,29 +268,294 @@ async def create_public_appointment(
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
 
+# Colunas de AppointmentResponse (evita trafegar colunas extras)
+APPOINTMENT_COLUMNS = (
+    "id, professional_id, service_id, student_id, client_name, client_email, "
+    "start_time, end_time, status, google_event_id, created_at, updated_at"
+)
+
+# Tamanho padrão e máximo de página da listagem
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+# Maior UUID possível: cursor (t, _MAX_UUID) = "tudo até t, inclusive"
+_MAX_UUID = "ffffffff-ffff-ffff-ffff-ffffffffffff"
+
+
+def encode_cursor(timestamp: str, appointment_id: str) -> str:
+    """Cursor opaco (base64url) com a chave (timestamp, id) do último item."""
+    raw = json.dumps({"t": timestamp, "id": appointment_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """
+    Decodifica o cursor em (timestamp ISO, id).
+
+    Os cursores emitidos sempre têm fuso; um timestamp sem fuso é
+    rejeitado (compará-lo com datetimes UTC levantaria TypeError).
+
+    Raises:
+        HTTPException 400: cursor malformado.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded))
+        parsed = datetime.fromisoformat(data["t"])
+        if parsed.tzinfo is None:
+            raise ValueError("timestamp sem fuso")
+        return parsed.isoformat(), str(uuid.UUID(data["id"]))
+    except (binascii.Error, ValueError, KeyError, TypeError, AttributeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor inválido.",
+        )
+
+
+def _appointments_query(
+    db: AsyncPostgrestClient,
+    professional_id: str,
+    status_filter: Optional[str],
+    date_from: Optional[date],
+    date_to: Optional[date],
+):
+    """Query de agendamentos do profissional com os filtros de status e período."""
+    query = (
+        db.table("appointments")
+        .select(APPOINTMENT_COLUMNS)
+        .eq("professional_id", professional_id)
+    )
+
+    if status_filter:
+        query = query.eq("status", status_filter)
+    if date_from:
+        start = datetime.combine(date_from, time.min, tzinfo=timezone.utc)
+        query = query.gte("start_time", start.isoformat())
+    if date_to:
+        end = datetime.combine(date_to + timedelta(days=1), time.min, tzinfo=timezone.utc)
+        query = query.lt("start_time", end.isoformat())
+    return query
+
+
 async def list_appointments(
-    db: Client,
+    db: AsyncPostgrestClient,
+    professional_id: str,
     status_filter: Optional[str] = None,
-) -> List[AppointmentResponse]:
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> AppointmentPage:
     """
-    Lista agendamentos do profissional autenticado.
-    O RLS filtra automaticamente por professional_id.
+    Lista agendamentos do profissional autenticado, paginados por cursor.
+
+    Paginação keyset sobre (start_time, id): cada página pede ao
+    PostgREST só as linhas depois da chave do cursor, com filtros de
+    status e período aplicados no banco (índice da migração 07). O custo
+    de uma página não cresce com o histórico, ao contrário de OFFSET.
+
+    Busca limit + 1 linhas para saber se há próxima página sem COUNT.
+    O RLS continua valendo; o filtro por professional_id é o que permite
+    usar o índice.
     """
     try:
+        query = _appointments_query(db, professional_id, status_filter, date_from, date_to)
+
+        if cursor:
+            after_time, after_id = decode_cursor(cursor)
+            query = after_key(query, "start_time", "id", after_time, after_id)
+
+        query = order_by_key(query, "start_time", "id")
+        response = await query.limit(limit + 1).execute()
+        rows = response.data or []
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["start_time"], rows[-1]["id"])
+
+        return AppointmentPage(
+            items=validate_rows(AppointmentResponse, rows),
+            next_cursor=next_cursor,
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erro ao listar agendamentos: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def get_appointment_stats(
+    db: AsyncPostgrestClient,
+    professional_id: str,
+) -> AppointmentStats:
+    """
+    Totais do profissional para os cards do dashboard: COUNT exato no
+    banco (count="exact", uma linha trafegada por consulta), com as três
+    contagens em paralelo. O RLS continua valendo.
+    """
+    def count_query(statuses: Optional[List[str]] = None):
         query = (
             db.table("appointments")
-            .select("*")
-            .order("start_time", desc=False)
+            .select("id", count="exact")
+            .eq("professional_id", professional_id)
+        )
+        if statuses:
+            query = query.in_("status", statuses)
+        return query.limit(1).execute()
+
+    try:
+        total, pending, confirmed = await asyncio.gather(
+            count_query(),
+            count_query(["pending", "pending_payment"]),
+            count_query(["confirmed"]),
+        )
+        return AppointmentStats(
+            total=total.count or 0,
+            pending=pending.count or 0,
+            confirmed=confirmed.count or 0,
+        )
+    except Exception as e:
+        logger.error(f"Erro ao contar agendamentos: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# EXPORTAÇÃO (NDJSON / CSV em streaming, RLS-aware)
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+
+def export_appointments(
+    db: AsyncPostgrestClient,
+    professional_id: str,
+    fmt: ExportFormat,
+    status_filter: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Exporta os agendamentos do profissional (NDJSON ou CSV), em ordem de
+    início, com os mesmos filtros da listagem. Percorre o histórico em
+    páginas keyset de export_page_size; a memória não cresce com a conta.
+    """
+    async def fetch_page(after: Optional[Tuple[str, str]]) -> List[dict]:
+        query = _appointments_query(db, professional_id, status_filter, date_from, date_to)
+        if after is not None:
+            query = after_key(query, "start_time", "id", *after)
+        query = order_by_key(query, "start_time", "id")
+        response = await query.limit(settings.export_page_size).execute()
+        return response.data or []
+
+    pages = iter_keyset_pages(fetch_page, "start_time")
+    return stream_export(pages, AppointmentResponse, fmt)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# ALTERAÇÕES (delta sync do dashboard, RLS-aware)
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+
+async def list_appointment_changes(
+    db: AsyncPostgrestClient,
+    professional_id: str,
+    since: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> AppointmentChanges:
+    """
+    Retorna o que mudou desde o cursor `since`.
+
+    - items: agendamentos criados ou atualizados (inclui cancelamentos,
+      que são mudanças de status) com updated_at depois do cursor
+    - deleted_ids: tombstones de agendamentos removidos
+      (appointment_tombstones, migração 08)
+
+    O cursor é keyset sobre (updated_at, id). Como updated_at é o NOW()
+    do início da transação, uma transação lenta pode confirmar uma
+    linha com updated_at anterior a linhas já entregues; por isso só
+    são devolvidas mudanças até agora − changes_settle_seconds, e o
+    cursor nunca passa desse horizonte.
+
+    Sem `since`, devolve apenas o cursor atual: o cliente carrega a
+    lista (GET /appointments) e, dali em diante, só busca o delta.
+
+    Tombstones mais antigos que changes_retention_days são descartados
+    (migração 08): um `since` anterior a isso pode ter perdido remoções,
+    então a resposta traz resync_required e o cursor atual.
+    """
+    until_dt = datetime.now(timezone.utc) - timedelta(seconds=settings.changes_settle_seconds)
+    until = until_dt.isoformat()
+    watermark = encode_cursor(until, _MAX_UUID)
+
+    if not since:
+        return AppointmentChanges(items=[], deleted_ids=[], next_cursor=watermark)
+
+    after_time, after_id = decode_cursor(since)
+    retention_start = datetime.now(timezone.utc) - timedelta(days=settings.changes_retention_days)
+    if datetime.fromisoformat(after_time) < retention_start:
+        return AppointmentChanges(
+            items=[], deleted_ids=[], next_cursor=watermark, resync_required=True
         )
+    if datetime.fromisoformat(after_time) >= until_dt:
+        return AppointmentChanges(items=[], deleted_ids=[], next_cursor=since)
 
-        if status_filter:
-            query = query.eq("status", status_filter)
+    try:
+        rows_query = (
+            db.table("appointments")
+            .select(APPOINTMENT_COLUMNS)
+            .eq("professional_id", professional_id)
+            .lte("updated_at", until)
+        )
+        rows_query = after_key(rows_query, "updated_at", "id", after_time, after_id)
+        rows_query = order_by_key(rows_query, "updated_at", "id").limit(limit + 1)
 
-        response = query.execute()
-        return [AppointmentResponse(**a) for a in response.data]
+        tombs_query = (
+            db.table("appointment_tombstones")
+            .select("appointment_id, deleted_at")
+            .eq("professional_id", professional_id)
+            .lte("deleted_at", until)
+        )
+        tombs_query = after_key(
+            tombs_query, "deleted_at", "appointment_id", after_time, after_id
+        )
+        tombs_query = order_by_key(tombs_query, "deleted_at", "appointment_id").limit(limit + 1)
 
+        rows_response, tombs_response = await asyncio.gather(
+            rows_query.execute(), tombs_query.execute()
+        )
+
+        # Intercala as duas sequências pela mesma chave (timestamp, id)
+        changes = [
+            (datetime.fromisoformat(r["updated_at"]), r["id"], r)
+            for r in rows_response.data or []
+        ] + [
+            (datetime.fromisoformat(t["deleted_at"]), t["appointment_id"], None)
+            for t in tombs_response.data or []
+        ]
+        changes.sort(key=lambda c: (c[0], c[1]))
+
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+
+        next_cursor = watermark
+        if has_more:
+            last_time, last_id, _ = changes[-1]
+            next_cursor = encode_cursor(last_time.isoformat(), last_id)
+
+        return AppointmentChanges(
+            items=validate_rows(
+                AppointmentResponse, [row for _, _, row in changes if row is not None]
+            ),
+            deleted_ids=[c_id for _, c_id, row in changes if row is None],
+            next_cursor=next_cursor,
+            has_more=has_more,
+        )
+
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Erro ao listar agendamentos: {e}")
+        logger.error(f"Erro ao buscar alterações de agendamentos: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -287,11 +565,11 @@ async def list_appointments(
 
 
 async def get_appointment(
-    db: Client, appointment_id: str
+    db: AsyncPostgrestClient, appointment_id: str
 ) -> AppointmentResponse:
     """Busca um agendamento por ID (RLS filtra por profissional)."""
     try:
-        response = (
+        response = await (
             db.table("appointments")
             .select("*")
             .eq("id", appointment_id)
@@ -316,13 +594,14 @@ async def get_appointment(
 
 
 async def update_appointment_status(
-    db: Client,
+    db: AsyncPostgrestClient,
     appointment_id: str,
     data: AppointmentStatusUpdate,
 ) -> AppointmentResponse:
     """
     Atualiza o status de um agendamento (confirmed / canceled).
-    Se cancelar, tenta remover o evento do Google Calendar.
+    O trigger appointments_status_outbox grava o evento no outbox na
+    mesma transação; ao cancelar, o relay remove o evento do Google Calendar.
     """
     existing = await get_appointment(db, appointment_id)
 
@@ -333,7 +612,7 @@ async def update_appointment_status(
         )
 
     try:
-        response = (
+        response = await (
             db.table("appointments")
             .update({"status": data.status})
             .eq("id", appointment_id)
@@ -348,14 +627,19 @@ async def update_appointment_status(
 
         appointment = response.data[0]
 
-        if data.status == "canceled" and existing.google_event_id:
-            try:
-                await google_calendar.delete_event(existing.google_event_id)
-            except Exception as gcal_err:
-                logger.warning(f"Falha ao remover evento do Google Calendar: {gcal_err}")
+        await slot_cache.invalidate(
+            existing.professional_id,
+            [existing.start_time.astimezone(timezone.utc).date()],
+        )
 
         logger.info(f"Agendamento {appointment_id} → status: {data.status}")
-        return AppointmentResponse(**appointment)
+        updated = AppointmentResponse(**appointment)
+        await event_hub.publish(
+            existing.professional_id,
+            EVENT_APPOINTMENT_STATUS_CHANGED,
+            updated.model_dump(mode="json"),
+        )
+        return updated
 
     except HTTPException:
         raise
@@ -1,28 +1,73 @@
+import uuid
 from typing import List
 from datetime import datetime, timedelta
 from fastapi import HTTPException, status
-from app.core.supabase import supabase_admin
+from app.core.singleflight import SingleFlight
+from app.core.supabase import db_admin
 from app.schemas.appointments import AppointmentCreate, AppointmentResponse, TimeSlot, PublicProfile
+from app.services.profile_cache import NOT_FOUND, profile_cache
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+# Colunas de user_profiles expostas na página pública (PublicProfile)
+PUBLIC_PROFILE_COLUMNS = "id, full_name, avatar_url, public_slug"
+
+# Misses concorrentes do profile_cache para o mesmo slug → uma query
+_profile_flight = SingleFlight("public_profile")
+
+
+def _profile_lookup(slug: str) -> tuple[str, str, str]:
+    """
+    (coluna, valor, chave de cache) para buscar o perfil. O link
+    público atual é /book/:professional_id, então um UUID é aceito no
+    lugar do slug.
+    """
+    try:
+        professional_id = str(uuid.UUID(slug))
+    except ValueError:
+        return "public_slug", slug, slug
+    return "id", professional_id, f"id:{professional_id}"
+
+
+async def _load_public_profile(column: str, value: str, cache_key: str):
+    """Busca o perfil no banco e grava no cache (ou NOT_FOUND)."""
+    logger.info(f"Buscando perfil público: {column}={value}")
+    response = await (
+        db_admin.table("user_profiles")
+        .select(PUBLIC_PROFILE_COLUMNS)
+        .eq(column, value)
+        .limit(1)
+        .execute()
+    )
+    profile = response.data[0] if response.data else None
+    await profile_cache.set(cache_key, profile)
+    return profile if profile is not None else NOT_FOUND
+
+
 async def get_public_profile(slug: str) -> PublicProfile:
-    """Buscar perfil público do profissional pelo slug."""
+    """
+    Buscar perfil público do profissional pelo slug (ou pelo UUID).
+
+    Consulta o profile_cache antes do banco; slugs inexistentes também
+    ficam em cache (negativo), por um TTL menor.
+    """
+    column, value, cache_key = _profile_lookup(slug)
     try:
-        logger.info(f"Buscando perfil público para slug: {slug}")
-        
-        response = supabase_admin.table("user_profiles").select("*").eq("public_slug", slug).execute()
+        cached = await profile_cache.get(cache_key)
+        if cached is None:
+            cached = await _profile_flight.do(
+                cache_key, lambda: _load_public_profile(column, value, cache_key)
+            )
         
-        if not response.data:
+        if cached is NOT_FOUND:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Profissional não encontrado"
             )
         
-        profile = response.data[0]
-        return PublicProfile(**profile)
+        return PublicProfile(**cached)
         
     except HTTPException:
         raise
@@ -40,7 +85,7 @@ async def get_available_slots(service_id: str, date: str) -> List[TimeSlot]:
         logger.info(f"Buscando horários disponíveis para serviço {service_id} na data {date}")
         
         # Buscar informações do serviço
-        service_response = supabase_admin.table("services").select("duration_minutes").eq("id", service_id).execute()
+        service_response = await db_admin.table("services").select("duration_minutes").eq("id", service_id).execute()
         
         if not service_response.data:
             raise HTTPException(
@@ -54,7 +99,7 @@ async def get_available_slots(service_id: str, date: str) -> List[TimeSlot]:
         start_date = f"{date}T00:00:00"
         end_date = f"{date}T23:59:59"
         
-        appointments_response = supabase_admin.table("appointments").select("start_time, end_time").eq("service_id", service_id).gte("start_time", start_date).lte("start_time", end_date).eq("status", "confirmed").execute()
+        appointments_response = await db_admin.table("appointments").select("start_time, end_time").eq("service_id", service_id).gte("start_time", start_date).lte("start_time", end_date).eq("status", "confirmed").execute()
         
         existing_appointments = appointments_response.data
         
@@ -117,7 +162,7 @@ async def create_appointment(appointment_data: AppointmentCreate) -> Appointment
         logger.info(f"Criando agendamento para serviço {appointment_data.service_id}")
         
         # Verificar se o serviço existe
-        service_response = supabase_admin.table("services").select("id").eq("id", appointment_data.service_id).execute()
+        service_response = await db_admin.table("services").select("id").eq("id", appointment_data.service_id).execute()
         
         if not service_response.data:
             raise HTTPException(
@@ -126,7 +171,7 @@ async def create_appointment(appointment_data: AppointmentCreate) -> Appointment
             )
         
         # Verificar se o horário ainda está disponível
-        existing_appointment = supabase_admin.table("appointments").select("id").eq("service_id", appointment_data.service_id).eq("start_time", appointment_data.start_time.isoformat()).neq("status", "cancelled").execute()
+        existing_appointment = await db_admin.table("appointments").select("id").eq("service_id", appointment_data.service_id).eq("start_time", appointment_data.start_time.isoformat()).neq("status", "cancelled").execute()
         
         if existing_appointment.data:
             raise HTTPException(
@@ -145,7 +190,7 @@ async def create_appointment(appointment_data: AppointmentCreate) -> Appointment
         }
         
         # Inserir no banco
-        response = supabase_admin.table("appointments").insert(appointment_dict).execute()
+        response = await db_admin.table("appointments").insert(appointment_dict).execute()
         
         if not response.data:
             raise HTTPException(
@@ -179,7 +224,7 @@ async def confirm_payment(appointment_id: str, payment_intent_id: str) -> Appoin
             "stripe_payment_intent_id": payment_intent_id
         }
         
-        response = supabase_admin.table("appointments").update(update_data).eq("id", appointment_id).execute()
+        response = await db_admin.table("appointments").update(update_data).eq("id", appointment_id).execute()
         
         if not response.data:
             raise HTTPException(
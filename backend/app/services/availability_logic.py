@@ -6,18 +6,28 @@ Responsável por:
   2. Geração de slots de horário para a página pública
   3. Cruzamento com agendamentos existentes para marcar ocupados
 """
-from typing import List, Optional
+import asyncio
+from typing import Dict, List, Optional, Tuple, Union
+from bisect import bisect_left
 from datetime import date, datetime, time, timedelta, timezone
+from itertools import accumulate
 from fastapi import HTTPException, status
-from supabase import Client
+from postgrest import AsyncPostgrestClient
 
 from app.schemas.availability import (
     AvailabilityCreate,
     AvailabilityResponse,
-    TimeSlot,
+    SlotsCompactResponse,
+    SlotsRangeCompactResponse,
     SlotsResponse,
+    SlotsRangeResponse,
 )
-from app.core.supabase import supabase_admin
+from app.core.serialization import validate_rows
+from app.core.singleflight import SingleFlight
+from app.core.supabase import db_admin
+from app.services import slot_bitmap, slot_compact
+from app.services.busy_windows import busy_window_store
+from app.services.slot_cache import slot_cache
 
 import logging
 
@@ -26,6 +36,13 @@ logger = logging.getLogger(__name__)
 # Dias da semana em português (para logs legíveis)
 DIAS_SEMANA = ["Domingo", "Segunda", "Terça", "Quarta", "Quinta", "Sexta", "Sábado"]
 
+# Limite de dias por chamada no modo intervalo (start_date/end_date)
+MAX_RANGE_DAYS = 62
+
+# Coalescência das consultas públicas de slots idênticas e concorrentes
+_slots_flight = SingleFlight("slots")
+_slots_range_flight = SingleFlight("slots_range")
+
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # CRUD — Blocos de Disponibilidade (protegido, professor logado)
@@ -33,25 +50,25 @@ DIAS_SEMANA = ["Domingo", "Segunda", "Terça", "Quarta", "Quinta", "Sexta", "Sá
 
 
 async def list_availabilities(
-    db: Client,
+    db: AsyncPostgrestClient,
 ) -> List[AvailabilityResponse]:
     """Lista todos os blocos de disponibilidade do professor (RLS filtra)."""
     try:
-        response = (
+        response = await (
             db.table("availabilities")
             .select("*")
             .order("day_of_week")
             .order("start_time")
             .execute()
         )
-        return [AvailabilityResponse(**a) for a in response.data]
+        return validate_rows(AvailabilityResponse, response.data)
     except Exception as e:
         logger.error(f"Erro ao listar disponibilidades: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 async def create_availability(
-    db: Client,
+    db: AsyncPostgrestClient,
     data: AvailabilityCreate,
     user_id: str,
 ) -> AvailabilityResponse:
@@ -76,11 +93,13 @@ async def create_availability(
             "end_time": data.end_time,
             "is_active": True,
         }
-        response = db.table("availabilities").insert(row).execute()
+        response = await db.table("availabilities").insert(row).execute()
 
         if not response.data:
             raise HTTPException(status_code=500, detail="Erro ao criar disponibilidade.")
 
+        await slot_cache.invalidate(user_id)
+
         logger.info(
             f"Disponibilidade criada: {DIAS_SEMANA[data.day_of_week]} "
             f"{data.start_time}-{data.end_time} (user={user_id})"
@@ -101,7 +120,7 @@ async def create_availability(
 
 
 async def bulk_replace_availabilities(
-    db: Client,
+    db: AsyncPostgrestClient,
     blocks: List[AvailabilityCreate],
     user_id: str,
 ) -> List[AvailabilityResponse]:
@@ -110,58 +129,65 @@ async def bulk_replace_availabilities(
     Usado quando o professor salva toda sua configuração de expediente.
 
     Fluxo:
-      1. Deleta todos os blocos existentes do professor
-      2. Insere os novos blocos
+      1. Valida todos os blocos (nada é apagado se algum for inválido)
+      2. Deleta todos os blocos existentes do professor
+      3. Insere os novos blocos
+
+    O cache de slots é invalidado ao final mesmo em caso de erro: se o
+    delete passou e o insert falhou, o cache não pode mais refletir o banco.
     """
+    # 1. Validar antes de qualquer escrita
+    rows = []
+    for b in blocks:
+        start_parts = b.start_time.split(":")
+        end_parts = b.end_time.split(":")
+        start_t = time(int(start_parts[0]), int(start_parts[1]))
+        end_t = time(int(end_parts[0]), int(end_parts[1]))
+        if start_t >= end_t:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Bloco inválido: {b.start_time} >= {b.end_time}",
+            )
+        rows.append({
+            "user_id": user_id,
+            "day_of_week": b.day_of_week,
+            "start_time": b.start_time,
+            "end_time": b.end_time,
+            "is_active": True,
+        })
+
     try:
-        # 1. Deletar blocos existentes
-        db.table("availabilities").delete().eq("user_id", user_id).execute()
+        # 2. Deletar blocos existentes
+        await db.table("availabilities").delete().eq("user_id", user_id).execute()
 
-        if not blocks:
+        if not rows:
             return []
 
-        # 2. Inserir novos blocos
-        rows = []
-        for b in blocks:
-            start_parts = b.start_time.split(":")
-            end_parts = b.end_time.split(":")
-            start_t = time(int(start_parts[0]), int(start_parts[1]))
-            end_t = time(int(end_parts[0]), int(end_parts[1]))
-            if start_t >= end_t:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Bloco inválido: {b.start_time} >= {b.end_time}",
-                )
-            rows.append({
-                "user_id": user_id,
-                "day_of_week": b.day_of_week,
-                "start_time": b.start_time,
-                "end_time": b.end_time,
-                "is_active": True,
-            })
-
-        response = db.table("availabilities").insert(rows).execute()
+        # 3. Inserir novos blocos
+        response = await db.table("availabilities").insert(rows).execute()
 
         if not response.data:
             raise HTTPException(status_code=500, detail="Erro ao salvar disponibilidades.")
 
         logger.info(f"Expediente atualizado: {len(rows)} blocos (user={user_id})")
-        return [AvailabilityResponse(**a) for a in response.data]
+        return validate_rows(AvailabilityResponse, response.data)
 
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Erro ao substituir disponibilidades: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        await slot_cache.invalidate(user_id)
 
 
 async def delete_availability(
-    db: Client,
+    db: AsyncPostgrestClient,
     availability_id: str,
 ) -> dict:
     """Remove um bloco de disponibilidade."""
     try:
-        response = (
+        response = await (
             db.table("availabilities")
             .delete()
             .eq("id", availability_id)
@@ -172,6 +198,7 @@ async def delete_availability(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Bloco de disponibilidade não encontrado.",
             )
+        await slot_cache.invalidate(response.data[0]["user_id"])
         return {"message": "Disponibilidade removida com sucesso."}
     except HTTPException:
         raise
@@ -191,36 +218,20 @@ def _parse_time(t: str) -> time:
     return time(int(parts[0]), int(parts[1]))
 
 
-async def get_available_slots(
-    professional_id: str,
-    target_date: date,
-    service_id: str,
-) -> SlotsResponse:
+def _db_day_of_week(target_date: date) -> int:
     """
-    Gera a lista de slots para um dia específico.
-
-    Algoritmo:
-      1. Busca a duração do serviço na tabela services
-      2. Busca os blocos de disponibilidade do professor para o dia da semana
-      3. Busca os agendamentos existentes (não cancelados) do dia
-      4. Gera slots de N minutos dentro de cada bloco
-      5. Marca como indisponível os que conflitam com agendamentos existentes
-
-    Returns:
-        SlotsResponse com a lista de TimeSlot
+    Converte a data para o day_of_week usado no banco.
+    Python: isoweekday() retorna 1=seg..7=dom; convertemos para 0=dom..6=sab
     """
-    # 0. Validar que a data não é passada
-    today = date.today()
-    if target_date < today:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Não é possível buscar slots para datas passadas.",
-        )
+    py_weekday = target_date.isoweekday()  # 1=seg, 7=dom
+    return 0 if py_weekday == 7 else py_weekday  # 0=dom, 1=seg..6=sab
 
-    # 1. Buscar duração do serviço
+
+async def _fetch_service_duration(service_id: str) -> int:
+    """Busca a duração (em minutos) do serviço."""
     try:
-        svc_response = (
-            supabase_admin.table("services")
+        svc_response = await (
+            db_admin.table("services")
             .select("duration_minutes")
             .eq("id", service_id)
             .limit(1)
@@ -231,66 +242,112 @@ async def get_available_slots(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Serviço não encontrado.",
             )
-        duration_minutes = svc_response.data[0]["duration_minutes"]
+        return svc_response.data[0]["duration_minutes"]
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Erro ao buscar serviço: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-    # 2. Buscar disponibilidade do professor para o dia da semana
-    # Python: isoweekday() retorna 1=seg..7=dom; convertemos para 0=dom..6=sab
-    py_weekday = target_date.isoweekday()  # 1=seg, 7=dom
-    db_day_of_week = 0 if py_weekday == 7 else py_weekday  # 0=dom, 1=seg..6=sab
 
+async def _fetch_availability_blocks(
+    professional_id: str,
+    days_of_week: List[int],
+) -> List[dict]:
+    """Busca os blocos ativos do professor para os dias da semana informados."""
     try:
-        avail_response = (
-            supabase_admin.table("availabilities")
-            .select("start_time, end_time")
+        query = (
+            db_admin.table("availabilities")
+            .select("day_of_week, start_time, end_time")
             .eq("user_id", professional_id)
-            .eq("day_of_week", db_day_of_week)
             .eq("is_active", True)
-            .order("start_time")
-            .execute()
         )
+        if len(days_of_week) == 1:
+            query = query.eq("day_of_week", days_of_week[0])
+        elif len(days_of_week) < 7:
+            query = query.in_("day_of_week", days_of_week)
+
+        avail_response = await query.order("start_time").execute()
+        return avail_response.data or []
     except Exception as e:
         logger.error(f"Erro ao buscar disponibilidade: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-    # Se não tem disponibilidade nesse dia, retornar vazio
-    if not avail_response.data:
-        return SlotsResponse(
-            date=target_date.isoformat(),
-            professional_id=professional_id,
-            service_duration_minutes=duration_minutes,
-            slots=[],
-        )
 
-    # 3. Buscar agendamentos existentes do dia (não cancelados)
-    day_start_utc = datetime.combine(target_date, time.min, tzinfo=timezone.utc)
-    day_end_utc = datetime.combine(target_date, time.max, tzinfo=timezone.utc)
+async def _fetch_booked(
+    professional_id: str,
+    start_date: date,
+    end_date: date,
+) -> Optional[List[dict]]:
+    """
+    Busca os agendamentos (não cancelados) que começam no intervalo de datas.
+
+    Returns:
+        A lista de agendamentos, ou None se a query falhar — nesse caso
+        o motor segue sem marcar ocupados, mas o resultado não é cacheado.
+    """
+    range_start_utc = datetime.combine(start_date, time.min, tzinfo=timezone.utc)
+    range_end_utc = datetime.combine(end_date, time.max, tzinfo=timezone.utc)
 
     try:
-        booked_response = (
-            supabase_admin.table("appointments")
+        booked_response = await (
+            db_admin.table("appointments")
             .select("start_time, end_time")
             .eq("professional_id", professional_id)
             .neq("status", "canceled")
             .neq("status", "cancelled")
-            .gte("start_time", day_start_utc.isoformat())
-            .lte("start_time", day_end_utc.isoformat())
+            .gte("start_time", range_start_utc.isoformat())
+            .lte("start_time", range_end_utc.isoformat())
             .execute()
         )
-        booked = booked_response.data or []
+        return booked_response.data or []
     except Exception as e:
-        logger.error(f"Erro ao buscar agendamentos do dia: {e}")
-        booked = []
+        logger.error(f"Erro ao buscar agendamentos do período: {e}")
+        return None
+
+
+def _parse_booked(booked: List[dict]) -> List[Tuple[datetime, datetime]]:
+    """Converte os agendamentos em intervalos (início, fim), ordenados pelo início."""
+    intervals = [
+        (datetime.fromisoformat(b["start_time"]), datetime.fromisoformat(b["end_time"]))
+        for b in booked
+    ]
+    intervals.sort()
+    return intervals
+
 
-    # 4. Gerar slots de N minutos dentro de cada bloco de disponibilidade
-    slots: list[TimeSlot] = []
+def _build_day_slots(
+    target_date: date,
+    blocks: List[dict],
+    booked: List[Tuple[datetime, datetime]],
+    duration_minutes: int,
+) -> List[dict]:
+    """
+    Gera todos os slots de N minutos de um dia, em memória.
+
+    Detecção de conflito por varredura ordenada: os agendamentos chegam
+    já parseados e ordenados pelo início; com o máximo acumulado dos fins,
+    cada slot é resolvido com um bisect — O(slots · log agendamentos)
+    em vez de O(slots × agendamentos).
+
+    Não remove os horários que já passaram (ver _drop_past_slots), para
+    que o resultado possa ser cacheado durante o dia.
+
+    Args:
+        blocks: blocos de disponibilidade do dia da semana (ordenados por start_time)
+        booked: intervalos (início, fim) dos agendamentos do dia, vindos de _parse_booked
+
+    Returns:
+        Lista de dicts {start, end, available} no formato de TimeSlot.
+    """
+    slots: list[dict] = []
     duration = timedelta(minutes=duration_minutes)
 
-    for block in avail_response.data:
+    booked_starts = [b_start for b_start, _ in booked]
+    # max_ends[i] = maior fim entre os agendamentos booked[0..i]
+    max_ends = list(accumulate((b_end for _, b_end in booked), max))
+
+    for block in blocks:
         block_start = _parse_time(block["start_time"])
         block_end = _parse_time(block["end_time"])
 
@@ -300,39 +357,457 @@ async def get_available_slots(
         while cursor + duration <= block_end_dt:
             slot_start = cursor
             slot_end = cursor + duration
+            cursor += duration
 
-            # Verificar conflito com agendamentos existentes
-            is_free = True
-            for b in booked:
-                b_start = datetime.fromisoformat(b["start_time"])
-                b_end = datetime.fromisoformat(b["end_time"])
-                # Overlap: A.start < B.end AND A.end > B.start
-                if slot_start < b_end and slot_end > b_start:
-                    is_free = False
-                    break
-
-            # Se é hoje, não mostrar slots que já passaram
-            now_utc = datetime.now(timezone.utc)
-            if target_date == today and slot_start <= now_utc:
-                cursor += duration
-                continue
-
-            slots.append(TimeSlot(
-                start=slot_start.isoformat(),
-                end=slot_end.isoformat(),
-                available=is_free,
-            ))
+            # Overlap: A.start < B.end AND A.end > B.start
+            # Agendamentos com início < fim do slot são booked[0..idx-1];
+            # há conflito se o maior fim entre eles passa do início do slot.
+            idx = bisect_left(booked_starts, slot_end)
+            is_free = idx == 0 or max_ends[idx - 1] <= slot_start
 
-            cursor += duration
+            slots.append({
+                "start": slot_start.isoformat(),
+                "end": slot_end.isoformat(),
+                "available": is_free,
+            })
+
+    return slots
+
+
+def _group_booked(
+    booked: List[dict],
+) -> Dict[date, List[Tuple[datetime, datetime]]]:
+    """
+    Parseia os agendamentos uma única vez e agrupa pelo dia (UTC) de
+    início — cada grupo continua ordenado.
+    """
+    booked_by_date: Dict[date, List[Tuple[datetime, datetime]]] = {}
+    for interval in _parse_booked(booked):
+        b_date = interval[0].astimezone(timezone.utc).date()
+        booked_by_date.setdefault(b_date, []).append(interval)
+    return booked_by_date
+
+
+def _add_busy_windows(
+    booked_by_date: Dict[date, List[Tuple[datetime, datetime]]],
+    windows: Optional[List[Tuple[datetime, datetime]]],
+    days: List[date],
+) -> Dict[date, List[Tuple[datetime, datetime]]]:
+    """
+    Soma às ocupações de cada dia as janelas ocupadas do Google Calendar
+    (busy_windows), recortadas nos limites do dia UTC — uma janela pode
+    atravessar a meia-noite ou durar vários dias. Cada grupo continua
+    ordenado, como _build_day_slots e o motor bitmap esperam.
+    """
+    if not windows:
+        return booked_by_date
+    for d in days:
+        day_start = datetime.combine(d, time.min, tzinfo=timezone.utc)
+        day_end = day_start + timedelta(days=1)
+        clipped = [
+            (max(w_start, day_start), min(w_end, day_end))
+            for w_start, w_end in windows
+            if w_start < day_end and w_end > day_start
+        ]
+        if clipped:
+            booked_by_date[d] = sorted(booked_by_date.get(d, []) + clipped)
+    return booked_by_date
+
+
+def _generate_slots(
+    days: List[date],
+    blocks_by_weekday: Dict[int, List[dict]],
+    booked_by_date: Dict[date, List[Tuple[datetime, datetime]]],
+    duration_minutes: int,
+    engine: str,
+) -> Dict[date, List[dict]]:
+    """
+    Gera os slots de cada dia com o motor escolhido.
+
+    Motores:
+      - "loop":   _build_day_slots, dia a dia (padrão)
+      - "bitmap": slot_bitmap.build_slots, vetorizado com NumPy
+    Ambos produzem a mesma saída.
+    """
+    if engine == "bitmap":
+        if slot_bitmap.AVAILABLE:
+            return slot_bitmap.build_slots(
+                days, blocks_by_weekday, booked_by_date, duration_minutes, _db_day_of_week
+            )
+        logger.warning("NumPy não instalado — usando o motor de slots em laço.")
+
+    return {
+        d: _build_day_slots(
+            d,
+            blocks_by_weekday.get(_db_day_of_week(d), []),
+            booked_by_date.get(d, []),
+            duration_minutes,
+        )
+        for d in days
+    }
+
+
+def _cancel_pending(*tasks: asyncio.Task) -> None:
+    """
+    Cancela as tasks especulativas que ainda não terminaram e consome o
+    erro das que já falharam (evita "Task exception was never retrieved").
+    """
+    for task in tasks:
+        if not task.done():
+            task.cancel()
+        elif not task.cancelled():
+            task.exception()
+
+
+async def _fetch_slot_inputs(
+    professional_id: str,
+    days_of_week: List[int],
+    start_date: date,
+    end_date: date,
+) -> Tuple[Optional[int], List[dict], Optional[List[dict]]]:
+    """
+    Lê a geração do cache de slots e, só depois, busca blocos e
+    agendamentos em paralelo. A ordem importa: uma invalidação posterior
+    à leitura impede que slot_cache.set grave o resultado.
+
+    Returns:
+        (geração, blocos, agendamentos)
+    """
+    generation = await slot_cache.generation(professional_id)
+    blocks, booked = await asyncio.gather(
+        _fetch_availability_blocks(professional_id, days_of_week),
+        _fetch_booked(professional_id, start_date, end_date),
+    )
+    return generation, blocks, booked
+
+
+def start_range_prefetch(
+    professional_id: str,
+    start_date: date,
+    end_date: date,
+) -> asyncio.Task:
+    """
+    Dispara, antes de conhecer o serviço, as queries de blocos e de
+    agendamentos de um intervalo (especulativas, como em
+    get_available_slots). Repasse a task a get_available_slots_range
+    (prefetch=...) e chame cancel_range_prefetch ao final.
+    """
+    num_days = (end_date - start_date).days + 1
+    weekdays = sorted({_db_day_of_week(start_date + timedelta(days=i)) for i in range(min(num_days, 7))})
+    return asyncio.create_task(
+        _fetch_slot_inputs(professional_id, weekdays, start_date, end_date)
+    )
+
+
+def cancel_range_prefetch(prefetch: asyncio.Task) -> None:
+    """Cancela as queries especulativas de start_range_prefetch que sobraram."""
+    _cancel_pending(prefetch)
+
+
+def _drop_past_slots(
+    slots: List[dict],
+    target_date: date,
+    today: date,
+    now_utc: datetime,
+) -> List[dict]:
+    """Se é hoje, não mostrar slots que já passaram."""
+    if target_date != today:
+        return slots
+    return [s for s in slots if datetime.fromisoformat(s["start"]) > now_utc]
 
-    logger.info(
-        f"Slots gerados: {len(slots)} slots para {target_date} "
-        f"({DIAS_SEMANA[db_day_of_week]}) | prof={professional_id}"
+
+async def get_available_slots(
+    professional_id: str,
+    target_date: date,
+    service_id: str,
+    engine: str = "loop",
+    compact: bool = False,
+) -> Union[SlotsResponse, SlotsCompactResponse]:
+    """
+    Slots de um dia, com coalescência: requisições concorrentes para o
+    mesmo (profissional, dia, serviço) compartilham uma única execução
+    de _compute_available_slots.
+
+    Args:
+        compact: formato compacto (grade + bitmaps, ver slot_compact)
+    """
+    duration_minutes, slots = await _slots_flight.do(
+        (professional_id, target_date, service_id, engine),
+        lambda: _compute_available_slots(professional_id, target_date, service_id, engine),
     )
 
+    if compact:
+        return SlotsCompactResponse(
+            professional_id=professional_id,
+            service_duration_minutes=duration_minutes,
+            **slot_compact.encode_day(target_date, slots, duration_minutes),
+        )
     return SlotsResponse(
         date=target_date.isoformat(),
         professional_id=professional_id,
         service_duration_minutes=duration_minutes,
         slots=slots,
     )
+
+
+async def _compute_available_slots(
+    professional_id: str,
+    target_date: date,
+    service_id: str,
+    engine: str = "loop",
+) -> Tuple[int, List[dict]]:
+    """
+    Gera a lista de slots para um dia específico.
+
+    Algoritmo:
+      1. Dispara em paralelo as três queries independentes: duração do
+         serviço, blocos de disponibilidade do dia da semana e
+         agendamentos (não cancelados) do dia
+      2. Com a duração, consulta o cache de slots (profissional, dia,
+         duração) — num hit, as outras duas queries são canceladas
+      3. Em caso de miss: aguarda blocos e agendamentos
+      4. Gera slots de N minutos dentro de cada bloco
+      5. Marca como indisponível os que conflitam com agendamentos
+         existentes ou com as janelas ocupadas do Google Calendar
+         (busy_windows, da memória — sem chamada ao Google por visitante)
+
+    A latência de um miss fica próxima à da query mais lenta, não à soma
+    das três. Erros seguem a ordem das dependências: serviço inexistente
+    (404) prevalece sobre falha ao buscar os blocos (500).
+
+    Args:
+        engine: motor de geração ("loop" ou "bitmap"), ver _generate_slots
+
+    Returns:
+        (duração do serviço, slots do dia como dicts start/end/available)
+    """
+    # 0. Validar que a data não é passada
+    today = date.today()
+    if target_date < today:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Não é possível buscar slots para datas passadas.",
+        )
+
+    # 1. Queries independentes em paralelo
+    db_day_of_week = _db_day_of_week(target_date)
+    duration_task = asyncio.create_task(_fetch_service_duration(service_id))
+    inputs_task = asyncio.create_task(
+        _fetch_slot_inputs(professional_id, [db_day_of_week], target_date, target_date)
+    )
+    busy_task = asyncio.create_task(busy_window_store.get(professional_id, target_date))
+
+    try:
+        # As janelas antes do cache: uma renovação que as altere invalida os slots
+        duration_minutes, busy = await asyncio.gather(duration_task, busy_task)
+
+        # 2. Cache
+        day_slots = await slot_cache.get(professional_id, target_date, duration_minutes)
+
+        # 3. Blocos e agendamentos (já em andamento)
+        if day_slots is None:
+            generation, blocks, booked = await inputs_task
+    finally:
+        _cancel_pending(inputs_task, busy_task)
+
+    if day_slots is None:
+        # 4/5. Gerar slots e cruzar com agendamentos e janelas do Google
+        day_slots = _generate_slots(
+            [target_date],
+            {db_day_of_week: blocks},
+            _add_busy_windows(_group_booked(booked or []), busy, [target_date]),
+            duration_minutes,
+            engine,
+        )[target_date]
+        if (
+            booked is not None
+            and busy is not None
+            and busy_window_store.is_current(professional_id, busy, target_date)
+        ):
+            await slot_cache.set(
+                professional_id, target_date, duration_minutes, day_slots, generation
+            )
+
+        logger.info(
+            f"Slots gerados ({engine}): {len(day_slots)} slots para {target_date} "
+            f"({DIAS_SEMANA[db_day_of_week]}) | prof={professional_id}"
+        )
+
+    slots = _drop_past_slots(day_slots, target_date, today, datetime.now(timezone.utc))
+    return duration_minutes, slots
+
+
+async def get_available_slots_range(
+    professional_id: str,
+    start_date: date,
+    end_date: date,
+    service_id: str,
+    engine: str = "loop",
+    duration_minutes: Optional[int] = None,
+    prefetch: Optional[asyncio.Task] = None,
+    compact: bool = False,
+) -> Union[SlotsRangeResponse, SlotsRangeCompactResponse]:
+    """
+    Slots de um intervalo, com coalescência de requisições idênticas
+    concorrentes (exceto com prefetch: a task pertence ao chamador).
+
+    Args:
+        compact: formato compacto — sem um TimeSlot por slot; para grades
+            largas, corta a serialização e os bytes em uma ordem de grandeza
+    """
+    if prefetch is not None:
+        duration_minutes, slots_by_date = await _compute_available_slots_range(
+            professional_id, start_date, end_date, service_id, engine,
+            duration_minutes=duration_minutes, prefetch=prefetch,
+        )
+    else:
+        duration_minutes, slots_by_date = await _slots_range_flight.do(
+            (professional_id, start_date, end_date, service_id, engine, duration_minutes),
+            lambda: _compute_available_slots_range(
+                professional_id, start_date, end_date, service_id, engine,
+                duration_minutes=duration_minutes,
+            ),
+        )
+
+    if compact:
+        return SlotsRangeCompactResponse(
+            start_date=start_date.isoformat(),
+            end_date=end_date.isoformat(),
+            professional_id=professional_id,
+            service_duration_minutes=duration_minutes,
+            days=[
+                slot_compact.encode_day(d, slots, duration_minutes)
+                for d, slots in slots_by_date.items()
+            ],
+        )
+
+    return SlotsRangeResponse(
+        start_date=start_date.isoformat(),
+        end_date=end_date.isoformat(),
+        professional_id=professional_id,
+        service_duration_minutes=duration_minutes,
+        days=[
+            SlotsResponse(
+                date=d.isoformat(),
+                professional_id=professional_id,
+                service_duration_minutes=duration_minutes,
+                slots=slots,
+            )
+            for d, slots in slots_by_date.items()
+        ],
+    )
+
+
+async def _compute_available_slots_range(
+    professional_id: str,
+    start_date: date,
+    end_date: date,
+    service_id: str,
+    engine: str = "loop",
+    duration_minutes: Optional[int] = None,
+    prefetch: Optional[asyncio.Task] = None,
+) -> Tuple[int, Dict[date, List[dict]]]:
+    """
+    Gera os slots de todos os dias de um intervalo [start_date, end_date].
+
+    Em vez de repetir as três queries por dia, carrega tudo em lote:
+      1. Duração do serviço (1 query)
+      2. Blocos de disponibilidade de todos os dias da semana envolvidos (1 query)
+      3. Agendamentos não cancelados do intervalo inteiro (1 query)
+
+    Depois gera os slots de cada dia em memória, descontando também as
+    janelas ocupadas do Google Calendar (busy_windows, da memória). Uma
+    visão mensal custa 3 queries, não 90. Dias já presentes no cache de slots não entram
+    nas queries 2 e 3 (executadas em paralelo); se todos estiverem em
+    cache, só a 1 é executada.
+
+    Args:
+        duration_minutes: duração já conhecida (dispensa a query 1)
+        prefetch: queries 2 e 3 já disparadas para o intervalo inteiro
+            (start_range_prefetch); o chamador a cancela se sobrar
+
+    Returns:
+        (duração do serviço, {dia: slots do dia}) na ordem dos dias
+    """
+    today = date.today()
+    if start_date < today:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Não é possível buscar slots para datas passadas.",
+        )
+    if end_date < start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date deve ser igual ou posterior a start_date.",
+        )
+
+    num_days = (end_date - start_date).days + 1
+    if num_days > MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"O intervalo máximo é de {MAX_RANGE_DAYS} dias.",
+        )
+
+    days = [start_date + timedelta(days=i) for i in range(num_days)]
+
+    # 1. Duração do serviço e janelas ocupadas do Google (antes do cache:
+    #    uma renovação que as altere invalida os slots)
+    busy_task = asyncio.create_task(busy_window_store.get(professional_id, end_date))
+    try:
+        if duration_minutes is None:
+            duration_minutes = await _fetch_service_duration(service_id)
+        busy = await busy_task
+    finally:
+        _cancel_pending(busy_task)
+
+    # Dias já em cache
+    cached_days = await asyncio.gather(
+        *(slot_cache.get(professional_id, d, duration_minutes) for d in days)
+    )
+    slots_by_date: dict[date, List[dict]] = {
+        d: cached for d, cached in zip(days, cached_days) if cached is not None
+    }
+
+    missing = [d for d in days if d not in slots_by_date]
+    if missing:
+        # 2/3. Blocos dos dias da semana que faltam e agendamentos do
+        #      intervalo que falta, em paralelo
+        if prefetch is not None:
+            generation, blocks, booked = await prefetch
+        else:
+            weekdays = sorted({_db_day_of_week(d) for d in missing})
+            generation, blocks, booked = await _fetch_slot_inputs(
+                professional_id, weekdays, missing[0], missing[-1]
+            )
+        blocks_by_weekday: dict[int, list[dict]] = {}
+        for block in blocks:
+            blocks_by_weekday.setdefault(block["day_of_week"], []).append(block)
+
+        # 4. Gerar os slots de cada dia em memória
+        booked_by_date = _add_busy_windows(_group_booked(booked or []), busy, missing)
+        generated = _generate_slots(
+            missing, blocks_by_weekday, booked_by_date, duration_minutes, engine
+        )
+        cacheable = (
+            booked is not None
+            and busy is not None
+            and busy_window_store.is_current(professional_id, busy, end_date)
+        )
+        total_slots = 0
+        for d, day_slots in generated.items():
+            slots_by_date[d] = day_slots
+            total_slots += len(day_slots)
+            if cacheable:
+                await slot_cache.set(
+                    professional_id, d, duration_minutes, day_slots, generation
+                )
+
+        logger.info(
+            f"Slots gerados ({engine}): {total_slots} slots entre {missing[0]} e {missing[-1]} "
+            f"({len(missing)} dias fora do cache) | prof={professional_id}"
+        )
+
+    now_utc = datetime.now(timezone.utc)
+    return duration_minutes, {
+        d: _drop_past_slots(slots_by_date[d], d, today, now_utc) for d in days
+    }
@@ -0,0 +1,272 @@
+"""
+Janelas ocupadas do Google Calendar por profissional (FreeBusy), em cache.
+
+O motor de slots só enxergava os agendamentos do próprio AgendaPro: um
+compromisso marcado direto no Google aparecia como horário livre na
+página pública. Consultar o Google a cada visitante, por outro lado,
+colocaria uma chamada externa no caminho de toda requisição de slots.
+
+O store guarda, por profissional, as janelas ocupadas de um horizonte
+móvel (hoje + busy_windows_horizon_days), obtidas numa única consulta
+FreeBusy:
+
+  - entrada fresca (até busy_windows_ttl_seconds): servida da memória
+  - entrada vencida: servida assim mesmo, com renovação em background
+    (stale-while-revalidate) — o visitante nunca espera pelo Google
+  - sem entrada (primeira consulta do profissional): a busca é
+    aguardada por até busy_windows_fetch_timeout_seconds; se falhar ou
+    demorar, retorna None e o motor segue sem as janelas — sem cachear
+    o resultado
+  - buscas concorrentes do mesmo profissional são single-flight
+  - dia além do horizonte: retorna None (janelas desconhecidas), e os
+    slots desse intervalo não são cacheados
+  - profissional sem Google conectado: lista vazia, também cacheada
+
+Quando uma renovação traz janelas diferentes das anteriores, o cache de
+slots do profissional é invalidado (app/services/slot_cache.py).
+
+Testes: com GOOGLE_FREEBUSY_URL configurado, a consulta vai para esse
+endpoint (ex.: um servidor FreeBusy falso local) em vez do Google, sem
+credenciais — POST com o corpo da API FreeBusy, usando o professional_id
+como id do calendário:
+
+    {"timeMin": ..., "timeMax": ..., "items": [{"id": "<professional_id>"}]}
+    → {"calendars": {"<professional_id>": {"busy": [{"start": ..., "end": ...}]}}}
+"""
+import asyncio
+import time
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from typing import List, NamedTuple, Optional, Set, Tuple
+
+import httpx
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.singleflight import SingleFlight
+from app.services.google_calendar_service import google_calendar_service, parse_freebusy
+from app.services.slot_cache import slot_cache
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+Window = Tuple[datetime, datetime]
+
+
+class _Entry(NamedTuple):
+    windows: List[Window]
+    fetched_at: float        # time.monotonic() da busca
+    horizon_end: datetime    # janelas conhecidas até aqui
+
+
+def _covers(entry: _Entry, last_day: date) -> bool:
+    """O horizonte da entrada cobre o dia inteiro last_day (UTC)?"""
+    day_end = datetime.combine(last_day + timedelta(days=1), dt_time.min, tzinfo=timezone.utc)
+    return day_end <= entry.horizon_end
+
+
+def _merge_windows(windows: List[Window]) -> List[Window]:
+    """Ordena e funde janelas sobrepostas ou contíguas."""
+    merged: List[Window] = []
+    for start, end in sorted(windows):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class BusyWindowStore:
+    """Janelas ocupadas (FreeBusy) por profissional, com TTL e horizonte."""
+
+    def __init__(
+        self,
+        ttl_seconds: int,
+        horizon_days: int,
+        fetch_timeout_seconds: float,
+        max_entries: int,
+        enabled: bool = True,
+    ):
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.horizon_days = horizon_days
+        self.fetch_timeout_seconds = fetch_timeout_seconds
+        # A entrada sobrevive além do TTL para ser servida enquanto renova;
+        # sem uso por 10 TTLs, sai do cache
+        self._entries = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds * 10)
+        self._flight = SingleFlight("busy_windows")
+        self._background: Set[asyncio.Task] = set()
+
+        self.fetches = 0
+        self.fetch_errors = 0
+        self.fetch_timeouts = 0
+        self.stale_served = 0
+        self.changes = 0
+        self.beyond_horizon = 0
+
+    # ── Leitura ─────────────────────────────────────────────
+
+    async def get(self, professional_id: str, last_day: date) -> Optional[List[Window]]:
+        """
+        Janelas ocupadas do profissional (UTC, ordenadas e fundidas) para
+        consultas que vão até last_day. None se não foi possível obtê-las
+        a tempo ou se last_day passa do horizonte — nos dois casos os slots
+        calculados não podem ir para o cache.
+        """
+        if not self.enabled:
+            return []
+
+        entry: Optional[_Entry] = self._entries.get(professional_id)
+        if entry is not None:
+            if time.monotonic() - entry.fetched_at >= self.ttl_seconds:
+                self.stale_served += 1
+                self._refresh_in_background(professional_id)
+            if not _covers(entry, last_day):
+                self.beyond_horizon += 1
+                return None
+            return entry.windows
+
+        try:
+            windows = await asyncio.wait_for(
+                self._flight.do(professional_id, lambda: self._refresh(professional_id)),
+                timeout=self.fetch_timeout_seconds,
+            )
+        except asyncio.TimeoutError:
+            # A busca continua em background e preenche o cache
+            self.fetch_timeouts += 1
+            logger.warning(f"FreeBusy demorou demais (prof={professional_id}); slots sem o Google")
+            return None
+        except Exception as e:
+            logger.warning(f"Falha ao buscar FreeBusy (prof={professional_id}): {e}")
+            return None
+
+        entry = self._entries.get(professional_id)
+        if entry is None or not _covers(entry, last_day):
+            self.beyond_horizon += 1
+            return None
+        return windows
+
+    def is_current(
+        self, professional_id: str, windows: List[Window], last_day: date
+    ) -> bool:
+        """
+        As janelas lidas por get() ainda são as vigentes até last_day? Quem
+        calculou slots com elas confere antes de gravá-los no cache: uma
+        renovação concluída no meio do cálculo já invalidou os slots, e
+        gravar o resultado antigo desfaria essa invalidação.
+        """
+        if not self.enabled:
+            return True
+        entry: Optional[_Entry] = self._entries.get(professional_id)
+        return (
+            entry is not None
+            and entry.windows == windows
+            and _covers(entry, last_day)
+        )
+
+    def _refresh_in_background(self, professional_id: str) -> None:
+        task = asyncio.ensure_future(
+            self._flight.do(professional_id, lambda: self._refresh(professional_id))
+        )
+        self._background.add(task)
+        task.add_done_callback(self._background_done)
+
+    def _background_done(self, task: asyncio.Task) -> None:
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Falha ao renovar FreeBusy em background: {task.exception()}")
+
+    # ── Busca ───────────────────────────────────────────────
+
+    async def _refresh(self, professional_id: str) -> List[Window]:
+        """Busca o horizonte inteiro e invalida os slots se algo mudou."""
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        horizon_end = today + timedelta(days=self.horizon_days)
+
+        self.fetches += 1
+        try:
+            windows = _merge_windows(await self._fetch(professional_id, today, horizon_end))
+        except Exception:
+            self.fetch_errors += 1
+            raise
+
+        previous: Optional[_Entry] = self._entries.get(professional_id)
+        self._entries.set(professional_id, _Entry(windows, time.monotonic(), horizon_end))
+
+        if (previous.windows if previous is not None else []) != windows:
+            self.changes += 1
+            await slot_cache.invalidate(professional_id)
+            logger.info(
+                f"Janelas ocupadas do Google alteradas (prof={professional_id}): "
+                f"{len(windows)} janela(s) até {horizon_end.date()}"
+            )
+        return windows
+
+    async def _fetch(
+        self, professional_id: str, time_min: datetime, time_max: datetime
+    ) -> List[Window]:
+        if settings.google_freebusy_url:
+            return await self._fetch_from_url(professional_id, time_min, time_max)
+        windows = await google_calendar_service.get_busy_windows(
+            professional_id, time_min, time_max
+        )
+        # None = Google não conectado: nada a subtrair
+        return windows or []
+
+    async def _fetch_from_url(
+        self, professional_id: str, time_min: datetime, time_max: datetime
+    ) -> List[Window]:
+        """FreeBusy num endpoint configurável (servidor falso em testes)."""
+        body = {
+            "timeMin": time_min.isoformat(),
+            "timeMax": time_max.isoformat(),
+            "items": [{"id": professional_id}],
+        }
+        async with httpx.AsyncClient(timeout=self.fetch_timeout_seconds) as client:
+            response = await client.post(settings.google_freebusy_url, json=body)
+        response.raise_for_status()
+        return parse_freebusy(response.json(), professional_id)
+
+    # ── Invalidação ─────────────────────────────────────────
+
+    async def invalidate(self, professional_id: str) -> None:
+        """Descarta as janelas (Google conectado/desconectado) e os slots derivados."""
+        self._entries.delete(professional_id)
+        await slot_cache.invalidate(professional_id)
+
+    # ── Ciclo de vida ───────────────────────────────────────
+
+    async def stop(self) -> None:
+        """Cancela as renovações em background (chamado no shutdown)."""
+        for task in list(self._background):
+            task.cancel()
+        await asyncio.gather(*self._background, return_exceptions=True)
+
+    # ── Métricas ────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "source": "url" if settings.google_freebusy_url else "google",
+            "horizon_days": self.horizon_days,
+            "fresh_ttl_seconds": self.ttl_seconds,
+            "fetches": self.fetches,
+            "fetch_errors": self.fetch_errors,
+            "fetch_timeouts": self.fetch_timeouts,
+            "stale_served": self.stale_served,
+            "changes": self.changes,
+            "beyond_horizon": self.beyond_horizon,
+            "refreshing": len(self._background),
+            "entries": len(self._entries),
+        }
+
+
+# Instância singleton para uso em toda a aplicação
+busy_window_store = BusyWindowStore(
+    ttl_seconds=settings.busy_windows_ttl_seconds,
+    horizon_days=settings.busy_windows_horizon_days,
+    fetch_timeout_seconds=settings.busy_windows_fetch_timeout_seconds,
+    max_entries=settings.busy_windows_max_entries,
+    enabled=settings.busy_windows_enabled,
+)
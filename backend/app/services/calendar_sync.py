@@ -0,0 +1,88 @@
+"""
+Sincronização de agendamentos com o Google Calendar (em background).
+
+As rotas não esperam pela API do Google: o banco grava uma linha no
+outbox na mesma transação do agendamento (database/migrations/06) e os
+handlers abaixo rodam no relay do outbox (app.services.outbox), com
+retries e backoff.
+
+O google_event_id é gravado de volta no agendamento pelo próprio handler.
+"""
+import logging
+
+from app.core.supabase import db_admin
+from app.integrations.google_calendar import google_calendar
+from app.services.outbox import outbox_relay
+
+logger = logging.getLogger(__name__)
+
+TOPIC_APPOINTMENT_CREATED = "appointment.created"
+TOPIC_APPOINTMENT_STATUS_CHANGED = "appointment.status_changed"
+
+
+async def _fetch_appointment(appointment_id: str) -> dict | None:
+    response = await (
+        db_admin.table("appointments")
+        .select("id, status, google_event_id")
+        .eq("id", appointment_id)
+        .limit(1)
+        .execute()
+    )
+    return response.data[0] if response.data else None
+
+
+@outbox_relay.register(TOPIC_APPOINTMENT_CREATED)
+async def sync_create_event(payload: dict) -> None:
+    """Cria o evento no Google Calendar e grava o google_event_id."""
+    appointment_id = payload["appointment_id"]
+
+    # O agendamento pode ter sido cancelado (ou já sincronizado, em caso
+    # de reprocessamento) antes de a linha do outbox ser drenada
+    current = await _fetch_appointment(appointment_id)
+    if current is None or current["status"] == "canceled" or current["google_event_id"]:
+        return
+
+    event_id = await google_calendar.create_event({
+        "start_time": payload["start_time"],
+        "end_time": payload["end_time"],
+        "service_id": payload["service_id"],
+        "professional_id": payload["professional_id"],
+    })
+
+    await db_admin.table("appointments").update(
+        {"google_event_id": event_id}
+    ).eq("id", appointment_id).execute()
+
+    # O cancelamento pode ter chegado enquanto o evento era criado: sem
+    # google_event_id gravado, o handler de status não tinha o que remover
+    current = await _fetch_appointment(appointment_id)
+    if current is None or current["status"] == "canceled":
+        await google_calendar.delete_event(event_id)
+        if current is not None:
+            await db_admin.table("appointments").update(
+                {"google_event_id": None}
+            ).eq("id", appointment_id).execute()
+        logger.info(
+            f"Agendamento {appointment_id} cancelado durante a sincronização "
+            f"→ evento {event_id} removido"
+        )
+        return
+
+    logger.info(f"Agendamento {appointment_id} sincronizado → evento {event_id}")
+
+
+@outbox_relay.register(TOPIC_APPOINTMENT_STATUS_CHANGED)
+async def sync_status_change(payload: dict) -> None:
+    """Remove o evento do Google Calendar quando o agendamento é cancelado."""
+    if payload["new_status"] != "canceled":
+        return
+
+    appointment_id = payload["appointment_id"]
+    current = await _fetch_appointment(appointment_id)
+    if current is None or not current["google_event_id"]:
+        return
+
+    await google_calendar.delete_event(current["google_event_id"])
+    logger.info(
+        f"Evento {current['google_event_id']} removido (agendamento {appointment_id})"
+    )
@@ -0,0 +1,133 @@
+"""
+Exportação em streaming (NDJSON / CSV) de tabelas do profissional.
+
+Montar o histórico inteiro numa lista e devolver um único array JSON
+não escala para contas com anos de dados: memória e tempo até o
+primeiro byte crescem com a conta. Aqui:
+
+  - as linhas vêm do PostgREST em páginas keyset de export_page_size
+    (app/services/keyset.py) — nunca mais de uma página em memória
+  - cada página é validada (validate_rows) e vira um chunk NDJSON (um
+    objeto por linha) ou CSV (cabeçalho no primeiro chunk)
+  - o StreamingResponse envia cada chunk assim que a página chega
+
+No CSV, textos que começam com =, +, -, @ (ou tab/CR) recebem um ' na
+frente: nome e e-mail vêm do formulário público de agendamento, e uma
+planilha executaria o valor como fórmula.
+
+Uma falha no meio do stream não pode mais virar um 500 (o status já foi
+enviado): o erro é registrado e a conexão é abortada, para o cliente
+perceber o arquivo incompleto em vez de receber um truncado "válido".
+
+Uso:
+    async def fetch_page(after):            # after = (tempo, id) ou None
+        ...
+    pages = iter_keyset_pages(fetch_page, "created_at")
+    return export_response(stream_export(pages, StudentResponse, "csv"), "csv", "alunos")
+"""
+import csv
+import io
+import logging
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Literal, Optional, Tuple, Type
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.core.serialization import validate_rows
+
+logger = logging.getLogger(__name__)
+
+
+ExportFormat = Literal["ndjson", "csv"]
+
+_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+# Recebe a chave (tempo, id) da última linha exportada, ou None na
+# primeira página, e devolve até export_page_size linhas
+PageFetcher = Callable[[Optional[Tuple[str, str]]], Awaitable[List[dict]]]
+
+
+async def iter_keyset_pages(
+    fetch_page: PageFetcher,
+    time_column: str,
+    id_column: str = "id",
+) -> AsyncIterator[List[dict]]:
+    """Percorre a tabela página a página, até uma página incompleta."""
+    after: Optional[Tuple[str, str]] = None
+    while True:
+        rows = await fetch_page(after)
+        if rows:
+            yield rows
+        if len(rows) < settings.export_page_size:
+            return
+        last = rows[-1]
+        after = (last[time_column], last[id_column])
+
+
+def _ndjson_chunk(items: List[BaseModel]) -> bytes:
+    return b"".join(item.__pydantic_serializer__.to_json(item) + b"\n" for item in items)
+
+
+# Prefixos que planilhas interpretam como início de fórmula
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_cell(value: Any) -> Any:
+    """Valor de uma célula CSV: vazio para None, texto neutralizado contra fórmulas."""
+    if value is None:
+        return ""
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _csv_chunk(rows: List[list]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+async def stream_export(
+    pages: AsyncIterator[List[dict]],
+    model: Type[BaseModel],
+    fmt: ExportFormat,
+) -> AsyncIterator[bytes]:
+    """Converte as páginas do banco em chunks NDJSON ou CSV (colunas do modelo)."""
+    fields = list(model.model_fields)
+    exported = 0
+    try:
+        if fmt == "csv":
+            yield _csv_chunk([fields])
+        async for rows in pages:
+            items = validate_rows(model, rows)
+            if fmt == "ndjson":
+                yield _ndjson_chunk(items)
+            else:
+                yield _csv_chunk([
+                    [_csv_cell(value) for value in item.model_dump(mode="json").values()]
+                    for item in items
+                ])
+            exported += len(items)
+    except Exception as e:
+        logger.error(f"Exportação de {model.__name__} interrompida após {exported} linha(s): {e}")
+        raise
+    logger.info(f"Exportação de {model.__name__} concluída: {exported} linha(s)")
+
+
+def export_response(chunks: AsyncIterator[bytes], fmt: ExportFormat, name: str) -> StreamingResponse:
+    """StreamingResponse de download (<name>-<data>.<formato>)."""
+    filename = f"{name}-{datetime.now(timezone.utc):%Y%m%d}.{fmt}"
+    return StreamingResponse(
+        chunks,
+        media_type=_MEDIA_TYPES[fmt],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Cache-Control": "no-store",
+            "X-Accel-Buffering": "no",
+        },
+    )
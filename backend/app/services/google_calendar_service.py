@@ -1,23 +1,48 @@
 """
 Serviço de integração com Google Calendar
 """
+import asyncio
 import json
-import requests
-from typing import Optional, List, Dict
-from datetime import datetime, timedelta
+import httpx
+from typing import Optional, List, Dict, Tuple
+from datetime import datetime, timedelta, timezone
+from google.auth.exceptions import RefreshError
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import Flow
-from googleapiclient.discovery import build
+from googleapiclient.discovery import Resource, build
 from googleapiclient.errors import HttpError
 from fastapi import HTTPException, status
-from app.core.supabase import supabase_admin
+from app.core.supabase import db_admin
 from app.core.google_config import GOOGLE_SCOPES, GOOGLE_CLIENT_ID, GOOGLE_CLIENT_SECRET, GOOGLE_REDIRECT_URI, TIMEZONE
+from app.services.google_client_cache import GoogleClient, google_client_cache
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def parse_freebusy(result: Dict, calendar_id: str) -> List[Tuple[datetime, datetime]]:
+    """
+    Intervalos (início, fim) UTC de uma resposta da FreeBusy, ordenados.
+
+    Raises:
+        ValueError: a API reportou erro para o calendário (ex.: notFound)
+            — uma lista vazia seria lida como "agenda livre".
+    """
+    calendar = result.get('calendars', {}).get(calendar_id, {})
+    if calendar.get('errors'):
+        raise ValueError(f"FreeBusy retornou erro para {calendar_id}: {calendar['errors']}")
+    windows = [
+        (
+            datetime.fromisoformat(busy['start']).astimezone(timezone.utc),
+            datetime.fromisoformat(busy['end']).astimezone(timezone.utc),
+        )
+        for busy in calendar.get('busy', [])
+    ]
+    windows.sort()
+    return windows
+
+
 class GoogleCalendarService:
     def __init__(self):
         self.scopes = GOOGLE_SCOPES
@@ -73,10 +98,6 @@ class GoogleCalendarService:
             # Trocar código por tokens usando abordagem direta
             try:
                 # Método direto sem validação de scope
-                from google.oauth2.credentials import Credentials
-                from google.auth.transport.requests import Request
-                import requests
-                
                 # Fazer requisição direta para trocar código por tokens
                 token_url = "https://oauth2.googleapis.com/token"
                 token_data = {
@@ -88,7 +109,8 @@ class GoogleCalendarService:
                 }
                 
                 logger.info("Fazendo requisição direta para tokens...")
-                response = requests.post(token_url, data=token_data)
+                async with httpx.AsyncClient() as client:
+                    response = await client.post(token_url, data=token_data)
                 response.raise_for_status()
                 token_response = response.json()
                 
@@ -111,8 +133,13 @@ class GoogleCalendarService:
             # Obter informações do usuário Google
             try:
                 logger.info("Obtendo informações do usuário Google...")
-                service = build('oauth2', 'v2', credentials=credentials)
-                user_info = service.userinfo().get().execute()
+                # A biblioteca do Google é síncrona: roda fora do event loop
+                user_info = await asyncio.to_thread(
+                    lambda: build(
+                        'oauth2', 'v2', credentials=credentials,
+                        static_discovery=True, cache_discovery=False,
+                    ).userinfo().get().execute()
+                )
                 logger.info(f"Informações do usuário obtidas: {user_info.get('email')}")
             except Exception as e:
                 logger.error(f"Erro ao obter informações do usuário: {str(e)}")
@@ -134,18 +161,20 @@ class GoogleCalendarService:
                 logger.info(f"Dados do token: user_id={user_id}, email={user_info.get('email')}")
                 
                 # Verificar se já existe token para este usuário
-                existing = supabase_admin.table("user_google_tokens").select("*").eq("user_id", user_id).execute()
+                existing = await db_admin.table("user_google_tokens").select("*").eq("user_id", user_id).execute()
                 logger.info(f"Tokens existentes encontrados: {len(existing.data) if existing.data else 0}")
                 
                 if existing.data:
                     # Atualizar token existente
-                    result = supabase_admin.table("user_google_tokens").update(token_data).eq("user_id", user_id).execute()
+                    result = await db_admin.table("user_google_tokens").update(token_data).eq("user_id", user_id).execute()
                     logger.info("Token atualizado com sucesso")
                 else:
                     # Inserir novo token
-                    result = supabase_admin.table("user_google_tokens").insert(token_data).execute()
+                    result = await db_admin.table("user_google_tokens").insert(token_data).execute()
                     logger.info("Novo token inserido com sucesso")
                 
+                # Descarta credenciais/service antigos em cache
+                google_client_cache.invalidate(user_id)
                 logger.info(f"Tokens Google salvos para usuário {user_id}")
             except Exception as e:
                 logger.error(f"Erro ao salvar no banco: {str(e)}")
@@ -164,56 +193,85 @@ class GoogleCalendarService:
                 detail="Erro ao processar autenticação Google"
             )
 
-    async def get_credentials(self, user_id: str) -> Optional[Credentials]:
-        """Obter credenciais válidas do Google para um usuário."""
+    @staticmethod
+    def _parse_expiry(value: Optional[str]) -> Optional[datetime]:
+        """token_expiry do banco → datetime UTC naive (formato do google-auth)."""
+        if not value:
+            return None
+        expiry = datetime.fromisoformat(value)
+        if expiry.tzinfo is not None:
+            expiry = expiry.astimezone(timezone.utc).replace(tzinfo=None)
+        return expiry
+
+    async def _load_credentials(self, user_id: str) -> Optional[Credentials]:
+        """Lê as credenciais do banco, renovando o token se já expirou."""
+        response = await db_admin.table("user_google_tokens").select("*").eq("user_id", user_id).execute()
+
+        if not response.data:
+            return None
+
+        token_data = response.data[0]
+
+        credentials = Credentials(
+            token=token_data['access_token'],
+            refresh_token=token_data['refresh_token'],
+            token_uri="https://oauth2.googleapis.com/token",
+            client_id=GOOGLE_CLIENT_ID,
+            client_secret=GOOGLE_CLIENT_SECRET,
+            scopes=json.loads(token_data['scopes']),
+            expiry=self._parse_expiry(token_data.get('token_expiry')),
+        )
+
+        if credentials.expired and credentials.refresh_token:
+            return await self._refresh_credentials(user_id, credentials)
+        return credentials
+
+    async def _refresh_credentials(self, user_id: str, credentials: Credentials) -> Optional[Credentials]:
+        """Renova o access token (no próprio objeto) e persiste no banco."""
         try:
-            # Buscar token do usuário
-            response = supabase_admin.table("user_google_tokens").select("*").eq("user_id", user_id).execute()
-            
-            if not response.data:
-                return None
-            
-            token_data = response.data[0]
-            
-            # Criar credenciais
-            credentials = Credentials(
-                token=token_data['access_token'],
-                refresh_token=token_data['refresh_token'],
-                token_uri="https://oauth2.googleapis.com/token",
-                client_id=GOOGLE_CLIENT_ID,
-                client_secret=GOOGLE_CLIENT_SECRET,
-                scopes=json.loads(token_data['scopes'])
+            await asyncio.to_thread(credentials.refresh, Request())
+        except RefreshError as e:
+            # Refresh token revogado/expirado: o usuário precisa reconectar
+            logger.warning(f"Não foi possível renovar o token Google do usuário {user_id}: {e}")
+            return None
+
+        update_data = {
+            'access_token': credentials.token,
+            'token_expiry': credentials.expiry.isoformat() if credentials.expiry else None
+        }
+        await db_admin.table("user_google_tokens").update(update_data).eq("user_id", user_id).execute()
+
+        logger.info(f"Token Google renovado para usuário {user_id}")
+        return credentials
+
+    async def _get_client(self, user_id: str) -> Optional[GoogleClient]:
+        """Credenciais e service do Calendar do usuário (cache por profissional)."""
+        try:
+            return await google_client_cache.get(
+                user_id, self._load_credentials, self._refresh_credentials
             )
-            
-            # Verificar se o token expirou e renovar se necessário
-            if credentials.expired and credentials.refresh_token:
-                credentials.refresh(Request())
-                
-                # Atualizar token no banco
-                update_data = {
-                    'access_token': credentials.token,
-                    'token_expiry': credentials.expiry.isoformat() if credentials.expiry else None
-                }
-                supabase_admin.table("user_google_tokens").update(update_data).eq("user_id", user_id).execute()
-                
-                logger.info(f"Token Google renovado para usuário {user_id}")
-            
-            return credentials
-            
         except Exception as e:
             logger.error(f"Erro ao obter credenciais Google: {str(e)}")
             return None
 
+    async def get_credentials(self, user_id: str) -> Optional[Credentials]:
+        """Obter credenciais válidas do Google para um usuário."""
+        client = await self._get_client(user_id)
+        return client.credentials if client else None
+
+    async def _get_calendar(self, user_id: str) -> Optional[Resource]:
+        """Service do Calendar do usuário, ou None se não conectado."""
+        client = await self._get_client(user_id)
+        return client.service if client else None
+
     async def create_calendar_event(self, user_id: str, appointment_data: Dict) -> Optional[str]:
         """Criar evento no Google Calendar."""
         try:
-            credentials = await self.get_credentials(user_id)
-            if not credentials:
+            service = await self._get_calendar(user_id)
+            if not service:
                 logger.warning(f"Credenciais Google não encontradas para usuário {user_id}")
                 return None
             
-            service = build('calendar', 'v3', credentials=credentials)
-            
             # Criar evento
             event = {
                 'summary': f"AgendaPro: {appointment_data['service_name']}",
@@ -238,7 +296,9 @@ class GoogleCalendarService:
                 },
             }
             
-            created_event = service.events().insert(calendarId='primary', body=event).execute()
+            created_event = await asyncio.to_thread(
+                lambda: service.events().insert(calendarId='primary', body=event).execute()
+            )
             event_id = created_event.get('id')
             
             logger.info(f"Evento criado no Google Calendar: {event_id}")
@@ -254,14 +314,14 @@ class GoogleCalendarService:
     async def update_calendar_event(self, user_id: str, event_id: str, appointment_data: Dict) -> bool:
         """Atualizar evento no Google Calendar."""
         try:
-            credentials = await self.get_credentials(user_id)
-            if not credentials:
+            service = await self._get_calendar(user_id)
+            if not service:
                 return False
             
-            service = build('calendar', 'v3', credentials=credentials)
-            
             # Buscar evento existente
-            event = service.events().get(calendarId='primary', eventId=event_id).execute()
+            event = await asyncio.to_thread(
+                lambda: service.events().get(calendarId='primary', eventId=event_id).execute()
+            )
             
             # Atualizar dados
             event['summary'] = f"AgendaPro: {appointment_data['service_name']}"
@@ -275,7 +335,9 @@ class GoogleCalendarService:
                 'timeZone': TIMEZONE,
             }
             
-            service.events().update(calendarId='primary', eventId=event_id, body=event).execute()
+            await asyncio.to_thread(
+                lambda: service.events().update(calendarId='primary', eventId=event_id, body=event).execute()
+            )
             
             logger.info(f"Evento atualizado no Google Calendar: {event_id}")
             return True
@@ -287,12 +349,13 @@ class GoogleCalendarService:
     async def delete_calendar_event(self, user_id: str, event_id: str) -> bool:
         """Deletar evento do Google Calendar."""
         try:
-            credentials = await self.get_credentials(user_id)
-            if not credentials:
+            service = await self._get_calendar(user_id)
+            if not service:
                 return False
             
-            service = build('calendar', 'v3', credentials=credentials)
-            service.events().delete(calendarId='primary', eventId=event_id).execute()
+            await asyncio.to_thread(
+                lambda: service.events().delete(calendarId='primary', eventId=event_id).execute()
+            )
             
             logger.info(f"Evento deletado do Google Calendar: {event_id}")
             return True
@@ -301,28 +364,45 @@ class GoogleCalendarService:
             logger.error(f"Erro ao deletar evento: {str(e)}")
             return False
 
+    async def get_busy_windows(
+        self, user_id: str, time_min: datetime, time_max: datetime
+    ) -> Optional[List[Tuple[datetime, datetime]]]:
+        """
+        Janelas ocupadas do calendário principal entre time_min e time_max,
+        pela API FreeBusy (uma requisição, sem listar eventos).
+
+        Returns:
+            Intervalos (início, fim) UTC ordenados, ou None se o usuário
+            não conectou o Google Calendar.
+
+        Raises:
+            Exception: erro da API — quem chama decide como degradar.
+        """
+        service = await self._get_calendar(user_id)
+        if not service:
+            return None
+
+        body = {
+            'timeMin': time_min.isoformat(),
+            'timeMax': time_max.isoformat(),
+            'items': [{'id': 'primary'}],
+        }
+        result = await asyncio.to_thread(
+            lambda: service.freebusy().query(body=body).execute()
+        )
+        return parse_freebusy(result, 'primary')
+
     async def check_availability(self, user_id: str, start_datetime: str, end_datetime: str) -> bool:
-        """Verificar se horário está disponível no Google Calendar."""
+        """Verificar se horário está disponível no Google Calendar (FreeBusy)."""
         try:
-            credentials = await self.get_credentials(user_id)
-            if not credentials:
-                return True  # Se não tem Google Calendar, considera disponível
-            
-            service = build('calendar', 'v3', credentials=credentials)
-            
-            # Buscar eventos no período
-            events_result = service.events().list(
-                calendarId='primary',
-                timeMin=start_datetime,
-                timeMax=end_datetime,
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
-            
-            events = events_result.get('items', [])
-            
-            # Se há eventos no período, não está disponível
-            return len(events) == 0
+            windows = await self.get_busy_windows(
+                user_id,
+                datetime.fromisoformat(start_datetime),
+                datetime.fromisoformat(end_datetime),
+            )
+            # Se não tem Google Calendar, considera disponível; a FreeBusy
+            # só devolve janelas que cruzam o período consultado
+            return not windows
             
         except Exception as e:
             logger.error(f"Erro ao verificar disponibilidade: {str(e)}")
@@ -332,7 +412,8 @@ class GoogleCalendarService:
         """Desconectar Google Calendar."""
         try:
             # Deletar tokens do banco
-            supabase_admin.table("user_google_tokens").delete().eq("user_id", user_id).execute()
+            await db_admin.table("user_google_tokens").delete().eq("user_id", user_id).execute()
+            google_client_cache.invalidate(user_id)
             
             logger.info(f"Google Calendar desconectado para usuário {user_id}")
             return True
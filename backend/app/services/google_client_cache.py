@@ -0,0 +1,187 @@
+"""
+Cache por profissional de credenciais Google e do service do Calendar.
+
+Sem cache, cada chamada do GoogleCalendarService custava:
+  1. leitura de user_google_tokens no banco
+  2. refresh do token, quando expirado
+  3. build('calendar', 'v3') — parse do discovery document (e download,
+     sem a cópia local)
+  4. a chamada à API propriamente dita
+
+Com o cache, o par (Credentials, service) de cada profissional fica em
+memória e uma chamada custa só a requisição à API:
+
+  - o service é montado com static_discovery=True (discovery document
+    empacotado no google-api-python-client) e cache_discovery=False
+  - a entrada vale enquanto o access token não estiver a menos de
+    google_token_refresh_margin_seconds da expiração; perto disso, o
+    token é renovado em memória (sem reler o banco) e o service é
+    reaproveitado — credentials.refresh() atualiza o mesmo objeto
+  - a carga/renovação é single-flight por profissional: N chamadas
+    concorrentes fazem um único refresh
+  - a cada google_client_cache_ttl_seconds a entrada é recarregada do
+    banco (pega tokens trocados por outro worker); LRU limitado a
+    google_client_cache_max_entries
+
+O service é compartilhado entre threads (as chamadas rodam via
+asyncio.to_thread) e httplib2.Http não é thread-safe: cada requisição
+ganha o seu próprio AuthorizedHttp (requestBuilder).
+
+Invalidação: o callback OAuth (novos tokens) e a desconexão chamam
+invalidate(user_id).
+"""
+import asyncio
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, NamedTuple, Optional
+
+import google_auth_httplib2
+import httplib2
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import Resource, build
+from googleapiclient.http import HttpRequest
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.singleflight import SingleFlight
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class GoogleClient(NamedTuple):
+    """Credenciais válidas e service do Calendar de um profissional."""
+    credentials: Credentials
+    service: Resource
+
+
+# Lê as credenciais do banco (renovando se expiradas); None = não conectado
+CredentialsLoader = Callable[[str], Awaitable[Optional[Credentials]]]
+# Renova credenciais já em memória e persiste o novo token
+CredentialsRefresher = Callable[[str, Credentials], Awaitable[Optional[Credentials]]]
+
+
+def build_calendar_service(credentials: Credentials) -> Resource:
+    """
+    Service do Calendar a partir do discovery document local, sem
+    requisição de discovery. Bloqueante (parse do JSON): chame via
+    asyncio.to_thread.
+    """
+    def request_builder(http, *args, **kwargs) -> HttpRequest:
+        # Um Http por requisição: o service é usado por várias threads
+        authorized = google_auth_httplib2.AuthorizedHttp(credentials, http=httplib2.Http())
+        return HttpRequest(authorized, *args, **kwargs)
+
+    return build(
+        "calendar",
+        "v3",
+        http=google_auth_httplib2.AuthorizedHttp(credentials, http=httplib2.Http()),
+        requestBuilder=request_builder,
+        static_discovery=True,
+        cache_discovery=False,
+    )
+
+
+class GoogleClientCache:
+    """Credenciais + service do Calendar por profissional, cientes da expiração."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: int,
+        refresh_margin_seconds: int,
+        enabled: bool = True,
+    ):
+        self.enabled = enabled
+        self.refresh_margin = timedelta(seconds=refresh_margin_seconds)
+        self._local = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._flight = SingleFlight("google_credentials")
+
+        self.loads = 0
+        self.refreshes = 0
+        self.builds = 0
+
+    def _is_fresh(self, credentials: Credentials) -> bool:
+        """Token presente e longe da expiração (expiry do google-auth é UTC naive)."""
+        if not credentials.token:
+            return False
+        if credentials.expiry is None:
+            # Expiração desconhecida: o AuthorizedHttp renova num eventual 401
+            return True
+        return credentials.expiry - self.refresh_margin > datetime.utcnow()
+
+    # ── Leitura ─────────────────────────────────────────────
+
+    async def get(
+        self,
+        user_id: str,
+        load: CredentialsLoader,
+        refresh: CredentialsRefresher,
+    ) -> Optional[GoogleClient]:
+        """
+        Cliente do profissional: do cache se o token ainda está válido;
+        senão renova (ou carrega do banco) numa única execução por usuário.
+        None se o profissional não conectou o Google Calendar.
+        """
+        cached = self._local.get(user_id) if self.enabled else None
+        if cached is not None and self._is_fresh(cached.credentials):
+            return cached
+        return await self._flight.do(
+            user_id, lambda: self._load(user_id, cached, load, refresh)
+        )
+
+    async def _load(
+        self,
+        user_id: str,
+        cached: Optional[GoogleClient],
+        load: CredentialsLoader,
+        refresh: CredentialsRefresher,
+    ) -> Optional[GoogleClient]:
+        if cached is not None and cached.credentials.refresh_token:
+            # Mesmo objeto renovado em memória: o service continua válido
+            self.refreshes += 1
+            credentials = await refresh(user_id, cached.credentials)
+            if credentials is None:
+                self._local.delete(user_id)
+                return None
+            client = cached
+        else:
+            self.loads += 1
+            credentials = await load(user_id)
+            if credentials is None:
+                return None
+            self.builds += 1
+            service = await asyncio.to_thread(build_calendar_service, credentials)
+            client = GoogleClient(credentials, service)
+
+        if self.enabled:
+            self._local.set(user_id, client)
+        return client
+
+    # ── Invalidação ─────────────────────────────────────────
+
+    def invalidate(self, user_id: str) -> bool:
+        """Descarta o cliente do profissional (tokens trocados ou revogados)."""
+        return self._local.delete(user_id)
+
+    # ── Métricas ────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        data = {"enabled": self.enabled}
+        data.update(self._local.stats())
+        data.update({
+            "refresh_margin_seconds": int(self.refresh_margin.total_seconds()),
+            "loads": self.loads,
+            "refreshes": self.refreshes,
+            "builds": self.builds,
+        })
+        return data
+
+
+# Instância singleton para uso em toda a aplicação
+google_client_cache = GoogleClientCache(
+    max_entries=settings.google_client_cache_max_entries,
+    ttl_seconds=settings.google_client_cache_ttl_seconds,
+    refresh_margin_seconds=settings.google_token_refresh_margin_seconds,
+    enabled=settings.google_client_cache_enabled,
+)
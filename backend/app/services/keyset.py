@@ -0,0 +1,33 @@
+"""
+Filtros de paginação keyset para o postgrest-py.
+
+Paginação por chave composta (coluna de tempo, id): cada página pede só
+as linhas depois da chave da última linha recebida, em vez de OFFSET —
+o custo de uma página não cresce com o tamanho da tabela. Usado pela
+listagem e pelo delta sync de agendamentos e pelas exportações.
+"""
+
+
+def after_key(query, time_column: str, id_column: str, after_time: str, after_id: str):
+    """
+    Filtro keyset: (time_column, id_column) > (after_time, after_id).
+
+    O gte delimita a varredura no índice; o "or" desempata pelo id.
+    O postgrest-py 0.13 não tem or_(), então o parâmetro é montado direto.
+    """
+    query = query.gte(time_column, after_time)
+    query.params = query.params.add(
+        "or",
+        f'({time_column}.gt."{after_time}",'
+        f'and({time_column}.eq."{after_time}",{id_column}.gt.{after_id}))',
+    )
+    return query
+
+
+def order_by_key(query, time_column: str, id_column: str):
+    """
+    Ordenação composta num único parâmetro (.order() encadeado gera
+    parâmetros "order" repetidos, e o PostgREST considera só um).
+    """
+    query.params = query.params.add("order", f"{time_column}.asc,{id_column}.asc")
+    return query
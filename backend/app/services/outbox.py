@@ -0,0 +1,250 @@
+"""
+Relay do Transactional Outbox (database/migrations/06).
+
+As linhas do outbox são gravadas pelo banco na mesma transação do
+agendamento (RPC book_public_appointment e trigger de status). Este
+módulo drena a tabela em lotes e despacha cada linha para o handler
+do seu tópico:
+
+  1. claim_outbox_batch (RPC): marca até N linhas como 'processing'
+     com FOR UPDATE SKIP LOCKED — seguro com vários workers
+  2. Agrupa o lote por aggregate_id: linhas do mesmo agendamento rodam
+     em sequência (ordem do id do outbox); agregados distintos rodam em
+     paralelo. Se uma linha falha, as seguintes do mesmo agregado voltam
+     para 'pending' junto com ela, sem executar, para manter a ordem
+  3. Sucesso → 'done'; falha → volta para 'pending' com backoff
+     exponencial (available_at), ou 'failed' após outbox_max_attempts
+
+Métricas: vazão (linhas/s na última janela) e lag (created_at → done).
+
+Uso:
+    from app.services.outbox import outbox_relay
+
+    @outbox_relay.register("appointment.created")
+    async def handler(payload: dict) -> None: ...
+"""
+import asyncio
+import logging
+import random
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.supabase import db_admin
+
+logger = logging.getLogger(__name__)
+
+OutboxHandler = Callable[[dict], Awaitable[None]]
+
+# Janela (segundos) usada para calcular a vazão
+_THROUGHPUT_WINDOW = 60.0
+
+
+def backoff_delay(attempt: int) -> float:
+    """Atraso (segundos) antes da tentativa seguinte à `attempt`-ésima falha."""
+    delay = settings.outbox_backoff_base_seconds * (2 ** (attempt - 1))
+    delay = min(delay, settings.outbox_backoff_max_seconds)
+    # Jitter de ±20% para não sincronizar retries
+    return delay * random.uniform(0.8, 1.2)
+
+
+class OutboxRelay:
+    """Drena o outbox e despacha as linhas para os handlers."""
+
+    def __init__(self, batch_size: int, poll_interval: float, max_attempts: int):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self._handlers: Dict[str, OutboxHandler] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        self.processed = 0
+        self.retried = 0
+        self.failed = 0
+        self.batches = 0
+        self.last_lag_seconds = 0.0
+        self.max_lag_seconds = 0.0
+        self._done_at: deque = deque()
+
+    # ── Registro de handlers ────────────────────────────────
+
+    def register(self, topic: str) -> Callable[[OutboxHandler], OutboxHandler]:
+        """Decorator que associa um handler a um tópico do outbox."""
+        def decorator(handler: OutboxHandler) -> OutboxHandler:
+            self._handlers[topic] = handler
+            return handler
+        return decorator
+
+    # ── Processamento ───────────────────────────────────────
+
+    async def _claim(self) -> List[dict]:
+        response = await db_admin.rpc(
+            "claim_outbox_batch", {"p_limit": self.batch_size}
+        ).execute()
+        return response.data or []
+
+    async def _run_handler(self, row: dict) -> None:
+        """Executa o handler de uma linha (propaga a exceção em caso de falha)."""
+        handler = self._handlers.get(row["topic"])
+        if handler is None:
+            # Tópico sem consumidor (ex.: e-mail ainda não implementado)
+            logger.debug(f"Outbox {row['id']}: tópico sem handler ({row['topic']})")
+            return
+        await handler(row["payload"])
+
+    def _record_lag(self, row: dict) -> None:
+        created_at = datetime.fromisoformat(row["created_at"])
+        lag = (datetime.now(timezone.utc) - created_at).total_seconds()
+        self.last_lag_seconds = lag
+        self.max_lag_seconds = max(self.max_lag_seconds, lag)
+
+    async def _process_group(self, rows: List[dict]) -> List[int]:
+        """
+        Processa as linhas de um agregado em ordem. Na primeira falha, a
+        linha é reagendada e as seguintes voltam para 'pending' com o mesmo
+        available_at, para serem reivindicadas depois dela.
+        Retorna os IDs concluídos.
+        """
+        done: List[int] = []
+        for index, row in enumerate(rows):
+            try:
+                await self._run_handler(row)
+            except Exception as e:
+                retry_at = await self._reschedule(row, e)
+                await self._release(rows[index + 1:], retry_at)
+                break
+            self._record_lag(row)
+            done.append(row["id"])
+        return done
+
+    async def _release(self, rows: List[dict], available_at: datetime) -> None:
+        """Devolve linhas não executadas para 'pending' sem contar a tentativa."""
+        for row in rows:
+            try:
+                await db_admin.table("outbox").update({
+                    "status": "pending",
+                    "attempts": row["attempts"] - 1,
+                    "available_at": available_at.isoformat(),
+                }).eq("id", row["id"]).execute()
+            except Exception as e:
+                # A linha fica em 'processing' e volta após o lock timeout
+                logger.error(f"Falha ao liberar linha {row['id']} do outbox: {e}")
+
+    async def _reschedule(self, row: dict, error: Exception) -> datetime:
+        """Reagenda (ou marca como failed) a linha. Retorna o novo available_at."""
+        attempts = row["attempts"]
+        available_at = datetime.now(timezone.utc)
+        if attempts >= self.max_attempts:
+            update = {"status": "failed", "last_error": str(error)}
+            self.failed += 1
+            logger.error(
+                f"Outbox {row['id']} ({row['topic']}) falhou {attempts}x, "
+                f"marcado como failed: {error}"
+            )
+        else:
+            delay = backoff_delay(attempts)
+            available_at += timedelta(seconds=delay)
+            update = {
+                "status": "pending",
+                "available_at": available_at.isoformat(),
+                "last_error": str(error),
+            }
+            self.retried += 1
+            logger.warning(
+                f"Outbox {row['id']} ({row['topic']}) falhou (tentativa {attempts}), "
+                f"nova tentativa em {delay:.1f}s: {error}"
+            )
+
+        try:
+            await db_admin.table("outbox").update(update).eq("id", row["id"]).execute()
+        except Exception as e:
+            # A linha fica em 'processing' e volta após o lock timeout
+            logger.error(f"Falha ao reagendar linha {row['id']} do outbox: {e}")
+        return available_at
+
+    async def _mark_done(self, ids: List[int]) -> None:
+        await db_admin.table("outbox").update({
+            "status": "done",
+            "processed_at": datetime.now(timezone.utc).isoformat(),
+            "last_error": None,
+        }).in_("id", ids).execute()
+
+        now = time.monotonic()
+        self.processed += len(ids)
+        self._done_at.extend([now] * len(ids))
+
+    async def drain_once(self) -> int:
+        """Processa um lote. Retorna quantas linhas foram reivindicadas."""
+        rows = await self._claim()
+        if not rows:
+            return 0
+
+        self.batches += 1
+        groups: Dict[str, List[dict]] = defaultdict(list)
+        for row in sorted(rows, key=lambda r: r["id"]):
+            groups[row["aggregate_id"]].append(row)
+
+        results = await asyncio.gather(
+            *(self._process_group(group) for group in groups.values())
+        )
+        done = [row_id for group_done in results for row_id in group_done]
+        if done:
+            await self._mark_done(done)
+        return len(rows)
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                claimed = await self.drain_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Erro ao drenar o outbox: {e}")
+                claimed = 0
+
+            # Lote cheio → provavelmente há mais; senão espera o próximo ciclo
+            if claimed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    # ── Ciclo de vida ───────────────────────────────────────
+
+    async def start(self) -> None:
+        """Inicia o relay (chamado no startup da aplicação)."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+            logger.info("Relay do outbox iniciado")
+
+    async def stop(self) -> None:
+        """Para o relay (chamado no shutdown da aplicação)."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    # ── Métricas ────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        cutoff = time.monotonic() - _THROUGHPUT_WINDOW
+        while self._done_at and self._done_at[0] < cutoff:
+            self._done_at.popleft()
+
+        return {
+            "batch_size": self.batch_size,
+            "batches": self.batches,
+            "processed": self.processed,
+            "retried": self.retried,
+            "failed": self.failed,
+            "throughput_per_second": round(len(self._done_at) / _THROUGHPUT_WINDOW, 3),
+            "last_lag_seconds": round(self.last_lag_seconds, 3),
+            "max_lag_seconds": round(self.max_lag_seconds, 3),
+        }
+
+
+# Instância singleton para uso em toda a aplicação
+outbox_relay = OutboxRelay(
+    batch_size=settings.outbox_batch_size,
+    poll_interval=settings.outbox_poll_interval_seconds,
+    max_attempts=settings.outbox_max_attempts,
+)
@@ -0,0 +1,187 @@
+"""
+Cache de perfis públicos (slug → perfil), com cache negativo.
+
+GET /public/profile/{slug} é a rota anônima de maior tráfego e o perfil
+quase nunca muda. O cache guarda:
+  - o perfil encontrado, por profile_cache_ttl_seconds
+  - a ausência do slug (NOT_FOUND), por profile_cache_negative_ttl_seconds
+    (menor) — bots varrendo slugs não chegam ao banco
+
+Backends:
+  - Em processo (padrão): TTLCache com limite LRU.
+  - Redis (se REDIS_URL estiver configurado e o pacote `redis` instalado):
+    compartilhado entre workers, invalidação enxerga todos os processos.
+
+Invalidação: o trigger de user_profiles (database/migrations/09) grava
+`profile.changed` no outbox com o slug antigo e o novo; o handler abaixo
+remove os dois — inclusive a entrada negativa de um slug recém-criado —
+e a entrada por ID (`id:<uuid>`, usada pelos links /book/:professional_id).
+Sem Redis, só o processo que drena o outbox é invalidado; nos demais a
+entrada expira pelo TTL.
+"""
+import json
+import logging
+from typing import Any, Optional
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.services.outbox import outbox_relay
+
+logger = logging.getLogger(__name__)
+
+_REDIS_PREFIX = "profile"
+
+TOPIC_PROFILE_CHANGED = "profile.changed"
+
+
+class _NotFound:
+    """Marcador de slug inexistente (cache negativo)."""
+
+    def __repr__(self) -> str:
+        return "NOT_FOUND"
+
+
+NOT_FOUND: Any = _NotFound()
+
+
+class ProfileCache:
+    """Cache de perfis públicos por slug."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: int,
+        negative_ttl_seconds: int,
+        enabled: bool = True,
+    ):
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._local = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+        # Contadores do backend Redis (o TTLCache tem os seus próprios)
+        self._redis_hits = 0
+        self._redis_misses = 0
+        self._redis_errors = 0
+        self.negative_hits = 0
+
+    @staticmethod
+    def _redis_key(slug: str) -> str:
+        return f"{_REDIS_PREFIX}:{slug}"
+
+    # ── Leitura / escrita ───────────────────────────────────
+
+    async def get(self, slug: str) -> Optional[Any]:
+        """
+        Retorna o perfil (dict), NOT_FOUND se o slug é sabidamente
+        inexistente, ou None se não há nada em cache.
+        """
+        if not self.enabled:
+            return None
+
+        redis = get_redis()
+        if redis is None:
+            value = self._local.get(slug)
+        else:
+            try:
+                raw = await redis.get(self._redis_key(slug))
+            except Exception as e:
+                self._redis_errors += 1
+                logger.warning(f"Falha ao ler cache de perfis no Redis: {e}")
+                return None
+            if raw is None:
+                self._redis_misses += 1
+                return None
+            self._redis_hits += 1
+            # "null" no Redis = slug inexistente
+            value = json.loads(raw)
+            if value is None:
+                value = NOT_FOUND
+
+        if value is NOT_FOUND:
+            self.negative_hits += 1
+        return value
+
+    async def set(self, slug: str, profile: Optional[dict]) -> None:
+        """Grava o perfil, ou a ausência do slug (profile=None)."""
+        if not self.enabled:
+            return
+
+        ttl = self.ttl_seconds if profile is not None else self.negative_ttl_seconds
+        redis = get_redis()
+        if redis is None:
+            self._local.set(slug, profile if profile is not None else NOT_FOUND, ttl)
+            return
+
+        try:
+            await redis.set(self._redis_key(slug), json.dumps(profile), ex=ttl)
+        except Exception as e:
+            self._redis_errors += 1
+            logger.warning(f"Falha ao gravar cache de perfis no Redis: {e}")
+
+    # ── Invalidação ─────────────────────────────────────────
+
+    async def invalidate(self, *slugs: Optional[str]) -> int:
+        """Remove os slugs informados (None é ignorado). Retorna quantos existiam."""
+        keys = {slug for slug in slugs if slug}
+        if not keys:
+            return 0
+
+        redis = get_redis()
+        if redis is None:
+            return sum(self._local.delete(slug) for slug in keys)
+
+        try:
+            return await redis.delete(*(self._redis_key(slug) for slug in keys))
+        except Exception as e:
+            self._redis_errors += 1
+            logger.warning(f"Falha ao invalidar cache de perfis no Redis: {e}")
+            return 0
+
+    # ── Métricas ────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        backend = "redis" if get_redis() is not None else "memory"
+        data = {
+            "enabled": self.enabled,
+            "backend": backend,
+            "negative_ttl_seconds": self.negative_ttl_seconds,
+            "negative_hits": self.negative_hits,
+        }
+        if backend == "memory":
+            data.update(self._local.stats())
+        else:
+            lookups = self._redis_hits + self._redis_misses
+            data.update({
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._redis_hits,
+                "misses": self._redis_misses,
+                "hit_rate": round(self._redis_hits / lookups, 4) if lookups else 0.0,
+                "errors": self._redis_errors,
+            })
+        return data
+
+
+# Instância singleton para uso em toda a aplicação
+profile_cache = ProfileCache(
+    max_entries=settings.profile_cache_max_entries,
+    ttl_seconds=settings.profile_cache_ttl_seconds,
+    negative_ttl_seconds=settings.profile_cache_negative_ttl_seconds,
+    enabled=settings.profile_cache_enabled,
+)
+
+
+@outbox_relay.register(TOPIC_PROFILE_CHANGED)
+async def invalidate_changed_profile(payload: dict) -> None:
+    """Perfil criado, alterado ou removido → invalida o slug antigo, o novo e o ID."""
+    profile_id = payload.get("profile_id")
+    removed = await profile_cache.invalidate(
+        payload.get("old_slug"),
+        payload.get("new_slug"),
+        f"id:{profile_id}" if profile_id else None,
+    )
+    logger.info(
+        f"Cache de perfil invalidado ({payload.get('old_slug')} → "
+        f"{payload.get('new_slug')}): {removed} entrada(s)"
+    )
@@ -0,0 +1,112 @@
+"""
+Lógica de negócio das rotas públicas agregadas.
+
+Public Booking Page: perfil + serviços ativos + slots dos próximos dias
+numa única resposta, em vez de três requisições em série do navegador.
+"""
+import asyncio
+from datetime import date, timedelta
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+from app.schemas.public import BookingPageResponse
+from app.services.appointments_service import get_public_profile
+from app.core.singleflight import SingleFlight
+from app.services.availability_logic import (
+    cancel_range_prefetch,
+    get_available_slots_range,
+    start_range_prefetch,
+)
+from app.services.service_logic import list_public_services
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BOOKING_PAGE_DAYS = 7
+
+# Visitantes simultâneos do mesmo link compartilham a montagem da página
+_booking_page_flight = SingleFlight("booking_page")
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# BOOKING PAGE (bootstrap da página pública)
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+
+async def get_booking_page(
+    slug: str,
+    days: int = DEFAULT_BOOKING_PAGE_DAYS,
+    service_id: Optional[str] = None,
+) -> BookingPageResponse:
+    """
+    Public Booking Page de um profissional, com coalescência de
+    requisições idênticas concorrentes (ver _build_booking_page).
+    """
+    return await _booking_page_flight.do(
+        (slug, days, service_id),
+        lambda: _build_booking_page(slug, days, service_id),
+    )
+
+
+async def _build_booking_page(
+    slug: str,
+    days: int,
+    service_id: Optional[str],
+) -> BookingPageResponse:
+    """
+    Monta a Public Booking Page de um profissional.
+
+    Fluxo:
+        1. Perfil pelo slug (ou UUID) — normalmente vem do profile_cache
+        2. Em paralelo: serviços ativos e, especulativamente, blocos de
+           disponibilidade e agendamentos dos próximos `days` dias
+        3. Slots do serviço selecionado com a duração já conhecida (sem
+           query de duração); dias no cache de slots não usam as queries
+           especulativas, que são canceladas se sobrarem
+
+    A latência fica próxima de perfil + a query mais lenta do passo 2.
+    """
+    profile = await get_public_profile(slug)
+    professional_id = profile.id
+
+    start_date = date.today()
+    end_date = start_date + timedelta(days=days - 1)
+
+    # 2. Serviços + queries especulativas de slots
+    services_task = asyncio.create_task(list_public_services(professional_id))
+    prefetch = start_range_prefetch(professional_id, start_date, end_date)
+
+    try:
+        services = await services_task
+
+        selected = services[0] if services else None
+        if service_id is not None:
+            selected = next((s for s in services if s.id == service_id), None)
+            if selected is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Serviço não encontrado.",
+                )
+
+        # 3. Slots do serviço selecionado
+        slots = None
+        if selected is not None:
+            slots = await get_available_slots_range(
+                professional_id,
+                start_date,
+                end_date,
+                selected.id,
+                duration_minutes=selected.duration_minutes,
+                prefetch=prefetch,
+            )
+    finally:
+        cancel_range_prefetch(prefetch)
+
+    return BookingPageResponse(
+        profile=profile,
+        services=services,
+        selected_service_id=selected.id if selected is not None else None,
+        slots=slots,
+    )
@@ -6,18 +6,23 @@ como parâmetro, garantindo isolamento multi-tenant automático.
 """
 from typing import List
 from fastapi import HTTPException, status
-from supabase import Client
+from postgrest import AsyncPostgrestClient
 
 from app.schemas.service import ServiceCreate, ServiceUpdate, ServiceResponse
-from app.core.supabase import supabase_admin
+from app.core.serialization import validate_rows
+from app.core.singleflight import SingleFlight
+from app.core.supabase import db_admin
 
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Coalescência das listagens públicas concorrentes do mesmo profissional
+_public_services_flight = SingleFlight("public_services")
+
 
 async def create_service(
-    db: Client, data: ServiceCreate, user_id: str
+    db: AsyncPostgrestClient, data: ServiceCreate, user_id: str
 ) -> ServiceResponse:
     """Criar novo serviço vinculado ao profissional."""
     service_dict = data.model_dump()
@@ -25,7 +30,7 @@ async def create_service(
     service_dict["user_id"] = user_id
 
     try:
-        response = db.table("services").insert(service_dict).execute()
+        response = await db.table("services").insert(service_dict).execute()
         if not response.data:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -39,25 +44,25 @@ async def create_service(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-async def list_services(db: Client) -> List[ServiceResponse]:
+async def list_services(db: AsyncPostgrestClient) -> List[ServiceResponse]:
     """Listar todos os serviços do profissional autenticado (RLS filtra)."""
     try:
-        response = (
+        response = await (
             db.table("services")
             .select("*")
             .order("created_at", desc=False)
             .execute()
         )
-        return [ServiceResponse(**s) for s in response.data]
+        return validate_rows(ServiceResponse, response.data)
     except Exception as e:
         logger.error(f"Erro ao listar serviços: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-async def get_service(db: Client, service_id: str) -> ServiceResponse:
+async def get_service(db: AsyncPostgrestClient, service_id: str) -> ServiceResponse:
     """Buscar serviço por ID (RLS garante que pertence ao profissional)."""
     try:
-        response = (
+        response = await (
             db.table("services")
             .select("*")
             .eq("id", service_id)
@@ -77,7 +82,7 @@ async def get_service(db: Client, service_id: str) -> ServiceResponse:
 
 
 async def update_service(
-    db: Client, service_id: str, data: ServiceUpdate
+    db: AsyncPostgrestClient, service_id: str, data: ServiceUpdate
 ) -> ServiceResponse:
     """Atualizar serviço (RLS garante que pertence ao profissional)."""
     update_data = {k: v for k, v in data.model_dump().items() if v is not None}
@@ -88,7 +93,7 @@ async def update_service(
         return await get_service(db, service_id)
 
     try:
-        response = (
+        response = await (
             db.table("services")
             .update(update_data)
             .eq("id", service_id)
@@ -107,10 +112,10 @@ async def update_service(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-async def delete_service(db: Client, service_id: str) -> dict:
+async def delete_service(db: AsyncPostgrestClient, service_id: str) -> dict:
     """Deletar serviço (RLS garante que pertence ao profissional)."""
     try:
-        response = (
+        response = await (
             db.table("services")
             .delete()
             .eq("id", service_id)
@@ -135,18 +140,25 @@ async def delete_service(db: Client, service_id: str) -> dict:
 async def list_public_services(professional_id: str) -> List[ServiceResponse]:
     """
     Listar serviços ATIVOS de um profissional (endpoint público).
-    Usa supabase_admin pois não há token de usuário.
+    Usa supabase_admin pois não há token de usuário. Chamadas
+    concorrentes para o mesmo profissional compartilham uma query.
     """
+    return await _public_services_flight.do(
+        professional_id, lambda: _fetch_public_services(professional_id)
+    )
+
+
+async def _fetch_public_services(professional_id: str) -> List[ServiceResponse]:
     try:
-        response = (
-            supabase_admin.table("services")
+        response = await (
+            db_admin.table("services")
             .select("*")
             .eq("user_id", professional_id)
             .eq("is_active", True)
             .order("name")
             .execute()
         )
-        return [ServiceResponse(**s) for s in response.data]
+        return validate_rows(ServiceResponse, response.data)
     except Exception as e:
         logger.error(f"Erro ao buscar serviços públicos: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,128 @@
+"""
+Motor de slots por bitmap de ocupação (NumPy).
+
+Alternativa vetorizada ao laço de availability_logic._build_day_slots.
+Cada dia vira um array booleano de 1440 posições (1 por minuto, UTC):
+
+  1. Blocos de disponibilidade são OR'd no array `open`
+  2. Agendamentos são mascarados em `busy`
+  3. free = open & ~busy
+  4. Soma acumulada de `free`: um slot [s, s+N) está livre quando
+     cumsum[s+N] - cumsum[s] == N (janela deslizante em O(1))
+
+Os candidatos são os mesmos do motor em laço (a partir do início de
+cada bloco, de N em N minutos), então a saída é idêntica — o que permite
+comparar os dois motores (A/B) pela query `engine`.
+
+NumPy é opcional: se não estiver instalado, AVAILABLE é False e o
+chamador deve usar o motor em laço.
+"""
+import math
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - dependência opcional
+    np = None
+
+AVAILABLE = np is not None
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def _minute_of_day(t: str) -> int:
+    """Converte 'HH:MM:SS' ou 'HH:MM' para minutos desde 00:00."""
+    parts = t.split(":")
+    return int(parts[0]) * 60 + int(parts[1])
+
+
+def _candidate_starts(blocks: List[dict], duration_minutes: int) -> "np.ndarray":
+    """Minutos de início de cada slot candidato, na ordem dos blocos."""
+    starts = [
+        np.arange(
+            _minute_of_day(b["start_time"]),
+            _minute_of_day(b["end_time"]) - duration_minutes + 1,
+            duration_minutes,
+        )
+        for b in blocks
+    ]
+    if not starts:
+        return np.empty(0, dtype=np.int64)
+    return np.concatenate(starts).astype(np.int64)
+
+
+def build_slots(
+    days: List[date],
+    blocks_by_weekday: Dict[int, List[dict]],
+    booked_by_date: Dict[date, List[Tuple[datetime, datetime]]],
+    duration_minutes: int,
+    weekday_of,
+) -> Dict[date, List[dict]]:
+    """
+    Gera os slots de vários dias de uma vez.
+
+    Args:
+        days: dias a gerar
+        blocks_by_weekday: blocos ativos agrupados por day_of_week (0=dom..6=sáb)
+        booked_by_date: intervalos (início, fim) agrupados pelo dia UTC de início
+        duration_minutes: duração do serviço
+        weekday_of: função date → day_of_week no formato do banco
+
+    Returns:
+        {dia: [ {start, end, available}, ... ]} — mesmo formato do motor em laço.
+    """
+    n_days = len(days)
+    open_ = np.zeros((n_days, MINUTES_PER_DAY), dtype=bool)
+    busy = np.zeros((n_days, MINUTES_PER_DAY), dtype=bool)
+
+    # 1. Blocos de disponibilidade (OR)
+    for i, d in enumerate(days):
+        for b in blocks_by_weekday.get(weekday_of(d), []):
+            open_[i, _minute_of_day(b["start_time"]):_minute_of_day(b["end_time"])] = True
+
+    # 2. Agendamentos (máscara), recortados ao dia e arredondados para fora
+    for i, d in enumerate(days):
+        day_start = datetime.combine(d, time.min, tzinfo=timezone.utc)
+        for b_start, b_end in booked_by_date.get(d, []):
+            s = math.floor((b_start - day_start).total_seconds() / 60)
+            e = math.ceil((b_end - day_start).total_seconds() / 60)
+            busy[i, max(s, 0):min(e, MINUTES_PER_DAY)] = True
+
+    # 3/4. Janela deslizante via soma acumulada
+    free = open_ & ~busy
+    csum = np.zeros((n_days, MINUTES_PER_DAY + 1), dtype=np.int32)
+    np.cumsum(free, axis=1, out=csum[:, 1:])
+
+    # Candidatos: calculados uma vez por dia da semana e avaliados para
+    # todos os dias que compartilham esse dia da semana
+    rows_by_weekday: Dict[int, List[int]] = {}
+    for i, d in enumerate(days):
+        rows_by_weekday.setdefault(weekday_of(d), []).append(i)
+
+    duration = timedelta(minutes=duration_minutes)
+    result: Dict[date, List[dict]] = {d: [] for d in days}
+
+    for weekday, rows in rows_by_weekday.items():
+        starts = _candidate_starts(blocks_by_weekday.get(weekday, []), duration_minutes)
+        if starts.size == 0:
+            continue
+
+        row_idx = np.asarray(rows)[:, None]
+        window_free = csum[row_idx, starts + duration_minutes] - csum[row_idx, starts]
+        is_free = window_free == duration_minutes
+
+        for r, row in enumerate(rows):
+            d = days[row]
+            day_start = datetime.combine(d, time.min, tzinfo=timezone.utc)
+            day_slots = []
+            for minute, ok in zip(starts.tolist(), is_free[r].tolist()):
+                slot_start = day_start + timedelta(minutes=minute)
+                day_slots.append({
+                    "start": slot_start.isoformat(),
+                    "end": (slot_start + duration).isoformat(),
+                    "available": ok,
+                })
+            result[d] = day_slots
+
+    return result
@@ -0,0 +1,238 @@
+"""
+Cache de slots públicos com invalidação dirigida por escrita.
+
+Chave: (professional_id, data, duração do serviço).
+Valor: lista de slots do dia (dicts start/end/available), SEM o filtro
+de horários passados — esse filtro é aplicado na leitura, para que a
+mesma entrada continue válida ao longo do dia.
+
+Backends:
+  - Em processo (padrão): TTLCache com limite LRU.
+  - Redis (se REDIS_URL estiver configurado e o pacote `redis` instalado):
+    compartilhado entre workers, invalidação enxerga todos os processos.
+
+Invalidação:
+  - Agendamento criado / status alterado → (profissional, dia)
+  - Blocos de disponibilidade alterados  → todas as entradas do profissional
+
+Cada invalidação incrementa a geração do profissional. Quem calcula slots
+lê a geração ANTES das queries e a repassa a set(): se uma escrita
+invalidou o profissional no meio do cálculo, o resultado (já velho) não
+é gravado.
+"""
+import json
+import logging
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.redis import get_redis
+
+try:
+    from redis.exceptions import WatchError
+except ImportError:  # pragma: no cover - dependência opcional
+    WatchError = None
+
+logger = logging.getLogger(__name__)
+
+_REDIS_PREFIX = "slots"
+
+
+class SlotCache:
+    """Cache de slots por (profissional, dia, duração)."""
+
+    def __init__(self, max_entries: int, ttl_seconds: int, enabled: bool = True):
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self._local = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._generations: Dict[str, int] = {}
+        self.stale_writes_skipped = 0
+
+        # Contadores do backend Redis (o TTLCache tem os seus próprios)
+        self._redis_hits = 0
+        self._redis_misses = 0
+        self._redis_errors = 0
+
+    # ── Chaves ──────────────────────────────────────────────
+
+    @staticmethod
+    def _redis_key(professional_id: str, day: date, duration_minutes: int) -> str:
+        return f"{_REDIS_PREFIX}:{professional_id}:{day.isoformat()}:{duration_minutes}"
+
+    @staticmethod
+    def _redis_index(professional_id: str) -> str:
+        return f"{_REDIS_PREFIX}:idx:{professional_id}"
+
+    @staticmethod
+    def _redis_generation(professional_id: str) -> str:
+        return f"{_REDIS_PREFIX}:gen:{professional_id}"
+
+    # ── Geração ─────────────────────────────────────────────
+
+    async def generation(self, professional_id: str) -> Optional[int]:
+        """
+        Geração atual do profissional (incrementada a cada invalidação).
+        Leia antes das queries e repasse a set(). None se o Redis falhar.
+        """
+        redis = get_redis()
+        if redis is None:
+            return self._generations.get(professional_id, 0)
+
+        try:
+            raw = await redis.get(self._redis_generation(professional_id))
+        except Exception as e:
+            self._redis_errors += 1
+            logger.warning(f"Falha ao ler geração do cache de slots no Redis: {e}")
+            return None
+        return int(raw or 0)
+
+    # ── Leitura / escrita ───────────────────────────────────
+
+    async def get(
+        self, professional_id: str, day: date, duration_minutes: int
+    ) -> Optional[List[dict]]:
+        """Retorna os slots do dia em cache, ou None."""
+        if not self.enabled:
+            return None
+
+        redis = get_redis()
+        if redis is None:
+            return self._local.get((professional_id, day, duration_minutes))
+
+        try:
+            raw = await redis.get(self._redis_key(professional_id, day, duration_minutes))
+        except Exception as e:
+            self._redis_errors += 1
+            logger.warning(f"Falha ao ler cache de slots no Redis: {e}")
+            return None
+
+        if raw is None:
+            self._redis_misses += 1
+            return None
+        self._redis_hits += 1
+        return json.loads(raw)
+
+    async def set(
+        self,
+        professional_id: str,
+        day: date,
+        duration_minutes: int,
+        slots: List[dict],
+        generation: Optional[int],
+    ) -> None:
+        """
+        Grava os slots (não filtrados) do dia, se a geração do profissional
+        ainda for a lida antes das queries (ver generation()).
+        """
+        if not self.enabled or generation is None:
+            return
+
+        redis = get_redis()
+        if redis is None:
+            if self._generations.get(professional_id, 0) != generation:
+                self.stale_writes_skipped += 1
+                return
+            self._local.set((professional_id, day, duration_minutes), slots)
+            return
+
+        key = self._redis_key(professional_id, day, duration_minutes)
+        index = self._redis_index(professional_id)
+        gen_key = self._redis_generation(professional_id)
+        try:
+            # WATCH na geração: uma invalidação entre a checagem e o
+            # EXEC aborta a transação
+            async with redis.pipeline(transaction=True) as pipe:
+                await pipe.watch(gen_key)
+                if int(await pipe.get(gen_key) or 0) != generation:
+                    self.stale_writes_skipped += 1
+                    return
+                pipe.multi()
+                pipe.set(key, json.dumps(slots), ex=self.ttl_seconds)
+                pipe.sadd(index, key)
+                pipe.expire(index, self.ttl_seconds * 2)
+                await pipe.execute()
+        except Exception as e:
+            if WatchError is not None and isinstance(e, WatchError):
+                self.stale_writes_skipped += 1
+                return
+            self._redis_errors += 1
+            logger.warning(f"Falha ao gravar cache de slots no Redis: {e}")
+
+    # ── Invalidação ─────────────────────────────────────────
+
+    async def invalidate(
+        self,
+        professional_id: str,
+        days: Optional[Iterable[date]] = None,
+    ) -> int:
+        """
+        Invalida as entradas de um profissional e incrementa sua geração.
+
+        Args:
+            days: se informado, invalida apenas esses dias (todas as durações);
+                  caso contrário, invalida todos os dias do profissional.
+
+        Returns:
+            Número de entradas removidas.
+        """
+        day_set = set(days) if days is not None else None
+
+        redis = get_redis()
+        if redis is None:
+            self._generations[professional_id] = (
+                self._generations.get(professional_id, 0) + 1
+            )
+            return self._local.delete_where(
+                lambda k: k[0] == professional_id
+                and (day_set is None or k[1] in day_set)
+            )
+
+        index = self._redis_index(professional_id)
+        try:
+            await redis.incr(self._redis_generation(professional_id))
+            keys = await redis.smembers(index)
+            if day_set is not None:
+                day_isos = {d.isoformat() for d in day_set}
+                keys = {k for k in keys if k.split(":")[2] in day_isos}
+            if not keys:
+                return 0
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.delete(*keys)
+                pipe.srem(index, *keys)
+                await pipe.execute()
+            return len(keys)
+        except Exception as e:
+            self._redis_errors += 1
+            logger.warning(f"Falha ao invalidar cache de slots no Redis: {e}")
+            return 0
+
+    # ── Métricas ────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        backend = "redis" if get_redis() is not None else "memory"
+        data = {
+            "enabled": self.enabled,
+            "backend": backend,
+            "stale_writes_skipped": self.stale_writes_skipped,
+        }
+        if backend == "memory":
+            data.update(self._local.stats())
+        else:
+            lookups = self._redis_hits + self._redis_misses
+            data.update({
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._redis_hits,
+                "misses": self._redis_misses,
+                "hit_rate": round(self._redis_hits / lookups, 4) if lookups else 0.0,
+                "errors": self._redis_errors,
+            })
+        return data
+
+
+# Instância singleton para uso em toda a aplicação
+slot_cache = SlotCache(
+    max_entries=settings.slot_cache_max_entries,
+    ttl_seconds=settings.slot_cache_ttl_seconds,
+    enabled=settings.slot_cache_enabled,
+)
@@ -0,0 +1,71 @@
+"""
+Codificação compacta dos slots de um dia (format=compact).
+
+No formato completo cada slot é um objeto com duas strings ISO-8601 —
+um mês de grade é quase todo texto repetido, e cada slot vira uma
+instância Pydantic de TimeSlot. No formato compacto, o dia é uma grade:
+
+    base          início do primeiro slot (ISO-8601, UTC)
+    step_minutes  passo da grade = MDC entre a duração e os deslocamentos
+                  dos inícios em relação à base (blocos de expediente
+                  desalinhados continuam representáveis)
+    count         número de posições da grade
+    offered       bitmap (base64) das posições em que começa um slot
+    free          bitmap (base64) dos slots livres (subconjunto de offered)
+
+O slot da posição i começa em base + i·step e termina duração minutos
+depois. Bits em ordem MSB-first dentro de cada byte. Um dia típico cabe
+em poucas dezenas de bytes, contra ~100 bytes por slot no formato completo.
+
+Decodificação de referência (frontend): decodeCompactDay em
+frontend/src/services/publicApi.ts.
+"""
+import base64
+from datetime import date, datetime
+from math import gcd
+from typing import List
+
+
+def _pack_bits(positions: List[int], count: int) -> str:
+    bits = bytearray((count + 7) // 8)
+    for i in positions:
+        bits[i >> 3] |= 0x80 >> (i & 7)
+    return base64.b64encode(bytes(bits)).decode("ascii")
+
+
+def encode_day(day: date, slots: List[dict], duration_minutes: int) -> dict:
+    """
+    Codifica os slots de um dia (dicts start/end/available) nos campos
+    de CompactDaySlots.
+    """
+    if not slots:
+        return {
+            "date": day.isoformat(),
+            "base": None,
+            "step_minutes": duration_minutes,
+            "count": 0,
+            "offered": "",
+            "free": "",
+        }
+
+    starts = [datetime.fromisoformat(s["start"]) for s in slots]
+    base = min(starts)
+    offsets = [int((s - base).total_seconds()) // 60 for s in starts]
+
+    step = duration_minutes
+    for offset in offsets:
+        step = gcd(step, offset)
+    step = step or 1
+
+    positions = [offset // step for offset in offsets]
+    count = max(positions) + 1
+    free = [p for p, s in zip(positions, slots) if s["available"]]
+
+    return {
+        "date": day.isoformat(),
+        "base": base.isoformat(),
+        "step_minutes": step,
+        "count": count,
+        "offered": _pack_bits(positions, count),
+        "free": _pack_bits(free, count),
+    }
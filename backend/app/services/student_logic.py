@@ -4,11 +4,15 @@ Lógica de negócio para Alunos (Students).
 Todas as funções recebem o cliente Supabase autenticado (RLS-aware)
 como parâmetro, garantindo isolamento multi-tenant automático.
 """
-from typing import List
+from typing import AsyncIterator, List, Optional, Tuple
 from fastapi import HTTPException, status
-from supabase import Client
+from postgrest import AsyncPostgrestClient
 
 from app.schemas.student import StudentCreate, StudentUpdate, StudentResponse
+from app.core.config import settings
+from app.core.serialization import validate_rows
+from app.services.export_logic import ExportFormat, iter_keyset_pages, stream_export
+from app.services.keyset import after_key, order_by_key
 
 import logging
 
@@ -16,14 +20,14 @@ logger = logging.getLogger(__name__)
 
 
 async def create_student(
-    db: Client, data: StudentCreate, user_id: str
+    db: AsyncPostgrestClient, data: StudentCreate, user_id: str
 ) -> StudentResponse:
     """Criar novo aluno vinculado ao profissional."""
     student_dict = data.model_dump()
     student_dict["user_id"] = user_id
 
     try:
-        response = db.table("students").insert(student_dict).execute()
+        response = await db.table("students").insert(student_dict).execute()
         if not response.data:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -37,25 +41,51 @@ async def create_student(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-async def list_students(db: Client) -> List[StudentResponse]:
+async def list_students(db: AsyncPostgrestClient) -> List[StudentResponse]:
     """Listar todos os alunos do profissional autenticado (RLS filtra)."""
     try:
-        response = (
+        response = await (
             db.table("students")
             .select("*")
             .order("full_name")
             .execute()
         )
-        return [StudentResponse(**s) for s in response.data]
+        return validate_rows(StudentResponse, response.data)
     except Exception as e:
         logger.error(f"Erro ao listar alunos: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-async def get_student(db: Client, student_id: str) -> StudentResponse:
+STUDENT_COLUMNS = "id, user_id, full_name, email, phone, notes, created_at, updated_at"
+
+
+def export_students(
+    db: AsyncPostgrestClient, professional_id: str, fmt: ExportFormat
+) -> AsyncIterator[bytes]:
+    """
+    Exporta os alunos do profissional (NDJSON ou CSV), em ordem de
+    cadastro, em páginas keyset de export_page_size.
+    """
+    async def fetch_page(after: Optional[Tuple[str, str]]) -> List[dict]:
+        query = (
+            db.table("students")
+            .select(STUDENT_COLUMNS)
+            .eq("user_id", professional_id)
+        )
+        if after is not None:
+            query = after_key(query, "created_at", "id", *after)
+        query = order_by_key(query, "created_at", "id")
+        response = await query.limit(settings.export_page_size).execute()
+        return response.data or []
+
+    pages = iter_keyset_pages(fetch_page, "created_at")
+    return stream_export(pages, StudentResponse, fmt)
+
+
+async def get_student(db: AsyncPostgrestClient, student_id: str) -> StudentResponse:
     """Buscar aluno por ID (RLS garante que pertence ao profissional)."""
     try:
-        response = (
+        response = await (
             db.table("students")
             .select("*")
             .eq("id", student_id)
@@ -75,7 +105,7 @@ async def get_student(db: Client, student_id: str) -> StudentResponse:
 
 
 async def update_student(
-    db: Client, student_id: str, data: StudentUpdate
+    db: AsyncPostgrestClient, student_id: str, data: StudentUpdate
 ) -> StudentResponse:
     """Atualizar dados de um aluno (RLS garante que pertence ao profissional)."""
     update_data = {k: v for k, v in data.model_dump().items() if v is not None}
@@ -84,7 +114,7 @@ async def update_student(
         return await get_student(db, student_id)
 
     try:
-        response = (
+        response = await (
             db.table("students")
             .update(update_data)
             .eq("id", student_id)
@@ -103,10 +133,10 @@ async def update_student(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-async def delete_student(db: Client, student_id: str) -> dict:
+async def delete_student(db: AsyncPostgrestClient, student_id: str) -> dict:
     """Remover aluno (RLS garante que pertence ao profissional)."""
     try:
-        response = (
+        response = await (
             db.table("students")
             .delete()
             .eq("id", student_id)
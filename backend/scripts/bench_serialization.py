@@ -0,0 +1,125 @@
+"""
+Benchmark: serialização das listagens (caminho atual × caminho rápido).
+
+Compara, para listas de 1k e 10k linhas no formato devolvido pelo
+PostgREST:
+  - atual: `Model(**row)` por linha + o que o FastAPI faz com o
+    response_model (serialize_response: dump, revalidação, conversão
+    para JSON) + JSONResponse (json.dumps)
+  - rápido: validate_rows() + ModelResponse (app/core/serialization.py)
+
+Também confere que os dois caminhos produzem o mesmo JSON.
+
+Uso (a partir de backend/):
+    python scripts/bench_serialization.py
+    python scripts/bench_serialization.py --rows 1000 5000 --repeat 7
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple, Type
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+from pydantic import BaseModel  # noqa: E402
+
+from app.core.serialization import ModelResponse, validate_rows  # noqa: E402
+from app.schemas.appointment import AppointmentResponse  # noqa: E402
+from app.schemas.service import ServiceResponse  # noqa: E402
+
+
+def _appointment_row(i: int) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "professional_id": "11111111-1111-1111-1111-111111111111",
+        "service_id": "22222222-2222-2222-2222-222222222222",
+        "student_id": str(uuid.uuid4()),
+        "client_name": f"Aluno {i}",
+        "client_email": f"aluno{i}@example.com",
+        "start_time": "2026-11-02T09:00:00+00:00",
+        "end_time": "2026-11-02T10:00:00+00:00",
+        "status": "confirmed",
+        "google_event_id": None,
+        "created_at": "2026-10-01T12:34:56.123456+00:00",
+        "updated_at": "2026-10-01T12:34:56.123456+00:00",
+    }
+
+
+def _service_row(i: int) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "user_id": "11111111-1111-1111-1111-111111111111",
+        "name": f"Serviço {i}",
+        "description": "Aula individual",
+        "duration_minutes": 60,
+        "price": 100.0,
+        "is_active": True,
+        "created_at": "2026-10-01T12:34:56.123456+00:00",
+        "updated_at": "2026-10-01T12:34:56.123456+00:00",
+    }
+
+
+CASES: Dict[str, Tuple[Type[BaseModel], Callable[[int], dict]]] = {
+    "appointments": (AppointmentResponse, _appointment_row),
+    "services": (ServiceResponse, _service_row),
+}
+
+
+def current_path(model: Type[BaseModel], rows: List[dict]) -> bytes:
+    """Model(**row) por linha + serialização do response_model pelo FastAPI."""
+    field = create_response_field(name="response", type_=List[model])
+    items = [model(**row) for row in rows]
+    content = asyncio.run(serialize_response(field=field, response_content=items))
+    return JSONResponse(content).body
+
+
+def fast_path(model: Type[BaseModel], rows: List[dict]) -> bytes:
+    """Validação única + serialização direta pelo pydantic-core."""
+    return ModelResponse(validate_rows(model, rows)).body
+
+
+def _measure(fn: Callable[[], bytes], repeat: int) -> float:
+    """Mediana (ms) de `repeat` execuções, após um aquecimento."""
+    fn()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'caso':<14}{'linhas':>8}{'atual (ms)':>13}{'rápido (ms)':>13}{'ganho':>8}")
+    for name, (model, make_row) in CASES.items():
+        for count in args.rows:
+            rows = [make_row(i) for i in range(count)]
+
+            if json.loads(current_path(model, rows)) != json.loads(fast_path(model, rows)):
+                print(f"{name}: os dois caminhos produziram JSON diferente")
+                return 1
+
+            current_ms = _measure(lambda: current_path(model, rows), args.repeat)
+            fast_ms = _measure(lambda: fast_path(model, rows), args.repeat)
+            print(
+                f"{name:<14}{count:>8}{current_ms:>13.1f}{fast_ms:>13.1f}"
+                f"{current_ms / fast_ms:>7.1f}x"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
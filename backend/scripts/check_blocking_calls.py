@@ -0,0 +1,159 @@
+"""
+Lint: chamadas bloqueantes dentro de caminhos assíncronos.
+
+Percorre o código de app/ e falha (exit 1) se encontrar, dentro de uma
+função `async def`:
+  - `.execute()` sem `await` (supabase-py síncrono, googleapiclient...)
+  - `urlopen(...)`, `requests.<método>(...)`, `time.sleep(...)`
+  - `create_client(...)` (cliente supabase-py síncrono)
+
+Também falha para `.execute()` sem `await` em funções síncronas: no app
+elas são chamadas a partir de rotas/workers assíncronos.
+
+Corrotinas passadas para `asyncio.gather(...)`/`asyncio.create_task(...)`
+contam como aguardadas.
+
+Lambdas são ignoradas — é a forma usada para mandar código síncrono para
+uma thread (`await asyncio.to_thread(lambda: ...execute())`). Para liberar
+uma linha específica, adicione o comentário `# blocking: ok`.
+
+Uso (a partir de backend/):
+    python scripts/check_blocking_calls.py            # verifica app/
+    python scripts/check_blocking_calls.py app/services
+"""
+import ast
+import sys
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Módulos legados, fora da API montada em app/main.py
+EXCLUDED = {
+    "app/main_simple.py",
+    "app/routers/auth.py",
+    "app/services/auth_service.py",
+    "app/services/auth_service_simple.py",
+    "app/services/services_service.py",
+    "app/services/students_service.py",
+}
+
+BLOCKING_FUNCTIONS = {"urlopen", "create_client"}
+BLOCKING_ATTRIBUTES = {
+    ("time", "sleep"),
+    ("requests", "get"),
+    ("requests", "post"),
+    ("requests", "put"),
+    ("requests", "patch"),
+    ("requests", "delete"),
+    ("requests", "request"),
+}
+
+# Funções que aguardam as corrotinas recebidas como argumento
+AWAITING_FUNCTIONS = {("asyncio", "gather"), ("asyncio", "create_task")}
+
+ALLOW_MARKER = "# blocking: ok"
+
+Violation = Tuple[Path, int, str]
+
+
+def _blocking_call_name(node: ast.Call) -> Optional[str]:
+    func = node.func
+    if isinstance(func, ast.Name) and func.id in BLOCKING_FUNCTIONS:
+        return func.id
+    if (
+        isinstance(func, ast.Attribute)
+        and isinstance(func.value, ast.Name)
+        and (func.value.id, func.attr) in BLOCKING_ATTRIBUTES
+    ):
+        return f"{func.value.id}.{func.attr}"
+    return None
+
+
+class _Checker(ast.NodeVisitor):
+    def __init__(self, path: Path, lines: List[str]):
+        self.path = path
+        self.lines = lines
+        self.violations: List[Violation] = []
+        self._in_async: List[bool] = []
+        self._awaited: set = set()
+
+    def _report(self, node: ast.AST, message: str) -> None:
+        if ALLOW_MARKER in self.lines[node.lineno - 1]:
+            return
+        self.violations.append((self.path, node.lineno, message))
+
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> None:
+        self._in_async.append(True)
+        self.generic_visit(node)
+        self._in_async.pop()
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        self._in_async.append(False)
+        self.generic_visit(node)
+        self._in_async.pop()
+
+    def visit_Lambda(self, node: ast.Lambda) -> None:
+        # Corpo de lambda roda onde o chamador quiser (ex.: asyncio.to_thread)
+        return
+
+    def visit_Await(self, node: ast.Await) -> None:
+        self._awaited.add(id(node.value))
+        self.generic_visit(node)
+
+    def visit_Call(self, node: ast.Call) -> None:
+        func = node.func
+        if (
+            isinstance(func, ast.Attribute)
+            and isinstance(func.value, ast.Name)
+            and (func.value.id, func.attr) in AWAITING_FUNCTIONS
+        ):
+            self._awaited.update(id(arg) for arg in node.args)
+
+        if self._in_async:
+            if (
+                isinstance(func, ast.Attribute)
+                and func.attr == "execute"
+                and id(node) not in self._awaited
+            ):
+                self._report(node, "`.execute()` sem await (chamada síncrona ao banco/API)")
+            elif self._in_async[-1]:
+                name = _blocking_call_name(node)
+                if name is not None:
+                    self._report(node, f"`{name}()` bloqueia o event loop")
+        self.generic_visit(node)
+
+
+def check_file(path: Path) -> List[Violation]:
+    source = path.read_text(encoding="utf-8")
+    checker = _Checker(path, source.splitlines())
+    checker.visit(ast.parse(source, filename=str(path)))
+    return checker.violations
+
+
+def _iter_files(targets: List[str]) -> Iterator[Path]:
+    for target in targets:
+        root = (BACKEND_DIR / target).resolve()
+        files = [root] if root.is_file() else sorted(root.rglob("*.py"))
+        for path in files:
+            if path.relative_to(BACKEND_DIR).as_posix() not in EXCLUDED:
+                yield path
+
+
+def main(argv: List[str]) -> int:
+    violations: List[Violation] = []
+    for path in _iter_files(argv or ["app"]):
+        violations.extend(check_file(path))
+
+    for path, lineno, message in violations:
+        print(f"{path.relative_to(BACKEND_DIR)}:{lineno}: {message}")
+
+    if violations:
+        print(f"\n{len(violations)} chamada(s) bloqueante(s) encontrada(s).")
+        return 1
+    print("Nenhuma chamada bloqueante encontrada.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
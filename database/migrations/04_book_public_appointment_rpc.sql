@@ -0,0 +1,96 @@
+-- ================================================================
+-- Migração 04: RPC book_public_appointment (agendamento atômico)
+--
+-- Contexto: create_public_appointment fazia até 5 round trips
+-- sequenciais ao PostgREST (busca do aluno, insert do aluno,
+-- check_availability, insert do agendamento, update do
+-- google_event_id). Além da latência, a janela entre o check e o
+-- insert permitia corrida entre dois agendamentos simultâneos.
+--
+-- Esta função faz upsert do aluno, verificação de sobreposição e
+-- insert do agendamento em UMA transação, chamada com um único
+-- POST /rpc/book_public_appointment.
+-- ================================================================
+
+CREATE OR REPLACE FUNCTION book_public_appointment(
+  p_professional_id UUID,
+  p_service_id      UUID,
+  p_student_name    TEXT,
+  p_student_email   TEXT,
+  p_student_phone   TEXT,
+  p_start_time      TIMESTAMPTZ,
+  p_end_time        TIMESTAMPTZ
+)
+RETURNS appointments
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_student_id  UUID;
+  v_appointment appointments;
+BEGIN
+  IF p_start_time >= p_end_time THEN
+    RAISE EXCEPTION 'start_time deve ser anterior a end_time'
+      USING ERRCODE = 'check_violation';
+  END IF;
+
+  -- Serializa os agendamentos do MESMO profissional até o fim da
+  -- transação: fecha a janela entre a verificação e o insert.
+  PERFORM pg_advisory_xact_lock(hashtext(p_professional_id::TEXT));
+
+  -- 1. Upsert do aluno (find-or-create by email + professional_id)
+  SELECT id INTO v_student_id
+    FROM students
+   WHERE user_id = p_professional_id
+     AND email = p_student_email
+   LIMIT 1;
+
+  IF v_student_id IS NULL THEN
+    INSERT INTO students (user_id, full_name, email, phone)
+    VALUES (p_professional_id, p_student_name, p_student_email, p_student_phone)
+    RETURNING id INTO v_student_id;
+  END IF;
+
+  -- 2. Anti double-booking: [A_start, A_end) sobrepõe [B_start, B_end)
+  --    quando A_start < B_end AND A_end > B_start
+  IF EXISTS (
+    SELECT 1
+      FROM appointments
+     WHERE professional_id = p_professional_id
+       AND status NOT IN ('canceled', 'cancelled')
+       AND start_time < p_end_time
+       AND end_time > p_start_time
+  ) THEN
+    RAISE EXCEPTION 'Horário indisponível: já existe um agendamento nesse intervalo'
+      USING ERRCODE = 'exclusion_violation';  -- 23P01
+  END IF;
+
+  -- 3. Agendamento com status 'pending'
+  INSERT INTO appointments (
+    professional_id, service_id, student_id,
+    client_name, client_email,
+    start_time, end_time, status
+  )
+  VALUES (
+    p_professional_id, p_service_id, v_student_id,
+    p_student_name, p_student_email,
+    p_start_time, p_end_time, 'pending'
+  )
+  RETURNING * INTO v_appointment;
+
+  RETURN v_appointment;
+END;
+$$;
+
+-- Apenas o backend (service_role) pode chamar a função
+REVOKE ALL ON FUNCTION book_public_appointment(UUID, UUID, TEXT, TEXT, TEXT, TIMESTAMPTZ, TIMESTAMPTZ) FROM PUBLIC;
+REVOKE ALL ON FUNCTION book_public_appointment(UUID, UUID, TEXT, TEXT, TEXT, TIMESTAMPTZ, TIMESTAMPTZ) FROM anon, authenticated;
+GRANT EXECUTE ON FUNCTION book_public_appointment(UUID, UUID, TEXT, TEXT, TEXT, TIMESTAMPTZ, TIMESTAMPTZ) TO service_role;
+
+
+-- ================================================================
+-- VERIFICAÇÃO
+-- ================================================================
+-- Execute separadamente para verificar:
+-- SELECT proname, prosecdef FROM pg_proc WHERE proname = 'book_public_appointment';
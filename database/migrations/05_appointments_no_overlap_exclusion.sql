@@ -0,0 +1,120 @@
+-- ================================================================
+-- Migração 05: Constraint de exclusão contra sobreposição de horários
+--
+-- Contexto: o índice idx_no_double_booking (migração 03) só impede
+-- dois agendamentos com o MESMO start_time. Sobreposições parciais
+-- (ex.: 10:00-11:00 e 10:30-11:30) dependiam da verificação prévia,
+-- sujeita a corrida.
+--
+-- Uma constraint EXCLUDE com GiST sobre (professional_id, intervalo)
+-- torna a garantia parte do banco: vale sob concorrência e dispensa
+-- a query de verificação antes do insert. Conflitos passam a gerar
+-- o erro 23P01 (exclusion_violation), tratado pelo backend como 409.
+-- ================================================================
+
+-- ─────────────────────────────────────────────────────────────────
+-- 0. PRÉ-REQUISITO: nenhuma sobreposição ativa já existente
+-- ─────────────────────────────────────────────────────────────────
+-- Se o ADD CONSTRAINT abaixo falhar, liste os conflitos com:
+-- SELECT a.id, b.id, a.professional_id, a.start_time, a.end_time, b.start_time, b.end_time
+--   FROM appointments a
+--   JOIN appointments b
+--     ON a.professional_id = b.professional_id
+--    AND a.id < b.id
+--    AND a.start_time < b.end_time
+--    AND a.end_time > b.start_time
+--  WHERE a.status NOT IN ('canceled', 'cancelled')
+--    AND b.status NOT IN ('canceled', 'cancelled');
+
+-- ─────────────────────────────────────────────────────────────────
+-- 1. Extensão necessária para usar "=" em UUID dentro de um índice GiST
+-- ─────────────────────────────────────────────────────────────────
+
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+-- ─────────────────────────────────────────────────────────────────
+-- 2. EXCLUDE: mesmo profissional + intervalos [start, end) que se
+--    sobrepõem (&&), apenas para agendamentos ativos
+-- ─────────────────────────────────────────────────────────────────
+
+ALTER TABLE appointments DROP CONSTRAINT IF EXISTS appointments_no_overlap;
+ALTER TABLE appointments ADD CONSTRAINT appointments_no_overlap
+  EXCLUDE USING gist (
+    professional_id WITH =,
+    tstzrange(start_time, end_time, '[)') WITH &&
+  )
+  WHERE (status NOT IN ('canceled', 'cancelled'));
+
+-- O índice parcial da migração 03 é um caso particular da constraint
+DROP INDEX IF EXISTS idx_no_double_booking;
+
+-- ─────────────────────────────────────────────────────────────────
+-- 3. RPC book_public_appointment sem verificação prévia
+--    (mesma assinatura da migração 04)
+-- ─────────────────────────────────────────────────────────────────
+-- A constraint rejeita o insert conflitante com 23P01; não é mais
+-- preciso o SELECT de sobreposição nem o advisory lock.
+
+CREATE OR REPLACE FUNCTION book_public_appointment(
+  p_professional_id UUID,
+  p_service_id      UUID,
+  p_student_name    TEXT,
+  p_student_email   TEXT,
+  p_student_phone   TEXT,
+  p_start_time      TIMESTAMPTZ,
+  p_end_time        TIMESTAMPTZ
+)
+RETURNS appointments
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_student_id  UUID;
+  v_appointment appointments;
+BEGIN
+  IF p_start_time >= p_end_time THEN
+    RAISE EXCEPTION 'start_time deve ser anterior a end_time'
+      USING ERRCODE = 'check_violation';
+  END IF;
+
+  -- 1. Upsert do aluno (find-or-create by email + professional_id)
+  SELECT id INTO v_student_id
+    FROM students
+   WHERE user_id = p_professional_id
+     AND email = p_student_email
+   LIMIT 1;
+
+  IF v_student_id IS NULL THEN
+    INSERT INTO students (user_id, full_name, email, phone)
+    VALUES (p_professional_id, p_student_name, p_student_email, p_student_phone)
+    RETURNING id INTO v_student_id;
+  END IF;
+
+  -- 2. Agendamento com status 'pending'
+  --    (appointments_no_overlap → 23P01 se houver sobreposição;
+  --     o erro desfaz também o insert do aluno)
+  INSERT INTO appointments (
+    professional_id, service_id, student_id,
+    client_name, client_email,
+    start_time, end_time, status
+  )
+  VALUES (
+    p_professional_id, p_service_id, v_student_id,
+    p_student_name, p_student_email,
+    p_start_time, p_end_time, 'pending'
+  )
+  RETURNING * INTO v_appointment;
+
+  RETURN v_appointment;
+END;
+$$;
+
+
+-- ================================================================
+-- VERIFICAÇÃO
+-- ================================================================
+-- Execute separadamente para verificar:
+-- SELECT conname, pg_get_constraintdef(oid)
+--   FROM pg_constraint
+--  WHERE conname = 'appointments_no_overlap';
@@ -0,0 +1,210 @@
+-- ================================================================
+-- Migração 06: Transactional Outbox para efeitos colaterais
+--
+-- Contexto: efeitos colaterais de um agendamento (evento no Google
+-- Calendar agora; e-mail e pagamento depois) não podem atrasar o
+-- POST público nem se perder se o processo cair logo após o commit.
+--
+-- A linha do outbox é gravada NA MESMA TRANSAÇÃO do agendamento:
+--   - criação → dentro da RPC book_public_appointment
+--   - mudança de status → trigger em appointments
+-- Um worker do backend drena o outbox em lotes (claim_outbox_batch,
+-- com FOR UPDATE SKIP LOCKED), despacha para os handlers e marca
+-- as linhas como concluídas.
+-- ================================================================
+
+-- ─────────────────────────────────────────────────────────────────
+-- 1. TABELA: outbox
+-- ─────────────────────────────────────────────────────────────────
+
+CREATE TABLE IF NOT EXISTS outbox (
+  id              BIGSERIAL PRIMARY KEY,
+
+  -- Tipo do evento, ex.: 'appointment.created', 'appointment.status_changed'
+  topic           TEXT NOT NULL,
+  aggregate_id    UUID NOT NULL,
+  professional_id UUID,
+  payload         JSONB NOT NULL DEFAULT '{}'::JSONB,
+
+  -- pending → processing → done | failed
+  status          TEXT NOT NULL DEFAULT 'pending'
+                  CHECK (status IN ('pending', 'processing', 'done', 'failed')),
+  attempts        INTEGER NOT NULL DEFAULT 0,
+  available_at    TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  locked_at       TIMESTAMPTZ,
+  processed_at    TIMESTAMPTZ,
+  last_error      TEXT,
+
+  created_at      TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Índice para o claim: só linhas pendentes, na ordem de chegada
+CREATE INDEX IF NOT EXISTS idx_outbox_pending
+  ON outbox (available_at, id)
+  WHERE status = 'pending';
+
+-- Índice para recuperar linhas presas em 'processing' (worker caiu)
+CREATE INDEX IF NOT EXISTS idx_outbox_processing
+  ON outbox (locked_at)
+  WHERE status = 'processing';
+
+-- Apenas o service_role (backend) acessa o outbox: RLS sem policies
+ALTER TABLE outbox ENABLE ROW LEVEL SECURITY;
+
+
+-- ─────────────────────────────────────────────────────────────────
+-- 2. CLAIM de lote (chamado pelo worker via RPC)
+-- ─────────────────────────────────────────────────────────────────
+-- Marca até p_limit linhas como 'processing' e as retorna. SKIP LOCKED
+-- permite vários workers em paralelo sem pegar a mesma linha. Linhas
+-- presas em 'processing' há mais de p_lock_timeout voltam a ser elegíveis.
+
+CREATE OR REPLACE FUNCTION claim_outbox_batch(
+  p_limit        INTEGER DEFAULT 100,
+  p_lock_timeout INTERVAL DEFAULT INTERVAL '5 minutes'
+)
+RETURNS SETOF outbox
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  UPDATE outbox
+     SET status = 'processing',
+         locked_at = NOW(),
+         attempts = attempts + 1
+   WHERE id IN (
+     SELECT id
+       FROM outbox
+      WHERE (status = 'pending' AND available_at <= NOW())
+         OR (status = 'processing' AND locked_at < NOW() - p_lock_timeout)
+      ORDER BY id
+      LIMIT p_limit
+      FOR UPDATE SKIP LOCKED
+   )
+  RETURNING *;
+$$;
+
+REVOKE ALL ON FUNCTION claim_outbox_batch(INTEGER, INTERVAL) FROM PUBLIC;
+REVOKE ALL ON FUNCTION claim_outbox_batch(INTEGER, INTERVAL) FROM anon, authenticated;
+GRANT EXECUTE ON FUNCTION claim_outbox_batch(INTEGER, INTERVAL) TO service_role;
+
+
+-- ─────────────────────────────────────────────────────────────────
+-- 3. CRIAÇÃO: book_public_appointment grava o outbox na mesma transação
+--    (mesma assinatura das migrações 04/05)
+-- ─────────────────────────────────────────────────────────────────
+
+CREATE OR REPLACE FUNCTION book_public_appointment(
+  p_professional_id UUID,
+  p_service_id      UUID,
+  p_student_name    TEXT,
+  p_student_email   TEXT,
+  p_student_phone   TEXT,
+  p_start_time      TIMESTAMPTZ,
+  p_end_time        TIMESTAMPTZ
+)
+RETURNS appointments
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_student_id  UUID;
+  v_appointment appointments;
+BEGIN
+  IF p_start_time >= p_end_time THEN
+    RAISE EXCEPTION 'start_time deve ser anterior a end_time'
+      USING ERRCODE = 'check_violation';
+  END IF;
+
+  -- 1. Upsert do aluno (find-or-create by email + professional_id)
+  SELECT id INTO v_student_id
+    FROM students
+   WHERE user_id = p_professional_id
+     AND email = p_student_email
+   LIMIT 1;
+
+  IF v_student_id IS NULL THEN
+    INSERT INTO students (user_id, full_name, email, phone)
+    VALUES (p_professional_id, p_student_name, p_student_email, p_student_phone)
+    RETURNING id INTO v_student_id;
+  END IF;
+
+  -- 2. Agendamento com status 'pending'
+  --    (appointments_no_overlap → 23P01 se houver sobreposição)
+  INSERT INTO appointments (
+    professional_id, service_id, student_id,
+    client_name, client_email,
+    start_time, end_time, status
+  )
+  VALUES (
+    p_professional_id, p_service_id, v_student_id,
+    p_student_name, p_student_email,
+    p_start_time, p_end_time, 'pending'
+  )
+  RETURNING * INTO v_appointment;
+
+  -- 3. Efeitos colaterais (Google Calendar, e-mail...) via outbox
+  INSERT INTO outbox (topic, aggregate_id, professional_id, payload)
+  VALUES (
+    'appointment.created',
+    v_appointment.id,
+    v_appointment.professional_id,
+    jsonb_build_object(
+      'appointment_id',  v_appointment.id,
+      'professional_id', v_appointment.professional_id,
+      'service_id',      v_appointment.service_id,
+      'student_id',      v_appointment.student_id,
+      'client_email',    v_appointment.client_email,
+      'start_time',      v_appointment.start_time,
+      'end_time',        v_appointment.end_time
+    )
+  );
+
+  RETURN v_appointment;
+END;
+$$;
+
+
+-- ─────────────────────────────────────────────────────────────────
+-- 4. MUDANÇA DE STATUS: trigger grava o outbox na mesma transação
+-- ─────────────────────────────────────────────────────────────────
+-- O PATCH de status é um UPDATE via PostgREST (cliente RLS); o trigger
+-- garante que o evento é gravado junto, sem round trip extra.
+
+CREATE OR REPLACE FUNCTION enqueue_appointment_status_change()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  INSERT INTO outbox (topic, aggregate_id, professional_id, payload)
+  VALUES (
+    'appointment.status_changed',
+    NEW.id,
+    NEW.professional_id,
+    jsonb_build_object(
+      'appointment_id',  NEW.id,
+      'professional_id', NEW.professional_id,
+      'old_status',      OLD.status,
+      'new_status',      NEW.status
+    )
+  );
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS appointments_status_outbox ON appointments;
+CREATE TRIGGER appointments_status_outbox
+  AFTER UPDATE OF status ON appointments
+  FOR EACH ROW
+  WHEN (OLD.status IS DISTINCT FROM NEW.status)
+  EXECUTE FUNCTION enqueue_appointment_status_change();
+
+
+-- ================================================================
+-- VERIFICAÇÃO
+-- ================================================================
+-- Execute separadamente para verificar o backlog do outbox:
+-- SELECT status, COUNT(*), MIN(created_at) FROM outbox GROUP BY status;
@@ -0,0 +1,33 @@
+-- ================================================================
+-- Migração 07: Índice para a listagem paginada de agendamentos
+--
+-- Contexto: GET /appointments devolvia o histórico inteiro do
+-- profissional. A listagem passou a ser paginada por cursor (keyset)
+-- sobre (start_time, id), com filtros de status e período:
+--
+--   WHERE professional_id = $1
+--     AND start_time >= $cursor_t
+--     AND (start_time > $cursor_t OR (start_time = $cursor_t AND id > $cursor_id))
+--   ORDER BY start_time, id
+--   LIMIT $n + 1
+--
+-- Com este índice cada página é uma varredura curta a partir do
+-- cursor, independentemente do tamanho do histórico.
+-- ================================================================
+
+CREATE INDEX IF NOT EXISTS idx_appointments_professional_start_id
+  ON appointments (professional_id, start_time, id);
+
+-- Coberto pelo índice acima (prefixo professional_id)
+DROP INDEX IF EXISTS idx_appointments_professional_id;
+
+
+-- ================================================================
+-- VERIFICAÇÃO
+-- ================================================================
+-- Execute separadamente para conferir o plano de uma página:
+-- EXPLAIN ANALYZE
+-- SELECT * FROM appointments
+--  WHERE professional_id = '<uuid>'
+--  ORDER BY start_time, id
+--  LIMIT 51;
@@ -0,0 +1,82 @@
+-- ================================================================
+-- Migração 08: Delta sync de agendamentos (GET /appointments/changes)
+--
+-- Contexto: o dashboard recarregava a lista inteira a cada poll. Agora
+-- ele guarda um cursor e pede só o que mudou desde então:
+--
+--   WHERE professional_id = $1
+--     AND updated_at <= now() - settle
+--     AND (updated_at, id) > ($cursor_t, $cursor_id)
+--   ORDER BY updated_at, id
+--   LIMIT $n + 1
+--
+-- Cancelamentos são mudanças de status (updated_at avança). Exclusões
+-- físicas deixam um tombstone em appointment_tombstones, lido com o
+-- mesmo cursor.
+-- ================================================================
+
+-- ─────────────────────────────────────────────────────────────────
+-- 1. updated_at sempre atualizado (o cursor depende dele)
+-- ─────────────────────────────────────────────────────────────────
+
+DROP TRIGGER IF EXISTS update_appointments_updated_at ON appointments;
+CREATE TRIGGER update_appointments_updated_at BEFORE UPDATE ON appointments
+  FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+CREATE INDEX IF NOT EXISTS idx_appointments_professional_updated_id
+  ON appointments (professional_id, updated_at, id);
+
+
+-- ─────────────────────────────────────────────────────────────────
+-- 2. TABELA: appointment_tombstones
+-- ─────────────────────────────────────────────────────────────────
+
+CREATE TABLE IF NOT EXISTS appointment_tombstones (
+  appointment_id  UUID PRIMARY KEY,
+  professional_id UUID NOT NULL,
+  deleted_at      TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_appointment_tombstones_professional_deleted
+  ON appointment_tombstones (professional_id, deleted_at, appointment_id);
+
+ALTER TABLE appointment_tombstones ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Profissional vê seus tombstones" ON appointment_tombstones;
+CREATE POLICY "Profissional vê seus tombstones" ON appointment_tombstones
+  FOR SELECT USING (professional_id = auth.uid());
+
+
+-- ─────────────────────────────────────────────────────────────────
+-- 3. TRIGGER: tombstone ao excluir um agendamento
+-- ─────────────────────────────────────────────────────────────────
+
+CREATE OR REPLACE FUNCTION record_appointment_tombstone()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF OLD.professional_id IS NOT NULL THEN
+    INSERT INTO appointment_tombstones (appointment_id, professional_id, deleted_at)
+    VALUES (OLD.id, OLD.professional_id, NOW())
+    ON CONFLICT (appointment_id) DO UPDATE SET deleted_at = EXCLUDED.deleted_at;
+  END IF;
+  RETURN OLD;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS appointments_tombstone ON appointments;
+CREATE TRIGGER appointments_tombstone AFTER DELETE ON appointments
+  FOR EACH ROW EXECUTE FUNCTION record_appointment_tombstone();
+
+
+-- ================================================================
+-- LIMPEZA
+-- ================================================================
+-- Tombstones só interessam a clientes com cursor mais antigo que eles.
+-- Execute periodicamente (ex.: pg_cron) para descartar os antigos. O
+-- intervalo deve ser igual a CHANGES_RETENTION_DAYS do backend: cursores
+-- mais antigos recebem resync_required e o dashboard recarrega a lista.
+-- DELETE FROM appointment_tombstones WHERE deleted_at < NOW() - INTERVAL '30 days';
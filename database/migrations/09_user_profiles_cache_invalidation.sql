@@ -0,0 +1,63 @@
+-- ================================================================
+-- Migração 09: Invalidação do cache de perfis públicos
+--
+-- Contexto: GET /public/profile/{slug} passou a usar um cache
+-- (app.services.profile_cache), inclusive negativo para slugs
+-- inexistentes. Os perfis não são editados pela API — mudam pelo
+-- Supabase Auth/Studio — então a invalidação vem do banco:
+--
+--   INSERT / UPDATE (slug, nome, avatar) / DELETE em user_profiles
+--     → linha 'profile.changed' no outbox, na mesma transação
+--     → o relay do backend remove do cache o slug antigo e o novo
+--
+-- O slug novo também é invalidado: um bot pode tê-lo consultado antes
+-- do cadastro, deixando uma entrada negativa em cache.
+-- ================================================================
+
+CREATE OR REPLACE FUNCTION enqueue_profile_change()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_row user_profiles;
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    v_row := OLD;
+  ELSE
+    v_row := NEW;
+  END IF;
+
+  INSERT INTO outbox (topic, aggregate_id, professional_id, payload)
+  VALUES (
+    'profile.changed',
+    v_row.id,
+    v_row.id,
+    jsonb_build_object(
+      'profile_id', v_row.id,
+      'old_slug',   CASE WHEN TG_OP = 'INSERT' THEN NULL ELSE OLD.public_slug END,
+      'new_slug',   CASE WHEN TG_OP = 'DELETE' THEN NULL ELSE NEW.public_slug END
+    )
+  );
+
+  IF TG_OP = 'DELETE' THEN
+    RETURN OLD;
+  END IF;
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS user_profiles_cache_outbox ON user_profiles;
+CREATE TRIGGER user_profiles_cache_outbox
+  AFTER INSERT OR DELETE OR UPDATE OF public_slug, full_name, avatar_url ON user_profiles
+  FOR EACH ROW
+  EXECUTE FUNCTION enqueue_profile_change();
+
+
+-- ================================================================
+-- VERIFICAÇÃO
+-- ================================================================
+-- Execute separadamente após alterar um perfil:
+-- SELECT topic, payload, status FROM outbox
+--  WHERE topic = 'profile.changed' ORDER BY id DESC LIMIT 5;
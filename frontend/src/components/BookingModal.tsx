@@ -6,21 +6,27 @@
  * Etapa 3: Dados do Aluno (nome, email, telefone) + submit
  *
  * Usa start/end do slot retornado pelo backend (já em UTC).
+ * Os slots vêm por semana (GET /availabilities/public/slots com
+ * start_date/end_date): escolher um dia fora do que já foi carregado
+ * busca os 7 dias a partir dele numa chamada, e os dias seguintes
+ * saem da memória.
  */
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
 import {
     X, Loader2, CalendarDays, User, Mail, Phone, Clock,
     Send, ArrowLeft, Check, AlertTriangle,
 } from 'lucide-react';
 import { Service } from '../types/services';
-import type { TimeSlot } from '../types/availability';
-import { fetchPublicSlots, createPublicBooking } from '../services/publicApi';
+import type { SlotsRangeResponse, TimeSlot } from '../types/availability';
+import { fetchPublicSlotsRange, createPublicBooking } from '../services/publicApi';
 
 // ── Types ────────────────────────────────────────────────────
 
 interface BookingModalProps {
     service: Service;
     professionalId: string;
+    /** Slots já carregados pela página (bootstrap); evita a chamada para esses dias. */
+    prefetchedSlots?: SlotsRangeResponse;
     onClose: () => void;
 }
 
@@ -41,6 +47,16 @@ const formatDuration = (minutes: number) => {
 /** Data de hoje no formato YYYY-MM-DD. */
 const todayStr = () => new Date().toISOString().split('T')[0];
 
+/** Dias carregados por chamada ao escolher uma data fora do cache. */
+const RANGE_DAYS = 7;
+
+/** Soma `days` dias a uma data YYYY-MM-DD. */
+const addDays = (dateStr: string, days: number) => {
+    const d = new Date(dateStr + 'T00:00:00Z');
+    d.setUTCDate(d.getUTCDate() + days);
+    return d.toISOString().split('T')[0];
+};
+
 /** Formata ISO para HH:MM no fuso local. */
 const formatTime = (iso: string) =>
     new Intl.DateTimeFormat('pt-BR', {
@@ -63,7 +79,7 @@ const dayOfWeekName = (dateStr: string) => {
 
 // ── Component ────────────────────────────────────────────────
 
-const BookingModal: React.FC<BookingModalProps> = ({ service, professionalId, onClose }) => {
+const BookingModal: React.FC<BookingModalProps> = ({ service, professionalId, prefetchedSlots, onClose }) => {
     // Wizard state
     const [step, setStep] = useState<WizardStep>('date');
 
@@ -75,6 +91,9 @@ const BookingModal: React.FC<BookingModalProps> = ({ service, professionalId, on
     const [loadingSlots, setLoadingSlots] = useState(false);
     const [slotsError, setSlotsError] = useState('');
     const [selectedSlot, setSelectedSlot] = useState<TimeSlot | null>(null);
+    // Slots por dia já carregados (bootstrap da página + semanas buscadas)
+    const loadedDays = useRef<Map<string, TimeSlot[]>>(new Map());
+    const lastRequestedDate = useRef('');
 
     // Step 3: Form
     const [name, setName] = useState('');
@@ -92,18 +111,35 @@ const BookingModal: React.FC<BookingModalProps> = ({ service, professionalId, on
         setSelectedSlot(null);
         setSlots([]);
         setSlotsError('');
-        setLoadingSlots(true);
         setStep('slot');
+        lastRequestedDate.current = date;
 
+        const loaded = loadedDays.current.get(date)
+            ?? prefetchedSlots?.days.find((d) => d.date === date)?.slots;
+        if (loaded) {
+            setSlots(loaded);
+            return;
+        }
+
+        setLoadingSlots(true);
         try {
-            const response = await fetchPublicSlots(professionalId, date, service.id);
-            setSlots(response.slots);
+            const response = await fetchPublicSlotsRange(
+                professionalId, date, addDays(date, RANGE_DAYS - 1), service.id,
+            );
+            for (const day of response.days) {
+                loadedDays.current.set(day.date, day.slots);
+            }
+            // Outra data escolhida enquanto esta carregava: não sobrescreve
+            if (lastRequestedDate.current !== date) return;
+            setSlots(loadedDays.current.get(date) ?? []);
         } catch {
-            setSlotsError('Erro ao buscar horários. Tente novamente.');
+            if (lastRequestedDate.current === date) {
+                setSlotsError('Erro ao buscar horários. Tente novamente.');
+            }
         } finally {
-            setLoadingSlots(false);
+            if (lastRequestedDate.current === date) setLoadingSlots(false);
         }
-    }, [professionalId, service.id]);
+    }, [professionalId, service.id, prefetchedSlots]);
 
     // ── Step 2 → Step 3: Select a slot ──────────────────────
     const handleSlotSelect = (slot: TimeSlot) => {
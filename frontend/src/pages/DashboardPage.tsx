@@ -7,15 +7,27 @@
  *   - Lista de agendamentos com ações de confirmar/cancelar
  *   - Acesso rápido a Alunos e Serviços
  */
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
 import { useAuth } from '../contexts/AuthContext';
 import { useNavigate, Link } from 'react-router-dom';
 import {
   Copy, Check, ExternalLink, CalendarCheck, CalendarX, Clock,
   User, Mail, Loader2, RefreshCw, Filter,
 } from 'lucide-react';
-import { listAppointments, updateAppointmentStatus } from '../services/appointmentsApi';
-import { Appointment, AppointmentStatus } from '../types/appointments';
+import {
+  getAppointmentStats,
+  listAppointmentChanges,
+  listAppointments,
+  openAppointmentEvents,
+  updateAppointmentStatus,
+} from '../services/appointmentsApi';
+import {
+  Appointment,
+  AppointmentChanges,
+  AppointmentStats,
+  AppointmentStatus,
+  ListAppointmentsParams,
+} from '../types/appointments';
 
 // ── Helpers ──────────────────────────────────────────────────
 
@@ -67,6 +79,20 @@ const StatusBadge: React.FC<{ status: AppointmentStatus }> = ({ status }) => {
   );
 };
 
+/** Intervalo do polling de alterações (delta sync) sem o stream SSE. */
+const CHANGES_POLL_INTERVAL_MS = 30_000;
+
+/** Espera antes de reabrir o stream SSE encerrado pelo servidor. */
+const EVENTS_RECONNECT_DELAY_MS = 5_000;
+
+/** Filtro de status como parâmetros da listagem (filtrada no servidor). */
+const filterParams = (filter: AppointmentStatus | 'all'): ListAppointmentsParams =>
+  filter === 'all' ? {} : { status: filter };
+
+/** Ordem da listagem da API: (start_time, id). */
+const compareAppointments = (a: Appointment, b: Appointment) =>
+  a.start_time.localeCompare(b.start_time) || a.id.localeCompare(b.id);
+
 // ── Component ────────────────────────────────────────────────
 
 const DashboardPage: React.FC = () => {
@@ -82,30 +108,176 @@ const DashboardPage: React.FC = () => {
   const [loadingAppts, setLoadingAppts] = useState(true);
   const [apptError, setApptError] = useState('');
   const [statusFilter, setStatusFilter] = useState<AppointmentStatus | 'all'>('all');
+  const [stats, setStats] = useState<AppointmentStats>({ total: 0, pending: 0, confirmed: 0 });
   const [actionLoading, setActionLoading] = useState<string | null>(null);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const changesCursor = useRef<string | null>(null);
+  const nextCursorRef = useRef<string | null>(null);
+  const eventsConnected = useRef(false);
+  const statusFilterRef = useRef<AppointmentStatus | 'all'>('all');
+  const loadSeq = useRef(0);
+
+  useEffect(() => {
+    nextCursorRef.current = nextCursor;
+  }, [nextCursor]);
+
+  // ── Stats (server-side counts) ──────────────────────────────
+  const fetchStats = useCallback(async () => {
+    try {
+      setStats(await getAppointmentStats());
+    } catch {
+      // Mantém os últimos totais; a próxima alteração tenta de novo
+    }
+  }, []);
 
-  // ── Fetch appointments (always fetch ALL, filter locally) ──
+  // ── Fetch appointments (first page of the current filter) ───
   const fetchAppointments = useCallback(async () => {
+    const seq = ++loadSeq.current;
     try {
       setLoadingAppts(true);
       setApptError('');
-      const data = await listAppointments();
-      setAppointments(data);
+      fetchStats();
+      // Cursor de alterações tirado ANTES da lista: o que mudar entre as
+      // duas chamadas chega no próximo poll (aplicar de novo é inofensivo)
+      const changes = await listAppointmentChanges();
+      const page = await listAppointments(filterParams(statusFilterRef.current));
+      // Troca de filtro no meio do caminho: só a última carga vale
+      if (seq !== loadSeq.current) return;
+      changesCursor.current = changes.next_cursor;
+      setAppointments(page.items);
+      setNextCursor(page.next_cursor);
+    } catch {
+      if (seq === loadSeq.current) setApptError('Erro ao carregar agendamentos.');
+    } finally {
+      if (seq === loadSeq.current) setLoadingAppts(false);
+    }
+  }, [fetchStats]);
+
+  // ── Next page (cursor) ──────────────────────────────────────
+  const loadMoreAppointments = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const page = await listAppointments({ ...filterParams(statusFilter), cursor: nextCursor });
+      setAppointments((prev) => [...prev, ...page.items]);
+      setNextCursor(page.next_cursor);
     } catch {
       setApptError('Erro ao carregar agendamentos.');
     } finally {
-      setLoadingAppts(false);
+      setLoadingMore(false);
     }
-  }, []);
+  };
 
+  // ── Apply changes (delta sync / SSE) ────────────────────────
+  const applyChanges = useCallback((items: Appointment[], deletedIds: string[] = []) => {
+    if (items.length === 0 && deletedIds.length === 0) return;
+    const filter = statusFilterRef.current;
+    setAppointments((prev) => {
+      const deleted = new Set(deletedIds);
+      const byId = new Map(prev.map((a) => [a.id, a]));
+      const last = prev[prev.length - 1];
+      for (const item of items) {
+        // Fora do filtro atual (ex.: cancelado com "Pendentes"): sai da lista
+        if (filter !== 'all' && item.status !== filter) {
+          byId.delete(item.id);
+          continue;
+        }
+        // Novos agendamentos só entram se caem no trecho já carregado;
+        // os demais aparecem ao paginar
+        if (byId.has(item.id) || !nextCursorRef.current || (last && compareAppointments(item, last) <= 0)) {
+          byId.set(item.id, item);
+        }
+      }
+      return [...byId.values()]
+        .filter((a) => !deleted.has(a.id))
+        .sort(compareAppointments);
+    });
+    fetchStats();
+  }, [fetchStats]);
+
+  // ── Poll changes (delta sync) ────────────────────────────────
+  const pollChanges = useCallback(async () => {
+    if (!changesCursor.current) return;
+    try {
+      let changes: AppointmentChanges;
+      do {
+        changes = await listAppointmentChanges(changesCursor.current);
+        if (changes.resync_required) {
+          // Remoções antigas já foram descartadas no servidor
+          await fetchAppointments();
+          return;
+        }
+        changesCursor.current = changes.next_cursor;
+        applyChanges(changes.items, changes.deleted_ids);
+      } while (changes.has_more);
+    } catch {
+      // Falha no poll não interrompe o dashboard; tenta no próximo ciclo
+    }
+  }, [applyChanges, fetchAppointments]);
+
+  // Troca de filtro: recarrega a primeira página (cursor zerado)
   useEffect(() => {
+    statusFilterRef.current = statusFilter;
     fetchAppointments();
-  }, [fetchAppointments]);
+  }, [statusFilter, fetchAppointments]);
+
+  // Com o stream SSE aberto o polling fica suspenso
+  useEffect(() => {
+    const timer = window.setInterval(() => {
+      if (!eventsConnected.current) pollChanges();
+    }, CHANGES_POLL_INTERVAL_MS);
+    return () => window.clearInterval(timer);
+  }, [pollChanges]);
+
+  // ── Realtime events (SSE) ────────────────────────────────────
+  useEffect(() => {
+    let source: EventSource | null = null;
+    let retryTimer: number | undefined;
+    let stopped = false;
+
+    const onAppointment = (event: MessageEvent) => {
+      applyChanges([JSON.parse(event.data) as Appointment]);
+    };
 
-  // ── Local filtering ──────────────────────────────────────────
-  const filteredAppointments = statusFilter === 'all'
-    ? appointments
-    : appointments.filter((a) => a.status === statusFilter);
+    const connect = async () => {
+      try {
+        source = await openAppointmentEvents();
+      } catch {
+        // Falha ao emitir o ticket: tenta de novo mais tarde (polling cobre)
+        if (!stopped) retryTimer = window.setTimeout(connect, EVENTS_RECONNECT_DELAY_MS);
+        return;
+      }
+      if (stopped) {
+        source?.close();
+        return;
+      }
+      if (!source) return;
+
+      source.onopen = () => {
+        // Recupera o que pode ter mudado enquanto o stream estava fechado
+        eventsConnected.current = true;
+        pollChanges();
+      };
+      source.addEventListener('appointment.created', onAppointment);
+      source.addEventListener('appointment.status_changed', onAppointment);
+      source.onerror = () => {
+        eventsConnected.current = false;
+        // O ticket vale uma conexão: em vez da reconexão automática do
+        // navegador (que reusaria a URL), reabre com um ticket novo
+        source?.close();
+        retryTimer = window.setTimeout(connect, EVENTS_RECONNECT_DELAY_MS);
+      };
+    };
+
+    connect();
+    return () => {
+      stopped = true;
+      eventsConnected.current = false;
+      window.clearTimeout(retryTimer);
+      source?.close();
+    };
+  }, [applyChanges, pollChanges]);
 
   // ── Actions ─────────────────────────────────────────────────
   const handleCopy = async () => {
@@ -128,9 +300,7 @@ const DashboardPage: React.FC = () => {
     setActionLoading(id);
     try {
       const updated = await updateAppointmentStatus(id, newStatus);
-      setAppointments((prev) =>
-        prev.map((a) => (a.id === id ? { ...a, ...updated } : a))
-      );
+      applyChanges([updated]);
     } catch {
       // Silenciosamente falha — podemos adicionar toast no futuro
     } finally {
@@ -143,11 +313,6 @@ const DashboardPage: React.FC = () => {
     navigate('/login');
   };
 
-  // Stats
-  const pendingCount = appointments.filter((a) => a.status === 'pending' || a.status === 'pending_payment').length;
-  const confirmedCount = appointments.filter((a) => a.status === 'confirmed').length;
-  const totalCount = appointments.length;
-
   // ── Render ──────────────────────────────────────────────────
   return (
     <div className="min-h-screen bg-gray-50">
@@ -211,15 +376,15 @@ const DashboardPage: React.FC = () => {
         <div className="grid grid-cols-1 sm:grid-cols-3 gap-4 mb-8">
           <div className="bg-white rounded-xl shadow-sm border border-gray-100 p-5">
             <p className="text-sm text-gray-500 mb-1">Total de Agendamentos</p>
-            <p className="text-3xl font-bold text-indigo-600">{totalCount}</p>
+            <p className="text-3xl font-bold text-indigo-600">{stats.total}</p>
           </div>
           <div className="bg-white rounded-xl shadow-sm border border-gray-100 p-5">
             <p className="text-sm text-gray-500 mb-1">Pendentes</p>
-            <p className="text-3xl font-bold text-amber-600">{pendingCount}</p>
+            <p className="text-3xl font-bold text-amber-600">{stats.pending}</p>
           </div>
           <div className="bg-white rounded-xl shadow-sm border border-gray-100 p-5">
             <p className="text-sm text-gray-500 mb-1">Confirmados</p>
-            <p className="text-3xl font-bold text-emerald-600">{confirmedCount}</p>
+            <p className="text-3xl font-bold text-emerald-600">{stats.confirmed}</p>
           </div>
         </div>
 
@@ -298,7 +463,7 @@ const DashboardPage: React.FC = () => {
                 Tentar novamente
               </button>
             </div>
-          ) : filteredAppointments.length === 0 ? (
+          ) : appointments.length === 0 ? (
             /* Empty State */
             <div className="text-center py-16 px-4">
               <div className="w-16 h-16 bg-indigo-50 rounded-2xl flex items-center justify-center mx-auto mb-4">
@@ -315,7 +480,7 @@ const DashboardPage: React.FC = () => {
           ) : (
             /* Appointments List */
             <div className="divide-y divide-gray-50">
-              {filteredAppointments.map((apt) => (
+              {appointments.map((apt) => (
                 <div
                   key={apt.id}
                   className="px-5 sm:px-6 py-4 hover:bg-gray-50/50 transition-colors"
@@ -390,6 +555,20 @@ const DashboardPage: React.FC = () => {
               ))}
             </div>
           )}
+
+          {/* Load more */}
+          {!loadingAppts && !apptError && nextCursor && (
+            <div className="px-5 sm:px-6 py-4 border-t border-gray-50 text-center">
+              <button
+                onClick={loadMoreAppointments}
+                disabled={loadingMore}
+                className="inline-flex items-center gap-1.5 text-sm text-indigo-600 hover:text-indigo-700 font-medium disabled:opacity-50"
+              >
+                {loadingMore && <Loader2 size={14} className="animate-spin" />}
+                Carregar mais
+              </button>
+            </div>
+          )}
         </div>
       </main>
     </div>
@@ -9,8 +9,9 @@
  */
 import React, { useEffect, useState, useCallback } from 'react';
 import { useParams } from 'react-router-dom';
+import axios from 'axios';
 import { Service } from '../types/services';
-import { fetchPublicServices } from '../services/publicApi';
+import { BookingPage, fetchBookingPage, fetchPublicServices } from '../services/publicApi';
 import BookingModal from '../components/BookingModal';
 import { Clock, DollarSign, Loader2, CalendarCheck, Sparkles } from 'lucide-react';
 
@@ -33,15 +34,24 @@ const PublicBookingPage: React.FC = () => {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [selectedService, setSelectedService] = useState<Service | null>(null);
+  const [bookingPage, setBookingPage] = useState<BookingPage | null>(null);
 
-  // ── Carregar serviços ──────────────────────────────────────
+  // ── Carregar serviços (+ slots dos próximos dias, numa chamada) ──
   const loadServices = useCallback(async () => {
     if (!professional_id) return;
     try {
       setLoading(true);
       setError('');
-      const data = await fetchPublicServices(professional_id);
-      setServices(data);
+      try {
+        const page = await fetchBookingPage(professional_id);
+        setServices(page.services);
+        setBookingPage(page);
+      } catch (err) {
+        // Profissional sem perfil público: só a lista de serviços
+        if (!axios.isAxiosError(err) || err.response?.status !== 404) throw err;
+        setServices(await fetchPublicServices(professional_id));
+        setBookingPage(null);
+      }
     } catch {
       setError('Profissional não encontrado ou sem serviços disponíveis.');
     } finally {
@@ -221,6 +231,11 @@ const PublicBookingPage: React.FC = () => {
         <BookingModal
           service={selectedService}
           professionalId={professional_id}
+          prefetchedSlots={
+            bookingPage?.selected_service_id === selectedService.id
+              ? bookingPage.slots ?? undefined
+              : undefined
+          }
           onClose={() => setSelectedService(null)}
         />
       )}
@@ -5,18 +5,62 @@
  * do Supabase automaticamente.
  */
 import api from './api';
-import { Appointment, AppointmentStatus } from '../types/appointments';
+import { supabase } from '../lib/supabase';
+import {
+    Appointment,
+    AppointmentChanges,
+    AppointmentPage,
+    AppointmentStats,
+    ListAppointmentsParams,
+    StreamTicket,
+} from '../types/appointments';
 
 /**
- * Lista todos os agendamentos do profissional autenticado.
- * Opcionalmente filtra por status.
+ * Lista uma página de agendamentos do profissional autenticado.
+ * Filtros opcionais: status e período. Para a próxima página,
+ * passe `cursor: page.next_cursor`.
  */
-export async function listAppointments(statusFilter?: AppointmentStatus): Promise<Appointment[]> {
-    const params = statusFilter ? { status: statusFilter } : {};
-    const response = await api.get<Appointment[]>('/appointments/', { params });
+export async function listAppointments(params: ListAppointmentsParams = {}): Promise<AppointmentPage> {
+    const response = await api.get<AppointmentPage>('/appointments/', { params });
     return response.data;
 }
 
+/**
+ * Totais do profissional (total, pendentes, confirmados), contados no
+ * servidor — a listagem é paginada e não serve para somar.
+ */
+export async function getAppointmentStats(): Promise<AppointmentStats> {
+    const response = await api.get<AppointmentStats>('/appointments/stats');
+    return response.data;
+}
+
+/**
+ * Alterações desde o cursor `since` (delta sync para polling).
+ * Sem `since`, retorna só o cursor atual — chame antes de carregar a
+ * lista e, depois, repita com `since: changes.next_cursor`.
+ */
+export async function listAppointmentChanges(since?: string): Promise<AppointmentChanges> {
+    const response = await api.get<AppointmentChanges>('/appointments/changes', {
+        params: since ? { since } : {},
+    });
+    return response.data;
+}
+
+/**
+ * Abre o stream SSE de eventos do profissional (GET /appointments/events):
+ * `appointment.created` e `appointment.status_changed`, com o agendamento
+ * em `event.data`. O EventSource não envia headers: abre com um ticket de
+ * uso único (POST /appointments/events/ticket), nunca com o JWT na URL.
+ * Cada conexão precisa de um ticket novo. Retorna null sem sessão.
+ */
+export async function openAppointmentEvents(): Promise<EventSource | null> {
+    const { data: { session } } = await supabase.auth.getSession();
+    if (!session?.access_token) return null;
+    const response = await api.post<StreamTicket>('/appointments/events/ticket');
+    const ticket = encodeURIComponent(response.data.ticket);
+    return new EventSource(`${api.defaults.baseURL}/appointments/events?ticket=${ticket}`);
+}
+
 /**
  * Atualiza o status de um agendamento (confirmed | canceled).
  */
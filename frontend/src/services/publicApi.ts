@@ -6,7 +6,12 @@
  */
 import axios from 'axios';
 import { Service } from '../types/services';
-import type { SlotsResponse } from '../types/availability';
+import type {
+    CompactDaySlots,
+    SlotsRangeCompactResponse,
+    SlotsRangeResponse,
+    TimeSlot,
+} from '../types/availability';
 
 const API_BASE_URL = `${import.meta.env.VITE_API_URL || 'http://localhost:8000'}/api/v1`;
 
@@ -24,6 +29,14 @@ export interface PublicProfile {
     public_slug: string;
 }
 
+/** Bootstrap da Public Booking Page (GET /public/booking-page/{slug}). */
+export interface BookingPage {
+    profile: PublicProfile;
+    services: Service[];
+    selected_service_id: string | null;
+    slots: SlotsRangeResponse | null;   // próximos dias do serviço selecionado
+}
+
 /** Payload enviado ao backend para criar um agendamento público. */
 export interface PublicBookingRequest {
     professional_id: string;
@@ -49,6 +62,42 @@ export interface PublicBookingResponse {
     updated_at: string;
 }
 
+// ── Formato compacto de slots ───────────────────────────────
+
+function isBitSet(bits: Uint8Array, i: number): boolean {
+    return (bits[i >> 3] & (0x80 >> (i & 7))) !== 0;
+}
+
+function decodeBits(b64: string): Uint8Array {
+    return Uint8Array.from(atob(b64), (c) => c.charCodeAt(0));
+}
+
+/**
+ * Expande um dia do formato compacto na lista de TimeSlot (espelho de
+ * encode_day em backend/app/services/slot_compact.py).
+ */
+export function decodeCompactDay(day: CompactDaySlots, durationMinutes: number): TimeSlot[] {
+    if (day.base === null || day.count === 0) return [];
+
+    const offered = decodeBits(day.offered);
+    const free = decodeBits(day.free);
+    const baseMs = new Date(day.base).getTime();
+    const stepMs = day.step_minutes * 60_000;
+    const durationMs = durationMinutes * 60_000;
+
+    const slots: TimeSlot[] = [];
+    for (let i = 0; i < day.count; i++) {
+        if (!isBitSet(offered, i)) continue;
+        const startMs = baseMs + i * stepMs;
+        slots.push({
+            start: new Date(startMs).toISOString(),
+            end: new Date(startMs + durationMs).toISOString(),
+            available: isBitSet(free, i),
+        });
+    }
+    return slots;
+}
+
 // ── Funções ─────────────────────────────────────────────────
 
 /** Busca os serviços ATIVOS de um profissional (sem auth). */
@@ -63,20 +112,50 @@ export async function fetchPublicProfile(slug: string): Promise<PublicProfile> {
     return response.data;
 }
 
-/** Busca slots disponíveis para um dia (sem auth). */
-export async function fetchPublicSlots(
+/**
+ * Perfil, serviços ativos e slots dos próximos `days` dias numa única
+ * chamada (sem auth). Aceita o slug ou o UUID do profissional.
+ */
+export async function fetchBookingPage(
+    slugOrId: string,
+    days = 7,
+    serviceId?: string,
+): Promise<BookingPage> {
+    const response = await publicApi.get<BookingPage>(`/public/booking-page/${slugOrId}`, {
+        params: { days, service_id: serviceId },
+    });
+    return response.data;
+}
+
+/** Busca slots de um intervalo de dias numa única chamada (sem auth). */
+export async function fetchPublicSlotsRange(
     professionalId: string,
-    date: string,
+    startDate: string,
+    endDate: string,
     serviceId: string,
-): Promise<SlotsResponse> {
-    const response = await publicApi.get<SlotsResponse>('/availabilities/public/slots', {
+): Promise<SlotsRangeResponse> {
+    const response = await publicApi.get<SlotsRangeCompactResponse>('/availabilities/public/slots', {
         params: {
             professional_id: professionalId,
-            date,
+            start_date: startDate,
+            end_date: endDate,
             service_id: serviceId,
+            format: 'compact',
         },
     });
-    return response.data;
+    const data = response.data;
+    return {
+        start_date: data.start_date,
+        end_date: data.end_date,
+        professional_id: data.professional_id,
+        service_duration_minutes: data.service_duration_minutes,
+        days: data.days.map((day) => ({
+            date: day.date,
+            professional_id: data.professional_id,
+            service_duration_minutes: data.service_duration_minutes,
+            slots: decodeCompactDay(day, data.service_duration_minutes),
+        })),
+    };
 }
 
 /** Cria um agendamento público (sem auth). */
@@ -21,6 +21,42 @@ export interface Appointment {
   updated_at: string;
 }
 
+/** Página de GET /appointments (paginação por cursor). */
+export interface AppointmentPage {
+  items: Appointment[];
+  next_cursor: string | null;
+}
+
+/** Totais de GET /appointments/stats (contados no banco; pending inclui pending_payment). */
+export interface AppointmentStats {
+  total: number;
+  pending: number;
+  confirmed: number;
+}
+
+/** Delta de GET /appointments/changes desde o cursor anterior. */
+export interface AppointmentChanges {
+  items: Appointment[];        // criados/atualizados (cancelados inclusive)
+  deleted_ids: string[];       // removidos
+  next_cursor: string;
+  has_more: boolean;
+  resync_required: boolean;   // cursor anterior à retenção: recarregar a lista
+}
+
+/** Ticket de uso único para abrir o stream SSE (POST /appointments/events/ticket). */
+export interface StreamTicket {
+  ticket: string;
+  expires_in: number;   // segundos
+}
+
+export interface ListAppointmentsParams {
+  status?: AppointmentStatus;
+  date_from?: string;   // YYYY-MM-DD
+  date_to?: string;     // YYYY-MM-DD
+  cursor?: string;
+  limit?: number;
+}
+
 export interface AppointmentCreate {
   professional_id: string;
   service_id: string;
@@ -40,3 +40,39 @@ export interface SlotsResponse {
     service_duration_minutes: number;
     slots: TimeSlot[];
 }
+
+/** Resposta da rota pública de slots no modo intervalo (vários dias). */
+export interface SlotsRangeResponse {
+    start_date: string;
+    end_date: string;
+    professional_id: string;
+    service_duration_minutes: number;
+    days: SlotsResponse[];
+}
+
+/**
+ * Slots de um dia no formato compacto (format=compact): grade a partir de
+ * `base` com passo `step_minutes`; bitmaps base64 (MSB-first) das posições
+ * em que começa um slot (`offered`) e das livres (`free`).
+ */
+export interface CompactDaySlots {
+    date: string;
+    base: string | null;
+    step_minutes: number;
+    count: number;
+    offered: string;
+    free: string;
+}
+
+export interface SlotsCompactResponse extends CompactDaySlots {
+    professional_id: string;
+    service_duration_minutes: number;
+}
+
+export interface SlotsRangeCompactResponse {
+    start_date: string;
+    end_date: string;
+    professional_id: string;
+    service_duration_minutes: number;
+    days: CompactDaySlots[];
+}